@@ -0,0 +1,294 @@
+#! /usr/bin/env python
+
+"""
+Performance benchmarks for genomatchgp.
+
+Runs locally in a single process (no mpirun needed) and times the hot
+spots of a run: model generation and SBML export, per-cell simulation,
+grouping, aggregation, record I/O and CLI start-up. Results are written
+as JSON and can be compared against a stored baseline; any case slower
+than the baseline by more than the tolerance makes the script exit with
+status 1. The start-up cases also fail if the CLI entry point or
+`commands` import one of HEAVY_MODULES eagerly.
+
+usage:
+    bench.py [--quick] [--repeat R] [--filter TEXT] [--output PATH]
+             [--baseline PATH] [--tolerance X]
+
+options:
+    -q, --quick             Smaller sizes and at most 2 repeats, for a smoke run
+    -r R, --repeat R        Timed repeats per case [default: 5]
+    -f TEXT, --filter TEXT  Only run cases whose name contains TEXT
+    -o PATH, --output PATH  Results file [default: benchmarks/results.json]
+    -b PATH, --baseline PATH
+                            Baseline results file to compare against
+    -t X, --tolerance X     Allowed slowdown ratio of the median before a
+                            case counts as a regression [default: 1.25]
+
+Typical use:
+
+    python benchmarks/bench.py -o benchmarks/baseline.json     # on main
+    python benchmarks/bench.py -b benchmarks/baseline.json     # on a branch
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+
+import numpy as np
+import yaml
+from docopt import docopt
+
+from genomatchgp import methods, records, simulation
+from genomatchgp.modelmaker import export_sbml, generate_gillespie_model
+from genomatchgp.stats import EnsembleStats
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Rate regimes for per-cell simulation, as factors on the association
+# and dissociation constants of params.yaml.
+REGIMES = {
+    "slow":    {"kon": 0.25, "koff1": 0.25},
+    "default": {"kon": 1.0,  "koff1": 1.0},
+    "fast":    {"kon": 4.0,  "koff1": 4.0},
+}
+
+Case = tuple[str, Callable[[], object], int]
+
+# Must not be imported by the CLI entry point or by `commands`: they are
+# loaded on demand by the code paths that need them.
+HEAVY_MODULES = ("tellurium", "roadrunner", "matplotlib", "mpi4py", "pandas", "scipy")
+
+
+def base_params() -> dict:
+    with open(os.path.join(ROOT, "params.yaml"), "r", encoding="utf-8") as fh:
+        return yaml.safe_load(fh)
+
+
+def intermediates_of(n: int) -> list[int]:
+    """`n` strictly increasing bucket lengths, geometric from 8 to 200+."""
+    return sorted({int(round(8 * (25 ** (i / (n - 1))))) + i for i in range(n)})
+
+
+# =====================================================================
+# Cases
+# =====================================================================
+# Each generator yields (name, fn, number): `fn` is timed `number` times
+# in a row per repeat, and per-call times are reported.
+
+def cases_model(quick: bool) -> Iterator[Case]:
+    params = base_params()
+    for n in ((4, 12) if quick else (4, 12, 24, 48)):
+        cfg = {**params, "intermediates": intermediates_of(n)}
+        yield f"generate_gillespie_model[intermediates={n}]", lambda cfg=cfg: generate_gillespie_model(cfg), 5
+        antimony = generate_gillespie_model(cfg)[0]
+        yield f"export_sbml[intermediates={n}]", lambda a=antimony: export_sbml(a), 1
+
+
+def cases_simulation(quick: bool) -> Iterator[Case]:
+    params = base_params()
+    for n_slots in ((50, 200) if quick else (50, 200, 800)):
+        for regime, factors in REGIMES.items():
+            cfg = {**params, "N": n_slots}
+            for key, factor in factors.items():
+                cfg[key] = params[key] * factor
+            my_model, index_to_species, model_uid = generate_gillespie_model(cfg)
+            species_to_index = {v: k for k, v in index_to_species.items()}
+            uid = iter(range(10**6))
+
+            def fn(cfg=cfg, my_model=my_model, species_to_index=species_to_index, model_uid=model_uid, uid=uid):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    simulation.run(next(uid), model_uid, species_to_index, my_model, cfg)
+
+            yield f"simulation.run[N={n_slots},{regime}]", fn, 1
+
+
+def _trajectory(params: dict, species_to_index: dict, rng: np.random.Generator) -> np.ndarray:
+    s_total = simulation._empty_trajectory(len(species_to_index), params)
+    s_total[1:] = rng.integers(0, params["N"], size=s_total[1:].shape)
+    return s_total
+
+
+def cases_grouping(quick: bool) -> Iterator[Case]:
+    params = base_params()
+    _, index_to_species, _ = generate_gillespie_model(params)
+    species_to_index = {v: k for k, v in index_to_species.items()}
+    rng = np.random.default_rng(0)
+    s_total = _trajectory(params, species_to_index, rng)
+    intermediates = params["intermediates"]
+    yield "make_group", lambda: methods.make_group(s_total, species_to_index, intermediates), 20
+
+    n_cells = 200 if quick else 2000
+    batch = np.stack([_trajectory(params, species_to_index, rng) for _ in range(n_cells // 10)])
+    counts, time = batch[:, 1:].astype(np.int32), batch[0, 0]
+    operator = methods.grouping_operator(species_to_index, intermediates)
+
+    def grouped():
+        for name in operator["series"]:
+            methods.series(counts, time, operator, name)
+
+    yield f"series[cells={len(batch)}]", grouped, 1
+    yield f"make_groups[cells={len(batch)}]", lambda: methods.make_groups(counts, time, operator), 1
+
+    def batch_stats():
+        EnsembleStats().update_batch(methods.make_groups(counts, time, operator))
+
+    yield f"update_batch[cells={len(batch)}]", batch_stats, 1
+
+    group = methods.make_group(s_total, species_to_index, intermediates)
+    groups = [methods.Group(group.counts + i, group.time, group.operator) for i in range(n_cells)]
+    yield f"aggregate_groups[cells={n_cells}]", lambda: methods.aggregate_groups(groups), 1
+
+
+def cases_io(quick: bool) -> Iterator[Case]:
+    params = base_params()
+    _, index_to_species, _ = generate_gillespie_model(params)
+    species_to_index = {v: k for k, v in index_to_species.items()}
+    group = methods.make_group(
+        _trajectory(params, species_to_index, np.random.default_rng(0)),
+        species_to_index,
+        params["intermediates"],
+    )
+
+    tmp = tempfile.mkdtemp(prefix="genomatchgp-bench-")
+    n_cells = 20 if quick else 100
+    npz = records.NpzWriter(tmp)
+
+    def write():
+        for uid in range(n_cells):
+            npz.write(uid, group)
+
+    def read():
+        cells = []
+        for uid in range(n_cells):
+            with np.load(os.path.join(tmp, f"simulation_{uid}.npz")) as fh:
+                cells.append(methods.Group.from_record(fh))
+        return cells
+
+    yield f"npz_write[cells={n_cells}]", write, 1
+    write()
+    yield f"npz_read[cells={n_cells}]", read, 1
+
+
+def cases_startup(quick: bool) -> Iterator[Case]:
+    # Fresh interpreters; fails loudly if a heavy module sneaks back in
+    guard = (
+        "import sys; bad = [m for m in {heavy!r} if m in sys.modules]; "
+        "sys.exit(f'eagerly imported: {{bad}}' if bad else 0)"
+    ).format(heavy=HEAVY_MODULES)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([os.path.join(ROOT, "src"), os.environ.get("PYTHONPATH", "")])}
+
+    def run(code: str):
+        subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True)
+
+    # Interpreter start-up is noisy: average a few launches per sample
+    number = 1 if quick else 3
+    yield "startup[import commands]", lambda: run(f"import genomatchgp.commands; {guard}"), number
+    help_code = (
+        "import sys; from genomatchgp import main; sys.argv = ['genomatchgp', '--help']\n"
+        "try:\n    main.main()\nexcept SystemExit:\n    pass\n" + guard
+    )
+    yield "startup[--help]", lambda: run(help_code), number
+
+
+CASES = (cases_model, cases_simulation, cases_grouping, cases_io, cases_startup)
+
+
+# =====================================================================
+# Runner
+# =====================================================================
+
+def time_case(fn: Callable[[], object], number: int, repeat: int) -> dict:
+    """Per-call wall times of `fn` over `repeat` samples, after a warm-up."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return {
+        "median": statistics.median(samples),
+        "min":    min(samples),
+        "mean":   statistics.fmean(samples),
+        "stdev":  statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "-C", ROOT, "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit":   commit,
+        "python":   platform.python_version(),
+        "numpy":    np.__version__,
+        "machine":  platform.machine(),
+        "node":     platform.node(),
+        "time":     time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print the ratio to the baseline of every case; return the regressions."""
+    regressions = []
+    print(f"\n{'case':<52} {'baseline':>10} {'now':>10} {'ratio':>7}")
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<52} {'-':>10} {res['median']:>10.4g} {'new':>7}")
+            continue
+        ratio = res["median"] / base["median"]
+        flag = "  <-- slower" if ratio > tolerance else ""
+        print(f"{name:<52} {base['median']:>10.4g} {res['median']:>10.4g} {ratio:>7.2f}{flag}")
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    args = docopt(__doc__)
+    quick = args["--quick"]
+    repeat = min(int(args["--repeat"]), 2) if quick else int(args["--repeat"])
+    pattern = args["--filter"] or ""
+
+    results = {}
+    for cases in CASES:
+        for name, fn, number in cases(quick):
+            if pattern not in name:
+                continue
+            res = time_case(fn, number, repeat)
+            results[name] = res
+            print(f"{name:<52} median {res['median']:.4g} s  (min {res['min']:.4g} s)", flush=True)
+
+    with open(args["--output"], "w", encoding="utf-8") as fh:
+        json.dump({"meta": metadata(), "results": results}, fh, indent=2)
+    print(f"\nResults written to {args['--output']}")
+
+    if args["--baseline"]:
+        with open(args["--baseline"], "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+        regressions = compare(results, baseline, float(args["--tolerance"]))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond x{args['--tolerance']}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
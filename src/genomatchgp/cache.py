@@ -0,0 +1,200 @@
+"""
+Cross-run cache of per-cell results (`run --cache DIR`, `cache` command).
+
+A cell is fully determined by the model UID (a hash of the whole
+parameters file, seeds included), the engine and the cell index, so its
+`make_group` Group can be reused by any later run of the same model:
+growing an ensemble from 1k to 10k cells only simulates the 9k new ones.
+
+Layout, one directory per (model UID, engine):
+
+    <root>/<uid>-<engine>/block_<token>.npz
+        cells          (n_cells,) cell indices
+        counts         (n_cells, n_species, n_points) int32 species counts
+        time           (n_points,) time row, shared by the cells
+        species        species names, in row order
+        intermediates  length buckets of the model
+
+Blocks written by older versions, which stored grouped series instead of
+counts, are ignored.
+
+Blocks are written once, by the rank that simulated their cells, and
+never modified. A block's mtime is its last use: hits touch it, and
+`evict` removes the least recently used blocks until the cache fits its
+size cap.
+"""
+
+import glob
+import os
+import uuid
+from collections.abc import Callable
+from os.path import join
+
+import numpy as np
+
+from genomatchgp.methods import Group
+
+CACHE_ENV = "GENOMATCHGP_CACHE"
+DEFAULT_MAX_SIZE = "10G"
+
+_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(text: str) -> int:
+    """Bytes of a human size such as "500M" or "10G"."""
+    text = text.strip().upper().removesuffix("B")
+    unit = text[-1] if text and text[-1] in _UNITS else ""
+    return int(float(text[: len(text) - len(unit)]) * _UNITS[unit])
+
+
+def format_size(n: float) -> str:
+    for unit in ("B", "K", "M", "G"):
+        if n < 1024:
+            return f"{n:.1f}{unit}"
+        n /= 1024
+    return f"{n:.1f}T"
+
+
+class ResultCache:
+    """Cached cells of one (model UID, engine) pair."""
+
+    def __init__(self, root: str, model_uid: int, engine: str):
+        self.dir = join(root, f"{model_uid}-{engine}")
+        os.makedirs(self.dir, exist_ok=True)
+        # cell -> block path, as of construction; blocks written later
+        # by other ranks of the same run hold other cells anyway.
+        self.index: dict[int, str] = {}
+        for path in sorted(glob.glob(join(self.dir, "block_*.npz"))):
+            try:
+                with np.load(path) as npz:
+                    if "counts" not in npz.files:
+                        continue    # grouped-series block of an older version
+                    cells = npz["cells"]
+            except (OSError, ValueError, KeyError):
+                continue    # torn or foreign file, ignored
+            for c in cells:
+                self.index.setdefault(int(c), path)
+
+    def __contains__(self, cell: int) -> bool:
+        return cell in self.index
+
+    def load(self, cells: list[int]) -> list[Group]:
+        """`make_group` Groups of cached `cells`, in order."""
+        by_block: dict[str, list[int]] = {}
+        for c in cells:
+            by_block.setdefault(self.index[c], []).append(c)
+
+        out: dict[int, Group] = {}
+        for path, wanted in by_block.items():
+            with np.load(path) as npz:
+                arrays = {k: npz[k] for k in npz.files}
+            rows = {int(c): i for i, c in enumerate(arrays["cells"])}
+            for c in wanted:
+                out[c] = Group.from_record({**arrays, "counts": arrays["counts"][rows[c]]})
+            os.utime(path)
+        return [out[c] for c in cells]
+
+    def store(self, cells: list[int], groups: list[Group]) -> None:
+        """Write one block with the groups of `cells` (atomic)."""
+        if not cells:
+            return
+        record = groups[0].record()
+        record["counts"] = np.stack([g.counts for g in groups]).astype(np.int32)
+
+        path = join(self.dir, f"block_{uuid.uuid4().hex}.npz")
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez_compressed(fh, cells=np.array(cells, dtype=np.int64), **record)
+        os.replace(tmp, path)
+        for c in cells:
+            self.index.setdefault(int(c), path)
+
+
+def run_cached(
+        cache: ResultCache | None,
+        uids: list[int],
+        simulate: Callable[[list[int]], list[Group]],
+        writer=None,
+) -> list[Group]:
+    """
+    `make_group` Groups of `uids`: cached cells are read back (and passed
+    to `writer`), the others simulated by `simulate` (which writes them
+    itself) and added to the cache.
+    """
+
+    if cache is None:
+        return simulate(uids)
+
+    hits = [u for u in uids if u in cache]
+    misses = [u for u in uids if u not in cache]
+    groups = dict(zip(misses, simulate(misses))) if misses else {}
+    if misses:
+        cache.store(misses, [groups[u] for u in misses])
+    if hits:
+        for uid, group in zip(hits, cache.load(hits)):
+            groups[uid] = group
+            if writer is not None:
+                writer.write(uid, group)
+    return [groups[u] for u in uids]
+
+
+# =====================================================================
+# Inspection and eviction
+# =====================================================================
+
+def blocks(root: str) -> list[tuple[str, int, float]]:
+    """(path, size, last use) of every block, least recently used first."""
+    out = []
+    for path in glob.glob(join(root, "*", "block_*.npz")):
+        st = os.stat(path)
+        out.append((path, st.st_size, st.st_mtime))
+    return sorted(out, key=lambda b: b[2])
+
+
+def entries(root: str) -> list[dict]:
+    """One summary per (model UID, engine) directory, most recently used first."""
+    by_dir: dict[str, list[tuple[str, int, float]]] = {}
+    for b in blocks(root):
+        by_dir.setdefault(os.path.dirname(b[0]), []).append(b)
+
+    out = []
+    for entry, found in by_dir.items():
+        n_cells = 0
+        for path, _, _ in found:
+            with np.load(path) as npz:
+                n_cells += len(npz["cells"])
+        uid, engine = os.path.basename(entry).split("-", 1)
+        out.append({
+            "model":     uid,
+            "engine":    engine,
+            "cells":     n_cells,
+            "blocks":    len(found),
+            "size":      sum(b[1] for b in found),
+            "last used": max(b[2] for b in found),
+        })
+    return sorted(out, key=lambda e: -e["last used"])
+
+
+def evict(root: str, max_bytes: int, model: str | None = None) -> tuple[int, int]:
+    """
+    Remove least recently used blocks (of `model` only, if given) until
+    the whole cache fits in `max_bytes`. Returns (blocks, bytes) freed.
+    """
+    found = blocks(root)
+    total = sum(b[1] for b in found)
+    n_freed, freed = 0, 0
+    for path, size, _ in found:
+        if total <= max_bytes:
+            break
+        if model is not None and not os.path.basename(os.path.dirname(path)).startswith(f"{model}-"):
+            continue
+        os.remove(path)
+        total -= size
+        n_freed += 1
+        freed += size
+    return n_freed, freed
+
+
+def default_root() -> str | None:
+    """Cache directory from the environment, if any."""
+    return os.environ.get(CACHE_ENV) or None
@@ -1,22 +1,28 @@
-"""Commands for the genomatchgp package."""
+"""
+Commands for the genomatchgp package.
+
+Heavy dependencies (tellurium, mpi4py, matplotlib, pandas, scipy) are
+imported in the code paths that use them, so that `--help` and ranks
+that never plot or export do not pay for them.
+"""
 
 import os
 import shutil
+import time
 from os.path import join
 
 import numpy as np
 import yaml
 from docopt import docopt
-from mpi4py import MPI
 
-from genomatchgp import methods
-from genomatchgp.modelmaker import export_sbml, generate_gillespie_model
-from genomatchgp.simulation import run
+from genomatchgp import cache, inference, manifest, methods, parallel, plots, profiling, records, scheduler, sweep
+from genomatchgp.modelmaker import _stable_uid, build_reaction_network, export_sbml, generate_gillespie_model
+from genomatchgp.pool import WorkerPool, close_session, open_session, simulate_chunk
+from genomatchgp.simulation import ENGINES, load_model, run_cells, run_coupled, run_first_passage
+from genomatchgp.stats import EnsembleStats, load_stats, reduce_stats, relative_ci_width, save_moments
 
 
-COMM = MPI.COMM_WORLD
-RANK = COMM.Get_rank()
-SIZE = COMM.Get_size()
+MODES = ("simulate", "exact", "first-passage")
 
 
 class AbstractCommand:
@@ -36,7 +42,14 @@ class Run(AbstractCommand):
     Run a Gillespie batch.
 
     Usage:
-        run <parameters> [--cells CELLS] [--output OUTPUT]
+        run <parameters> [--cells CELLS] [--output OUTPUT] [--engine ENGINE] [--batch BATCH]
+            [--schedule SCHEDULE] [--chunk CHUNK] [--records FORMAT] [--mode MODE] [--stop-at TARGETS]
+            [--resume | --partial] [--checkpoint SECONDS] [--profile]
+            [--backend BACKEND] [--workers WORKERS]
+            [--target-ci REL] [--observables OBS] [--wave CELLS]
+            [--cache DIR] [--cache-max SIZE]
+            [--write-queue CELLS] [--codec CODEC] [--level LEVEL]
+            [--plot-workers WORKERS] [--plot-points POINTS] [--decimation METHOD]
 
     Arguments:
         <parameters>  Path to the parameters .yaml file
@@ -44,10 +57,120 @@ class Run(AbstractCommand):
     Options:
         -c CELLS, --cells CELLS     Number of cells (replicates) [default: 1]
         -o OUTPUT, --output OUTPUT  Output directory [default: ./output]
+        -e ENGINE, --engine ENGINE  Simulation engine: "tellurium", "numpy"
+                                    (batched SSA) or "grid" (exact sampling
+                                    at the output grid). Overrides the YAML
+                                    `engine` key (tellurium if neither is set).
+        -b BATCH, --batch BATCH     Cells simulated together by the native
+                                    engines. Overrides the YAML `batch_size`
+                                    key (256 if neither is set).
+        -s SCHEDULE, --schedule SCHEDULE
+                                    Distribution of cells over ranks,
+                                    "static" or "dynamic" [default: dynamic]
+        -k CHUNK, --chunk CHUNK     Cells claimed at once by a rank under
+                                    the dynamic schedule. Defaults to 1 for
+                                    tellurium and to the batch size otherwise
+                                    (always in first-passage mode).
+        -r FORMAT, --records FORMAT Per-cell records: "store" (one chunked
+                                    binary file per rank, memory-mappable),
+                                    "npz" (one file per cell), "events"
+                                    (reaction firings only, resampled on
+                                    read; numpy engine) or "none"
+                                    (ensemble statistics only) [default: store]
+        -m MODE, --mode MODE        "simulate" cells, compute the "exact"
+                                    ensemble mean and SD of every series
+                                    without sampling (the number of cells,
+                                    engine and scheduling options are then
+                                    ignored), or run "first-passage" cells
+                                    that only record event times and stop
+                                    early (native SSA) [default: simulate]
+        --stop-at TARGETS           First-passage targets (comma-separated,
+                                    see methods.first_passage_targets) that
+                                    must all occur for a cell to stop
+                                    [default: Recombined]
+        --resume                    Continue an interrupted run: simulate
+                                    only the cells missing from its manifest
+                                    and aggregate all completed cells.
+        --partial                   Aggregate and plot the cells completed
+                                    so far, without simulating.
+        --checkpoint SECONDS        Minimum time between two manifest
+                                    checkpoints of a rank [default: 60]
+        --profile                   Record per-cell, per-phase wall times on
+                                    every rank: Chrome trace in
+                                    profile/trace.json and a summary of
+                                    percentiles and rank imbalance.
+        --backend BACKEND           "mpi" (one process per rank, under
+                                    mpirun), "processes" (worker processes
+                                    on this node, no MPI needed) or "serial"
+                                    [default: mpi]
+        --workers WORKERS           Worker processes of the processes
+                                    backend (default: all cores). Only the
+                                    simulate mode is spread over workers,
+                                    and profiling covers the parent only.
+        --target-ci REL             Adaptive simulate mode: run cells in
+                                    waves until the 95% confidence interval
+                                    of every observable is narrower than REL
+                                    times its mean (full width, e.g. 0.05),
+                                    with --cells as the budget. Progress
+                                    goes to adaptive.csv.
+        --observables OBS           Observables of the adaptive mode,
+                                    comma-separated keys of
+                                    methods.summary_statistics
+                                    [default: Recombined final,DLC homologous integral]
+        --wave CELLS                Cells per wave of the adaptive mode
+                                    [default: 256]
+        --cache DIR                 Cross-run cache of cell results, keyed
+                                    by model UID, engine and cell: cached
+                                    cells are read back instead of being
+                                    simulated, new ones are added. Defaults
+                                    to $GENOMATCHGP_CACHE (no cache if unset).
+        --cache-max SIZE            Size cap of the cache; least recently
+                                    used results are evicted after the run
+                                    [default: 10G]
+        --write-queue CELLS         Records are compressed and written by a
+                                    background thread of every rank, behind
+                                    a queue of this many cells (the
+                                    simulation waits when it is full); 0
+                                    writes them in the simulation loop
+                                    [default: 64]
+        --codec CODEC               Compression of npz records: "zlib",
+                                    "bz2", "lzma" or "none" [default: zlib]
+        --level LEVEL               Compression level of the codec (zlib
+                                    0-9, bz2 1-9; codec default if unset)
+        --plot-workers WORKERS      Processes rendering the figures on rank
+                                    0; 1 renders them in-process [default: 4]
+        --plot-points POINTS        Points per plotted line after
+                                    decimation, 0 to draw every point
+                                    [default: 2000]
+        --decimation METHOD         Line decimation, "minmax" (envelope) or
+                                    "lttb" (largest triangle three buckets)
+                                    [default: minmax]
     """
 
     def execute(self):
 
+        self.backend = self.args["--backend"]
+        self.comm = comm = parallel.get_comm(self.backend)
+        rank = comm.Get_rank()
+
+        if self.args["--profile"]:
+            profiling.enable(comm)
+
+        self.outdir = None
+        self._execute()
+
+        if profiling.enabled() and self.outdir is not None:
+            if rank == 0:
+                os.makedirs(join(self.outdir, "profile"), exist_ok=True)
+            comm.Barrier()
+            profiling.write_trace(comm, join(self.outdir, "profile", "trace.json"))
+            profiling.print_summary(comm)
+
+    def _execute(self):
+
+        comm = self.comm
+        rank = comm.Get_rank()
+
         yaml_path = self.args["<parameters>"]
         outdir    = self.args["--output"]
         n_cells   = int(self.args["--cells"])
@@ -55,77 +178,923 @@ class Run(AbstractCommand):
         with open(yaml_path, "r", encoding="utf-8") as fh:
             data_yaml = yaml.safe_load(fh)
 
+        engine     = self.args["--engine"] or data_yaml.get("engine", "tellurium")
+        batch_size = int(self.args["--batch"] or data_yaml.get("batch_size", 256))
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}.")
+
+        schedule = self.args["--schedule"]
+        if schedule not in scheduler.SCHEDULES:
+            raise ValueError(f"Unknown schedule {schedule!r}, expected one of {scheduler.SCHEDULES}.")
+
+        mode = self.args["--mode"]
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}.")
+        # First-passage cells always run on the native SSA, in batches
+        native = engine != "tellurium" or mode == "first-passage"
+        chunk = int(self.args["--chunk"] or (batch_size if native else 1))
+
+        records_fmt = self.args["--records"]
+        if records_fmt not in records.RECORD_FORMATS:
+            raise ValueError(f"Unknown records format {records_fmt!r}, expected one of {records.RECORD_FORMATS}.")
+        if records_fmt == "events" and engine != "numpy":
+            raise ValueError(f"Event records need the numpy engine, got {engine!r}.")
+
+        codec = self.args["--codec"]
+        if codec not in records.CODECS:
+            raise ValueError(f"Unknown codec {codec!r}, expected one of {tuple(records.CODECS)}.")
+        self.writer_options = {
+            "codec":      codec,
+            "level":      int(self.args["--level"]) if self.args["--level"] is not None else None,
+            "queue_size": int(self.args["--write-queue"]),
+        }
+
+        decimation = self.args["--decimation"]
+        if decimation not in methods.DECIMATIONS:
+            raise ValueError(f"Unknown decimation {decimation!r}, expected one of {methods.DECIMATIONS}.")
+        self.plot_options = {
+            "workers":    int(self.args["--plot-workers"]),
+            "max_points": int(self.args["--plot-points"]) or None,
+            "decimation": decimation,
+        }
+
+        self.cache_root = self.args["--cache"] or cache.default_root()
+        if self.cache_root and records_fmt == "events":
+            raise ValueError("The result cache holds gridded species counts and cannot produce event records.")
+
+        target_ci = self.args["--target-ci"]
+        observables = []
+        if target_ci is not None:
+            target_ci = float(target_ci)
+            if mode != "simulate" or self.args["--resume"] or self.args["--partial"]:
+                raise ValueError("--target-ci only applies to fresh runs of the simulate mode.")
+            observables = [k.strip() for k in self.args["--observables"].split(",")]
+            known = [k for k in methods.observable_names(data_yaml["intermediates"]) if k != "t first recombination"]
+            unknown = [k for k in observables if k not in known]
+            if unknown:
+                raise ValueError(f"Unknown observables {unknown}, expected among {known}.")
+        wave = int(self.args["--wave"]) if target_ci is not None else max(n_cells, 1)
+
         # =============================================================
         # Rank 0 builds the model and writes shared artifacts; all
         # other ranks pick up the broadcast.
         # =============================================================
-        if RANK == 0:
-            my_model, index_to_species, model_uid = generate_gillespie_model(data_yaml)
-            outdir = os.path.join(outdir, str(model_uid))
-            os.makedirs(outdir, exist_ok=True)
+        with profiling.phase("setup"):
+            if rank == 0:
+                my_model, index_to_species, model_uid = generate_gillespie_model(data_yaml)
+                outdir = os.path.join(outdir, str(model_uid))
+                os.makedirs(outdir, exist_ok=True)
 
-            # Antimony source
-            with open(join(outdir, "model.txt"), "w", encoding="utf-8") as fh:
-                fh.write(my_model)
+                # Antimony source
+                with open(join(outdir, "model.txt"), "w", encoding="utf-8") as fh:
+                    fh.write(my_model)
 
-            # SBML XML (consumable by COPASI, libSBML, BioModels, ...)
-            try:
-                sbml_xml = export_sbml(my_model)
-                with open(join(outdir, "model.xml"), "w", encoding="utf-8") as fh:
-                    fh.write(sbml_xml)
-            except Exception as exc:  # pragma: no cover
-                print(f"[rank 0] SBML export skipped: {exc}", flush=True)
+                # SBML XML (consumable by COPASI, libSBML, BioModels, ...)
+                try:
+                    sbml_xml = export_sbml(my_model)
+                    with open(join(outdir, "model.xml"), "w", encoding="utf-8") as fh:
+                        fh.write(sbml_xml)
+                except Exception as exc:  # pragma: no cover
+                    print(f"[rank 0] SBML export skipped: {exc}", flush=True)
 
-            shutil.copy2(yaml_path, os.path.join(outdir, "params.yaml"))
-            species_to_index = {v: k for k, v in index_to_species.items()}
-        else:
-            my_model = None
-            model_uid = None
-            species_to_index = None
-            outdir = None
+                shutil.copy2(yaml_path, os.path.join(outdir, "params.yaml"))
+
+                # Compiled RoadRunner state, picked up by the other ranks
+                # (and by later runs) instead of re-parsing the Antimony.
+                if engine == "tellurium" and mode == "simulate":
+                    load_model(model_uid, my_model, outdir)
 
-        my_model         = COMM.bcast(my_model,         root=0)
-        model_uid        = COMM.bcast(model_uid,        root=0)
-        species_to_index = COMM.bcast(species_to_index, root=0)
-        outdir           = COMM.bcast(outdir,           root=0)
+                species_to_index = {v: k for k, v in index_to_species.items()}
+            else:
+                my_model = None
+                model_uid = None
+                species_to_index = None
+                outdir = None
+
+            my_model         = comm.bcast(my_model,         root=0)
+            model_uid        = comm.bcast(model_uid,        root=0)
+            species_to_index = comm.bcast(species_to_index, root=0)
+            outdir           = comm.bcast(outdir,           root=0)
+        self.outdir = outdir
+
+        # =============================================================
+        # Exact mode: closed-form moments on rank 0, no simulation
+        # =============================================================
+        if mode == "exact":
+            if rank == 0:
+                from genomatchgp.exact import exact_moments
+
+                mean, sd = exact_moments(build_reaction_network(data_yaml), species_to_index, data_yaml)
+                save_moments(join(outdir, "aggregate.npz"), 0, mean, sd)
+                plots_dir = join(outdir, "plots")
+                os.makedirs(plots_dir, exist_ok=True)
+                plots.plot_aggregate(mean, sd, plots_dir, **self.plot_options)
+            return
 
         # =============================================================
-        # Per-rank simulation slice
+        # First-passage mode: event times only, cells stop early
         # =============================================================
-        sims_per_rank = n_cells // SIZE
-        start_idx = RANK * sims_per_rank
-        end_idx   = (RANK + 1) * sims_per_rank if RANK != SIZE - 1 else n_cells
+        if mode == "first-passage":
+            self._first_passage(data_yaml, model_uid, outdir, n_cells, schedule, chunk, batch_size)
+            return
 
         records_dir = join(outdir, "records")
         plots_dir   = join(outdir, "plots")
-        if RANK == 0:
+        resume      = self.args["--resume"]
+
+        if self.args["--partial"]:
+            if rank == 0:
+                done, stats = manifest.load_manifest(outdir)
+                print(f"[rank 0] Aggregating {len(done)} completed cell(s)", flush=True)
+                os.makedirs(plots_dir, exist_ok=True)
+                stats.save(join(outdir, "aggregate.npz"))
+                plots.plot_aggregate(stats.mean, stats.sd(), plots_dir, **self.plot_options)
+            return
+
+        # =============================================================
+        # Fresh runs start from an empty manifest; resumed runs open a
+        # new attempt and skip the cells it already lists.
+        # =============================================================
+        if rank == 0:
             os.makedirs(records_dir, exist_ok=True)
             os.makedirs(plots_dir, exist_ok=True)
-        COMM.Barrier()
+            if resume:
+                attempt = manifest.next_attempt(outdir)
+                done, _ = manifest.load_manifest(outdir)
+                print(f"[rank 0] Resuming: {len(done)} cell(s) already completed", flush=True)
+            else:
+                attempt, done = 0, set()
+                records.clear_store(records_dir)
+                manifest.clear_manifest(outdir)
+        else:
+            attempt, done = None, None
+        attempt = comm.bcast(attempt, root=0)
+        done    = comm.bcast(done,    root=0)
+        todo = [c for c in range(n_cells) if c not in done]
+        if self.cache_root and rank == 0:
+            cached = cache.ResultCache(self.cache_root, model_uid, engine)
+            n_hits = sum(c in cached for c in todo)
+            print(f"[rank 0] Cache: {n_hits} of {len(todo)} cell(s) already cached", flush=True)
+
+        model = build_reaction_network(data_yaml) if engine != "tellurium" else my_model
+        self.interval = float(self.args["--checkpoint"])
+
+        # =============================================================
+        # Cells run in waves, all in the same attempt of the manifest:
+        # each rank keeps its record writer and checkpoint across the
+        # waves and checkpoints at every wave boundary. Without
+        # --target-ci there is a single wave; in adaptive mode, rank 0
+        # decides after every wave whether the observables have
+        # converged.
+        # =============================================================
+        session = self._open_attempt({
+            "engine": engine, "model_id": model_uid, "species_to_index": species_to_index,
+            "model": model, "params": data_yaml, "outdir": outdir, "records_fmt": records_fmt,
+            "attempt": attempt, "batch_size": batch_size, "interval": self.interval,
+            "observables": observables, "cache_root": self.cache_root,
+            "writer_options": self.writer_options,
+        }, chunk)
+        obs_stats = EnsembleStats()
+        progress = []
+        converged = False
+        for w, start in enumerate(range(0, len(todo), wave)):
+            wave_obs = self._simulate(session, todo[start:start + wave], schedule, chunk)
+            if target_ci is None:
+                continue
+
+            with profiling.phase("reduce"):
+                wave_obs = reduce_stats(comm, wave_obs)
+            if rank == 0:
+                obs_stats.merge(wave_obs)
+                width = relative_ci_width(obs_stats)
+                converged = all(width[k] <= target_ci for k in observables)
+                progress.append({
+                    "wave": w, "cells": obs_stats.n,
+                    **{f"{k} mean": float(obs_stats.mean[k]) for k in observables},
+                    **{f"{k} relative CI": float(width[k]) for k in observables},
+                })
+                print(
+                    f"[rank 0] Wave {w}: {obs_stats.n} cells, relative CI widths "
+                    + ", ".join(f"{k} {float(width[k]):.3g}" for k in observables),
+                    flush=True,
+                )
+            converged = comm.bcast(converged, root=0)
+            if converged:
+                break
+        stats = self._close_attempt(session)
 
-        for s in range(start_idx, end_idx):
-            run(s, model_uid, species_to_index, my_model, data_yaml, records_dir)
+        if target_ci is not None and rank == 0:
+            import pandas as pd
 
-        COMM.Barrier()
+            pd.DataFrame(progress).to_csv(join(outdir, "adaptive.csv"), index=False)
+            if converged:
+                print(f"[rank 0] Converged to {target_ci:g} after {obs_stats.n} cells", flush=True)
+            else:
+                print(
+                    f"[rank 0] Budget of {n_cells} cells exhausted before reaching {target_ci:g}",
+                    flush=True,
+                )
 
         # =============================================================
-        # Rank 0 collects, aggregates and plots
+        # Ranks reduce their statistics; rank 0 saves and plots
         # =============================================================
-        if RANK == 0:
-            all_results = []
-            for s in range(n_cells):
-                npz = np.load(join(records_dir, f"simulation_{s}.npz"))
-                all_results.append({f: npz[f] for f in npz.files})
+        with profiling.phase("reduce"):
+            stats = reduce_stats(comm, stats)
+        if rank == 0:
+            with profiling.phase("save"):
+                if attempt > 0:
+                    stats.merge(manifest.load_manifest(outdir, before=attempt)[1])
+                stats.save(join(outdir, "aggregate.npz"))
+            with profiling.phase("plot"):
+                plots.plot_aggregate(stats.mean, stats.sd(), plots_dir, **self.plot_options)
+            if self.cache_root:
+                n_blocks, freed = cache.evict(self.cache_root, cache.parse_size(self.args["--cache-max"]))
+                if n_blocks:
+                    print(f"[rank 0] Cache: evicted {n_blocks} block(s), {cache.format_size(freed)}", flush=True)
+
+    def _open_attempt(self, context: dict, chunk: int) -> dict:
+        """
+        State of this rank for one manifest attempt, kept across waves:
+        a `WorkerPool` for the processes backend, otherwise the record
+        writer, checkpoint, result cache and running statistics of the
+        rank. `context` is described in `pool.WorkerPool`.
+        """
+
+        if self.backend == "processes":
+            n_workers = int(self.args["--workers"] or os.cpu_count() or 1)
+            return {"pool": WorkerPool(n_workers, chunk, context)}
+
+        return open_session(context, self.comm.Get_rank())
+
+    def _simulate(self, session: dict, todo: list[int], schedule: str, chunk: int) -> EnsembleStats:
+        """
+        Simulate the wave of cells `todo` in the attempt `session` and
+        checkpoint it. Returns this rank's statistics of the scalar
+        observables of the wave (merged over the workers for the
+        processes backend); the series go to the session's statistics.
+        """
+
+        comm = self.comm
+
+        # Worker processes of this node
+        if "pool" in session:
+            with profiling.phase("pool"):
+                obs_stats, rows = session["pool"].run(todo)
+            scheduler.print_utilization(rows)
+            return obs_stats
+
+        # Per-rank simulation, cells handed out by the scheduler
+        obs_stats = EnsembleStats()
+        n_done, busy = 0, 0.0
+        t_loop = time.perf_counter()
+        for start_idx, end_idx in scheduler.chunks(schedule, comm, len(todo), chunk):
+            t0 = time.perf_counter()
+            simulate_chunk(session, todo[start_idx:end_idx], obs_stats)
+            busy += time.perf_counter() - t0
+            n_done += end_idx - start_idx
+
+        with profiling.phase("checkpoint"):
+            session["checkpoint"].commit(session["stats"], session["writer"], force=True)
+
+        with profiling.phase("barrier"):
+            comm.Barrier()
+        scheduler.utilization_report(comm, n_done, busy, time.perf_counter() - t_loop)
+        return obs_stats
+
+    def _close_attempt(self, session: dict) -> EnsembleStats:
+        """Close the attempt `session`; this rank's statistics of the series."""
+
+        if "pool" in session:
+            with profiling.phase("pool"):
+                return session["pool"].close()
+
+        return close_session(session)
+
+    def _first_passage(
+            self,
+            data_yaml: dict,
+            model_uid: int,
+            outdir: str,
+            n_cells: int,
+            schedule: str,
+            chunk: int,
+            batch_size: int,
+    ) -> None:
 
-            agg = methods.aggregate_groups(all_results)
-            methods.plot_trajectories(
-                agg,
-                os.path.join(plots_dir, "aggregated_trajectories.png"),
+        import pandas as pd
+
+        comm = self.comm
+        rank = comm.Get_rank()
+
+        targets = methods.first_passage_targets(data_yaml["intermediates"])
+        stop_at = [k.strip() for k in self.args["--stop-at"].split(",")]
+        unknown = [k for k in stop_at if k not in targets]
+        if unknown:
+            raise ValueError(f"Unknown first-passage targets {unknown}, expected among {list(targets)}.")
+
+        network = build_reaction_network(data_yaml)
+        rows = []
+        n_done, busy = 0, 0.0
+        t_loop = time.perf_counter()
+        for start_idx, end_idx in scheduler.chunks(schedule, comm, n_cells, chunk):
+            t0 = time.perf_counter()
+            for b in range(start_idx, end_idx, batch_size):
+                uids = list(range(b, min(b + batch_size, end_idx)))
+                rows.extend(run_first_passage(uids, model_uid, network, data_yaml, targets, stop_at))
+            busy += time.perf_counter() - t0
+            n_done += end_idx - start_idx
+
+        with profiling.phase("barrier"):
+            comm.Barrier()
+        scheduler.utilization_report(comm, n_done, busy, time.perf_counter() - t_loop)
+
+        with profiling.phase("gather"):
+            rows = comm.gather(rows, root=0)
+        if rank == 0:
+            events = pd.DataFrame([r for part in rows for r in part]).set_index("cell").sort_index()
+            events.to_csv(join(outdir, "first_passage.csv"))
+
+            grid = np.arange(0, data_yaml["timepoints"] + 1, data_yaml["every"], dtype=np.float64)
+            survival, curves = {}, {"time": grid}
+            for k in targets:
+                t = events[f"t {k}"].to_numpy()
+                survival[k] = methods.survival_curve(t, grid)
+                curves[f"S {k}"] = survival[k]
+                curves[f"h {k}"] = methods.hazard_rate(t, grid)
+            pd.DataFrame(curves).to_csv(join(outdir, "survival.csv"), index=False)
+
+            plots_dir = join(outdir, "plots")
+            os.makedirs(plots_dir, exist_ok=True)
+            plots.render(plots.survival_jobs(curves, plots_dir))
+            print(f"[rank 0] First-passage results written to {outdir}", flush=True)
+
+
+class Sweep(AbstractCommand):
+
+    """
+    Run a parameter sweep over keys of the parameters file, reusing the
+    loaded model across points.
+
+    Usage:
+        sweep <parameters> <spec> [--cells CELLS] [--output OUTPUT] [--engine ENGINE] [--batch BATCH]
+            [--chunk CHUNK]
+
+    Arguments:
+        <parameters>  Path to the base parameters .yaml file
+        <spec>        Path to the sweep specification .yaml file
+                      (grid, lhs or list, see genomatchgp.sweep)
+
+    Options:
+        -c CELLS, --cells CELLS     Number of cells (replicates) per point [default: 1]
+        -o OUTPUT, --output OUTPUT  Output directory [default: ./output]
+        -e ENGINE, --engine ENGINE  Simulation engine: "tellurium", "numpy"
+                                    (batched SSA) or "grid" (exact sampling
+                                    at the output grid). Overrides the YAML
+                                    `engine` key (tellurium if neither is set).
+        -b BATCH, --batch BATCH     Cells simulated together by the native
+                                    engines. Overrides the YAML `batch_size`
+                                    key (256 if neither is set).
+        -k CHUNK, --chunk CHUNK     (point, cell) tasks claimed at once by a
+                                    rank. Defaults to 1 for tellurium and to
+                                    the batch size otherwise.
+    """
+
+    def execute(self):
+
+        import pandas as pd
+
+        comm = parallel.get_comm("mpi")
+        rank = comm.Get_rank()
+
+        with open(self.args["<parameters>"], "r", encoding="utf-8") as fh:
+            base_yaml = yaml.safe_load(fh)
+        with open(self.args["<spec>"], "r", encoding="utf-8") as fh:
+            spec = yaml.safe_load(fh)
+
+        n_cells    = int(self.args["--cells"])
+        engine     = self.args["--engine"] or base_yaml.get("engine", "tellurium")
+        batch_size = int(self.args["--batch"] or base_yaml.get("batch_size", 256))
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}.")
+        chunk = int(self.args["--chunk"] or (batch_size if engine != "tellurium" else 1))
+
+        points  = sweep.expand_spec(spec)
+        configs = [{**base_yaml, **p} for p in points]
+        outdir  = join(self.args["--output"], f"sweep_{_stable_uid({'base': base_yaml, 'spec': spec})}")
+
+        # =============================================================
+        # One model per distinct structure. Model generation is cheap
+        # and deterministic, so every rank builds its own copy; rank 0
+        # compiles first so that the others load the persisted state.
+        # =============================================================
+        structures: dict[tuple, tuple[str, dict, int]] = {}
+        point_structure = []
+        for cfg in configs:
+            key = sweep.structure_of(cfg)
+            if key not in structures:
+                my_model, index_to_species, model_uid = generate_gillespie_model(cfg)
+                species_to_index = {v: k for k, v in index_to_species.items()}
+                structures[key] = (my_model, species_to_index, model_uid)
+            point_structure.append(key)
+
+        if rank == 0:
+            os.makedirs(outdir, exist_ok=True)
+            shutil.copy2(self.args["<parameters>"], join(outdir, "params.yaml"))
+            shutil.copy2(self.args["<spec>"], join(outdir, "sweep.yaml"))
+            if engine == "tellurium":
+                for my_model, _, model_uid in structures.values():
+                    load_model(model_uid, my_model, outdir)
+            print(
+                f"[rank 0] Sweep: {len(points)} points x {n_cells} cells, "
+                f"{len(structures)} model structure(s)",
+                flush=True,
             )
+        comm.Barrier()
 
-            for c in (0, 100, 200):
-                methods.plot_dlc(
-                    agg["DLC homologous"],
-                    c,
-                    os.path.join(plots_dir, f"aggregated_homologous_DLC_convo{c}.png"),
+        # =============================================================
+        # (point, cell) tasks handed out by the dynamic scheduler
+        # =============================================================
+        networks: dict[int, dict] = {}
+        rows = []
+        n_done, busy = 0, 0.0
+        t_loop = time.perf_counter()
+        for start_idx, end_idx in scheduler.dynamic_chunks(comm, len(points) * n_cells, chunk):
+            t0 = time.perf_counter()
+            for p in range(start_idx // n_cells, (end_idx - 1) // n_cells + 1):
+                lo = max(start_idx, p * n_cells) - p * n_cells
+                hi = min(end_idx, (p + 1) * n_cells) - p * n_cells
+                my_model, species_to_index, model_uid = structures[point_structure[p]]
+                if engine != "tellurium":
+                    model = networks.setdefault(p, build_reaction_network(configs[p]))
+                else:
+                    model = my_model
+                cells = list(range(lo, hi))
+                groups = run_cells(
+                    engine, cells, model_uid, species_to_index,
+                    model, configs[p], None, outdir, batch_size,
                 )
+                for c, g in zip(cells, groups):
+                    rows.append({"point": p, "cell": c, **methods.summary_statistics(g)})
+            busy += time.perf_counter() - t0
+            n_done += end_idx - start_idx
+
+        comm.Barrier()
+        scheduler.utilization_report(comm, n_done, busy, time.perf_counter() - t_loop)
+
+        # =============================================================
+        # Rank 0 writes the indexed results table and a per-point summary
+        # =============================================================
+        rows = comm.gather(rows, root=0)
+        if rank == 0:
+            points_df = pd.DataFrame(points)
+            points_df.index.name = "point"
+            results = (
+                pd.DataFrame([r for part in rows for r in part])
+                .join(points_df, on="point")
+                .set_index(["point", "cell"])
+                .sort_index()
+            )
+            results.to_csv(join(outdir, "sweep.csv"))
+
+            observables = [c for c in results.columns if c not in points_df.columns]
+            summary = results[observables].groupby(level="point").agg(["mean", "std"])
+            summary.columns = [f"{obs} {stat}" for obs, stat in summary.columns]
+            points_df.join(summary).to_csv(join(outdir, "sweep_summary.csv"))
+            print(f"[rank 0] Sweep results written to {outdir}", flush=True)
+
+
+class Sensitivity(AbstractCommand):
+
+    """
+    Compare perturbed parameter sets with a baseline on common random
+    numbers: every cell is simulated under each set with shared resection
+    delays and per-reaction-channel random streams (native next reaction
+    method), so paired differences need far fewer cells than independent
+    runs.
+
+    Usage:
+        sensitivity <parameters> --perturb SPEC [--step STEP] [--cells CELLS] [--output OUTPUT]
+            [--batch BATCH] [--chunk CHUNK]
+
+    Arguments:
+        <parameters>  Path to the baseline parameters .yaml file
+
+    Options:
+        -p SPEC, --perturb SPEC     Comma-separated perturbations, each
+                                    "key=value" or a bare "key" moved by
+                                    the relative step (e.g.
+                                    "kre=0.005,kon"). Perturbations must
+                                    keep the reaction channels of the
+                                    model (rates and N only).
+        --step STEP                 Relative step of bare keys [default: 0.05]
+        -c CELLS, --cells CELLS     Number of cells (replicates) [default: 256]
+        -o OUTPUT, --output OUTPUT  Output directory [default: ./output]
+        -b BATCH, --batch BATCH     Cells simulated together. Overrides the
+                                    YAML `batch_size` key (256 if neither
+                                    is set).
+        -k CHUNK, --chunk CHUNK     Cells claimed at once by a rank
+                                    (default: the batch size).
+    """
+
+    def execute(self):
+
+        import pandas as pd
+
+        comm = parallel.get_comm("mpi")
+        rank = comm.Get_rank()
+
+        with open(self.args["<parameters>"], "r", encoding="utf-8") as fh:
+            base_yaml = yaml.safe_load(fh)
+
+        n_cells    = int(self.args["--cells"])
+        batch_size = int(self.args["--batch"] or base_yaml.get("batch_size", 256))
+        chunk      = int(self.args["--chunk"] or batch_size)
+        step       = float(self.args["--step"])
+
+        # =============================================================
+        # Baseline first, then one set per perturbation
+        # =============================================================
+        perturbations = []
+        for item in self.args["--perturb"].split(","):
+            key, _, value = item.strip().partition("=")
+            if not isinstance(base_yaml.get(key), (int, float)):
+                raise ValueError(f"Cannot perturb {key!r}: not a numeric key of the parameters file.")
+            value = float(value) if value else base_yaml[key] * (1 + step)
+            if value == base_yaml[key]:
+                raise ValueError(f"Perturbation of {key!r} leaves it at its baseline value {value}.")
+            perturbations.append((key, value))
+
+        configs = [base_yaml] + [{**base_yaml, key: value} for key, value in perturbations]
+        networks = [build_reaction_network(cfg) for cfg in configs]
+        for (key, _), network in zip(perturbations, networks[1:]):
+            same = (
+                network["species"] == networks[0]["species"]
+                and np.array_equal(network["reactants"], networks[0]["reactants"])
+                and np.array_equal(network["products"], networks[0]["products"])
+            )
+            if not same:
+                raise ValueError(f"Perturbing {key!r} changes the reaction channels; sets cannot be coupled.")
+
+        _, index_to_species, model_uid = generate_gillespie_model(base_yaml)
+        species_to_index = {v: k for k, v in index_to_species.items()}
+        outdir = join(
+            self.args["--output"],
+            f"sensitivity_{_stable_uid({'base': base_yaml, 'perturb': perturbations})}",
+        )
+        if rank == 0:
+            os.makedirs(outdir, exist_ok=True)
+            shutil.copy2(self.args["<parameters>"], join(outdir, "params.yaml"))
+            print(
+                f"[rank 0] Sensitivity: {len(perturbations)} perturbation(s) x {n_cells} coupled cells",
+                flush=True,
+            )
+
+        # =============================================================
+        # Cells handed out by the dynamic scheduler; each batch runs
+        # under every set
+        # =============================================================
+        rows = []
+        n_done, busy = 0, 0.0
+        t_loop = time.perf_counter()
+        for start_idx, end_idx in scheduler.dynamic_chunks(comm, n_cells, chunk):
+            t0 = time.perf_counter()
+            for b in range(start_idx, end_idx, batch_size):
+                uids = list(range(b, min(b + batch_size, end_idx)))
+                per_set = run_coupled(uids, model_uid, species_to_index, networks, configs)
+                for i, groups in enumerate(per_set):
+                    for uid, g in zip(uids, groups):
+                        rows.append({"set": i, "cell": uid, **methods.summary_statistics(g)})
+            busy += time.perf_counter() - t0
+            n_done += end_idx - start_idx
+
+        comm.Barrier()
+        scheduler.utilization_report(comm, n_done, busy, time.perf_counter() - t_loop)
+
+        # =============================================================
+        # Rank 0 pairs the cells and writes differences and sensitivities
+        # =============================================================
+        rows = comm.gather(rows, root=0)
+        if rank == 0:
+            cells = pd.DataFrame([r for part in rows for r in part]).set_index(["set", "cell"]).sort_index()
+            cells.to_csv(join(outdir, "sensitivity_cells.csv"))
+
+            baseline = cells.loc[0]
+            table = []
+            for i, (key, value) in enumerate(perturbations, start=1):
+                for obs in cells.columns:
+                    row = methods.paired_difference(baseline[obs].to_numpy(), cells.loc[i][obs].to_numpy())
+                    d_theta = value - base_yaml[key]
+                    with np.errstate(divide="ignore", invalid="ignore"):
+                        elasticity = np.divide(row["difference"] * base_yaml[key], d_theta * row["baseline mean"])
+                    table.append({
+                        "key": key, "baseline": base_yaml[key], "value": value, "observable": obs,
+                        **row,
+                        "sensitivity":    row["difference"] / d_theta,
+                        "sensitivity SE": row["SE"] / abs(d_theta),
+                        "elasticity":     elasticity,
+                    })
+            table = pd.DataFrame(table)
+            table.to_csv(join(outdir, "sensitivity.csv"), index=False)
+            with pd.option_context("display.width", 200, "display.max_columns", 20):
+                print(table[["key", "observable", "difference", "SE", "variance reduction", "sensitivity"]])
+            print(f"[rank 0] Sensitivity results written to {outdir}", flush=True)
+
+
+class Infer(AbstractCommand):
+
+    """
+    Infer keys of the parameters file from reference curves by ABC-SMC
+    (see genomatchgp.inference for the spec format). Particles of a
+    round are evaluated concurrently, their cells handed out to ranks by
+    the dynamic scheduler; every population is checkpointed.
+
+    Usage:
+        infer <parameters> <spec> [--cells CELLS] [--output OUTPUT] [--engine ENGINE] [--batch BATCH]
+            [--chunk CHUNK] [--resume]
+
+    Arguments:
+        <parameters>  Path to the base parameters .yaml file
+        <spec>        Path to the inference specification .yaml file
+
+    Options:
+        -c CELLS, --cells CELLS     Cells (replicates) per particle [default: 32]
+        -o OUTPUT, --output OUTPUT  Output directory [default: ./output]
+        -e ENGINE, --engine ENGINE  Simulation engine: "tellurium", "numpy"
+                                    or "grid". Overrides the YAML `engine`
+                                    key (tellurium if neither is set).
+        -b BATCH, --batch BATCH     Cells simulated together by the native
+                                    engines. Overrides the YAML `batch_size`
+                                    key (256 if neither is set).
+        -k CHUNK, --chunk CHUNK     (particle, cell) tasks claimed at once
+                                    by a rank (default: the cells of one
+                                    particle).
+        --resume                    Continue from the last checkpointed
+                                    population.
+    """
+
+    def execute(self):
+
+        import pandas as pd
+
+        self.comm = comm = parallel.get_comm("mpi")
+        rank = comm.Get_rank()
+
+        with open(self.args["<parameters>"], "r", encoding="utf-8") as fh:
+            base_yaml = yaml.safe_load(fh)
+        with open(self.args["<spec>"], "r", encoding="utf-8") as fh:
+            spec = yaml.safe_load(fh)
+
+        engine = self.args["--engine"] or base_yaml.get("engine", "tellurium")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}.")
+        if engine == "tellurium" and base_yaml.get("fold"):
+            raise ValueError("A folded model cannot be reparameterized in place; use a native engine or fold: false.")
+        self.engine     = engine
+        self.base_yaml  = base_yaml
+        self.n_cells    = int(self.args["--cells"])
+        self.batch_size = int(self.args["--batch"] or base_yaml.get("batch_size", 256))
+        self.chunk      = int(self.args["--chunk"] or self.n_cells)
+
+        keys, priors = inference.parse_priors(spec)
+        n_particles  = int(spec.get("particles", 100))
+        generations  = int(spec.get("generations", 5))
+        quantile     = float(spec.get("quantile", 0.5))
+        target_path  = join(os.path.dirname(os.path.abspath(self.args["<spec>"])), spec["target"])
+        self.target  = inference.load_target(target_path, spec.get("series"))
+
+        # Particles share the model structure of the base file, except
+        # for the species a folded network drops (see `_evaluate`)
+        self.my_model, index_to_species, self.model_uid = generate_gillespie_model(base_yaml)
+        self.species_to_index = {v: k for k, v in index_to_species.items()}
+        # More generations can be added to a run with --resume
+        run_spec = {k: v for k, v in spec.items() if k != "generations"}
+        outdir = join(self.args["--output"], f"infer_{_stable_uid({'base': base_yaml, 'spec': run_spec})}")
+        self.outdir = outdir
+        log_path = join(outdir, "abc_log.csv")
+
+        # =============================================================
+        # Fresh start or last checkpointed population
+        # =============================================================
+        start, evaluated = 0, 0
+        theta = weights = distances = None
+        log = []
+        if rank == 0:
+            os.makedirs(outdir, exist_ok=True)
+            shutil.copy2(self.args["<parameters>"], join(outdir, "params.yaml"))
+            shutil.copy2(self.args["<spec>"], join(outdir, "infer.yaml"))
+            if engine == "tellurium":
+                load_model(self.model_uid, self.my_model, outdir)
+            if self.args["--resume"] and os.path.exists(log_path):
+                log = pd.read_csv(log_path).to_dict("records")
+                start = int(log[-1]["generation"]) + 1
+                evaluated = int(sum(row["proposed"] for row in log))
+                theta, weights, distances = inference.load_population(
+                    join(outdir, f"population_{start - 1}.csv"), keys, priors,
+                )
+                print(f"[rank 0] Resuming ABC-SMC at generation {start}", flush=True)
+        start     = comm.bcast(start,     root=0)
+        evaluated = comm.bcast(evaluated, root=0)
+        comm.Barrier()
+
+        for gen in range(start, generations):
+            # =========================================================
+            # Rank 0 proposes a round of particles, all ranks simulate
+            # them, rank 0 keeps those within the tolerance.
+            # =========================================================
+            if rank == 0:
+                rng = np.random.default_rng([spec.get("seed", 0), gen])
+                epsilon = np.inf if gen == 0 else float(np.quantile(distances, quantile))
+                cov = inference.kernel_covariance(theta, weights) if gen > 0 else None
+                accepted, accepted_d = [], []
+            proposed, done = 0, False
+            while not done:
+                if rank == 0:
+                    if gen == 0:
+                        batch = inference.sample_prior(priors, n_particles, rng)
+                    else:
+                        batch = inference.propose(theta, weights, cov, priors, n_particles, rng)
+                else:
+                    batch = None
+                batch = comm.bcast(batch, root=0)
+                d = self._evaluate(inference.to_values(keys, priors, batch), evaluated * self.n_cells)
+                evaluated += len(batch)
+                proposed += len(batch)
+                if rank == 0:
+                    keep = d <= epsilon
+                    accepted.extend(batch[keep])
+                    accepted_d.extend(d[keep])
+                    done = len(accepted) >= n_particles
+                    print(
+                        f"[rank 0] Generation {gen}: {len(accepted)}/{n_particles} accepted "
+                        f"after {proposed} proposals (epsilon {epsilon:.4g})",
+                        flush=True,
+                    )
+                done = comm.bcast(done, root=0)
+
+            # =========================================================
+            # Weights, checkpoint and log of the new population
+            # =========================================================
+            if rank == 0:
+                new_theta = np.array(accepted[:n_particles])
+                new_d = np.array(accepted_d[:n_particles])
+                if gen == 0:
+                    new_w = np.full(n_particles, 1.0 / n_particles)
+                else:
+                    new_w = inference.importance_weights(new_theta, theta, weights, cov, priors)
+                theta, weights, distances = new_theta, new_w, new_d
+                inference.save_population(
+                    join(outdir, f"population_{gen}.csv"), keys, priors, theta, weights, distances,
+                )
+
+                values = pd.DataFrame(inference.to_values(keys, priors, theta))
+                mean = values.mul(weights, axis=0).sum()
+                sd = np.sqrt(((values - mean) ** 2).mul(weights, axis=0).sum())
+                log.append({
+                    "generation": gen, "epsilon": epsilon, "proposed": proposed,
+                    "acceptance": n_particles / proposed,
+                    "ESS": inference.effective_sample_size(weights),
+                    **{f"{k} mean": mean[k] for k in keys},
+                    **{f"{k} sd": sd[k] for k in keys},
+                })
+                pd.DataFrame(log).to_csv(log_path, index=False)
+                print(
+                    f"[rank 0] Generation {gen} done: "
+                    + ", ".join(f"{k} = {mean[k]:.4g} +/- {sd[k]:.2g}" for k in keys),
+                    flush=True,
+                )
+
+        if rank == 0:
+            print(f"[rank 0] ABC-SMC results written to {outdir}", flush=True)
+
+    def _evaluate(self, overrides: list[dict], uid_base: int) -> np.ndarray | None:
+        """
+        Simulate `n_cells` cells per particle and return, on rank 0, the
+        distance of every particle's ensemble mean to the target.
+        """
+
+        comm = self.comm
+        n_cells = self.n_cells
+        series = list(self.target)
+
+        stats: dict[int, EnsembleStats] = {}
+        for start_idx, end_idx in scheduler.dynamic_chunks(comm, len(overrides) * n_cells, self.chunk):
+            for p in range(start_idx // n_cells, (end_idx - 1) // n_cells + 1):
+                lo = max(start_idx, p * n_cells) - p * n_cells
+                hi = min(end_idx, (p + 1) * n_cells) - p * n_cells
+                cfg = {**self.base_yaml, **overrides[p]}
+                if self.engine != "tellurium":
+                    # Folding can drop other species for this particle's
+                    # rates, so read its rows by its own species list
+                    model = build_reaction_network(cfg)
+                    species_to_index = {"Time": 0, **{name: i + 1 for i, name in enumerate(model["species"])}}
+                else:
+                    model, species_to_index = self.my_model, self.species_to_index
+                uids = [uid_base + p * n_cells + c for c in range(lo, hi)]
+                groups = run_cells(
+                    self.engine, uids, self.model_uid, species_to_index,
+                    model, cfg, None, self.outdir, self.batch_size,
+                )
+                batch = methods.make_groups(np.stack([g.counts for g in groups]), groups[0].time, groups[0].operator)
+                stats.setdefault(p, EnsembleStats()).update_batch({k: batch[k] for k in series})
+
+        parts = comm.gather(stats, root=0)
+        if comm.Get_rank() != 0:
+            return None
+        merged: dict[int, EnsembleStats] = {}
+        for part in parts:
+            for p, st in part.items():
+                merged.setdefault(p, EnsembleStats()).merge(st)
+        return np.array([inference.distance(merged[p].mean, self.target) for p in range(len(overrides))])
+
+
+class Cache(AbstractCommand):
+
+    """
+    Inspect and prune the cross-run result cache of `run --cache`.
+
+    Usage:
+        cache list [--dir DIR]
+        cache prune [--dir DIR] [--max-size SIZE] [--model UID]
+        cache clear [--dir DIR] [--model UID]
+
+    Options:
+        -d DIR, --dir DIR           Cache directory (default:
+                                    $GENOMATCHGP_CACHE)
+        -s SIZE, --max-size SIZE    Evict least recently used results until
+                                    the cache fits in SIZE [default: 10G]
+        -m UID, --model UID         Only evict results of this model UID
+    """
+
+    def execute(self):
+
+        root = self.args["--dir"] or cache.default_root()
+        if not root:
+            raise ValueError(f"No cache directory: pass --dir or set ${cache.CACHE_ENV}.")
+        if not os.path.isdir(root):
+            print(f"No cache at {root}")
+            return
+
+        if self.args["list"]:
+            found = cache.entries(root)
+            print(f"{'model':>12} {'engine':<10} {'cells':>9} {'blocks':>7} {'size':>9}  last used")
+            for e in found:
+                last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["last used"]))
+                print(
+                    f"{e['model']:>12} {e['engine']:<10} {e['cells']:>9} {e['blocks']:>7} "
+                    f"{cache.format_size(e['size']):>9}  {last_used}"
+                )
+            print(f"Total {cache.format_size(sum(e['size'] for e in found))} in {root}")
+            return
+
+        max_bytes = 0 if self.args["clear"] else cache.parse_size(self.args["--max-size"])
+        n_blocks, freed = cache.evict(root, max_bytes, self.args["--model"])
+        print(f"Evicted {n_blocks} block(s), {cache.format_size(freed)}")
+
+
+class Plot(AbstractCommand):
+
+    """
+    Regenerate the figures of a run from its stored aggregates, without
+    reading its records.
+
+    Usage:
+        plot <outdir> [--plots DIR] [--workers WORKERS] [--points POINTS] [--decimation METHOD]
+
+    Arguments:
+        <outdir>  Output directory of a run (the model UID directory,
+                  holding aggregate.npz and/or survival.csv)
+
+    Options:
+        --plots DIR                 Figures directory (default: <outdir>/plots)
+        -w WORKERS, --workers WORKERS
+                                    Rendering processes [default: 4]
+        -p POINTS, --points POINTS  Points per plotted line after
+                                    decimation, 0 to draw every point
+                                    [default: 2000]
+        -d METHOD, --decimation METHOD
+                                    Line decimation, "minmax" or "lttb"
+                                    [default: minmax]
+    """
+
+    def execute(self):
+
+        outdir = self.args["<outdir>"]
+        plots_dir = self.args["--plots"] or join(outdir, "plots")
+        decimation = self.args["--decimation"]
+        if decimation not in methods.DECIMATIONS:
+            raise ValueError(f"Unknown decimation {decimation!r}, expected one of {methods.DECIMATIONS}.")
+        max_points = int(self.args["--points"]) or None
+
+        jobs = []
+        if os.path.exists(join(outdir, "aggregate.npz")):
+            _, mean, sd = load_stats(join(outdir, "aggregate.npz"))
+            jobs += plots.aggregate_jobs(mean, sd, plots_dir, max_points, decimation)
+        if os.path.exists(join(outdir, "survival.csv")):
+            jobs += plots.survival_jobs(plots.load_survival(join(outdir, "survival.csv")), plots_dir)
+        if not jobs:
+            raise ValueError(f"Nothing to plot in {outdir}: no aggregate.npz or survival.csv.")
+
+        os.makedirs(plots_dir, exist_ok=True)
+        t0 = time.perf_counter()
+        plots.render(jobs, int(self.args["--workers"]))
+        print(f"{len(jobs)} figure(s) written to {plots_dir} in {time.perf_counter() - t0:.1f} s")
@@ -0,0 +1,476 @@
+"""
+Native NumPy engines.
+
+Both engines simulate a whole batch of cells at once, on the reaction
+network returned by `modelmaker.build_reaction_network`. Tellurium /
+RoadRunner is not involved: no Antimony parsing, no model compilation,
+and the per-step interpreter overhead is paid once per batch instead of
+once per cell.
+
+    - ssa_direct_batch   direct-method SSA. Each iteration advances every
+                         still-running cell by exactly one reaction
+                         firing; cells that have filled their output
+                         grid drop out of the active set.
+    - grid_sample_batch  exact sampling at the output grid through the
+                         single-slot transition matrix, independent of
+                         the number of firings.
+
+`first_passage_batch` is a variant of the direct method that records
+first-entry times of target events instead of trajectories, and
+`ssa_coupled_batch` a next-reaction-method SSA whose randomness is tied
+to reaction channels, for common-random-numbers comparisons.
+"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from genomatchgp.streams import CellStreams
+
+
+def ssa_direct_batch(
+        network: dict,
+        t0: np.ndarray,
+        sample_times: np.ndarray,
+        streams: "CellStreams",
+) -> np.ndarray:
+    """
+    Direct-method SSA on a batch of independent cells.
+
+    Every cell starts in `network["x0"]` at its own time `t0[c]` and is
+    observed at `sample_times[c, :]`. Samples taken before `t0[c]`
+    report the initial state, which is exactly the resection-delay
+    convention used by `simulation.run` (S = N, everything else 0).
+
+    Parameters
+    ----------
+    network : dict
+        Output of `modelmaker.build_reaction_network`.
+    t0 : (n_cells,) array
+        Start of the chemistry for each cell.
+    sample_times : (n_cells, n_points) array
+        Non-decreasing observation times for each cell.
+    streams : streams.CellStreams
+        Random streams of the cells, in batch order. A cell only draws
+        from its own stream, so its trajectory does not depend on the
+        other cells of the batch.
+
+    Returns
+    -------
+    states : (n_cells, n_species, n_points) int array
+        Species counts at each sample time, species in network order
+        (no Time row).
+    """
+
+    reactants = network["reactants"]
+    products  = network["products"]
+    rates     = network["rates"]
+
+    n_cells, n_points = sample_times.shape
+    n_species = len(network["species"])
+
+    x = np.broadcast_to(network["x0"], (n_cells, n_species)).copy()
+    t = np.asarray(t0, dtype=np.float64).copy()
+    states = np.empty((n_cells, n_species, n_points), dtype=np.int64)
+
+    # Samples before t0 see the initial state
+    gidx = (sample_times < t[:, None]).sum(axis=1)
+    for c in np.flatnonzero(gidx):
+        states[c, :, :gidx[c]] = x[c, :, None]
+
+    active = np.flatnonzero(gidx < n_points)
+    while active.size:
+        xa = x[active]
+        props = xa[:, reactants] * rates
+        cum = np.cumsum(props, axis=1)
+        a0 = cum[:, -1]
+
+        u = 1.0 - streams.uniforms(active, 2)    # in (0, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tau = np.where(a0 > 0, -np.log(u[0]) / a0, np.inf)
+        t_new = t[active] + tau
+
+        # The pre-firing state holds on [t, t_new): record every sample
+        # that falls in this window.
+        _record(states, sample_times, gidx, active, xa, t_new)
+
+        # Fire one reaction per cell (absorbed cells have nothing to fire)
+        live = a0 > 0
+        cells = active[live]
+        j = (cum[live] < (u[1, live] * a0[live])[:, None]).sum(axis=1)
+        x[cells, reactants[j]] -= 1
+        x[cells, products[j]] += 1
+        t[active] = t_new
+
+        active = active[gidx[active] < n_points]
+
+    return states
+
+
+def _record(
+        states: np.ndarray,
+        sample_times: np.ndarray,
+        gidx: np.ndarray,
+        active: np.ndarray,
+        xa: np.ndarray,
+        t_new: np.ndarray,
+) -> None:
+    """Write `xa` into every pending sample slot earlier than `t_new`."""
+
+    n_points = sample_times.shape[1]
+
+    # Absorbed cells (a0 == 0): the state is frozen, fill the rest once.
+    frozen = np.isinf(t_new)
+    for k in np.flatnonzero(frozen):
+        c = active[k]
+        states[c, :, gidx[c]:] = xa[k, :, None]
+        gidx[c] = n_points
+
+    pending = np.flatnonzero(~frozen)
+    while pending.size:
+        cells = active[pending]
+        g = gidx[cells]
+        hit = g < n_points
+        hit[hit] = sample_times[cells[hit], g[hit]] < t_new[pending[hit]]
+        if not hit.any():
+            return
+        pending, cells, g = pending[hit], cells[hit], g[hit]
+        states[cells, :, g] = xa[pending]
+        gidx[cells] = g + 1
+
+
+# =====================================================================
+# Exact grid sampling
+# =====================================================================
+# Every reaction is first order, so the N filament slots are independent
+# copies of one small CTMC over the species (S, HM_L, HT_L, DHM_L, DHT_L,
+# R). Over a grid step dt, a slot in state i moves to j with probability
+# P(dt)[i, j] = expm(Q dt)[i, j], and the population of the next sample
+# is the sum of one multinomial draw per occupied state. This is exact in
+# distribution at the sample times and its cost does not depend on the
+# number of reaction firings.
+
+def slot_generator(network: dict) -> np.ndarray:
+    """Generator matrix Q of the single-slot CTMC (rows sum to 0)."""
+    n_species = len(network["species"])
+    Q = np.zeros((n_species, n_species), dtype=np.float64)
+    np.add.at(Q, (network["reactants"], network["products"]), network["rates"])
+    Q[np.diag_indices(n_species)] -= Q.sum(axis=1)
+    return Q
+
+
+def grid_sample_batch(
+        network: dict,
+        t0: np.ndarray,
+        sample_times: np.ndarray,
+        streams: "CellStreams",
+) -> np.ndarray:
+    """
+    Exact sampling of a batch of cells at `sample_times`, same contract
+    as `ssa_direct_batch`.
+
+    Transition matrices are computed once per distinct grid step and
+    cached, so a uniform grid costs a single matrix exponential.
+    """
+
+    from scipy.linalg import expm
+
+    Q = slot_generator(network)
+    cache: dict[float, np.ndarray] = {}
+
+    def transition(dt: float) -> np.ndarray:
+        if dt not in cache:
+            P = np.clip(expm(Q * dt), 0.0, None)
+            cache[dt] = P / P.sum(axis=1, keepdims=True)
+        return cache[dt]
+
+    n_cells, n_points = sample_times.shape
+    n_species = len(network["species"])
+
+    x = np.broadcast_to(network["x0"], (n_cells, n_species)).copy()
+    states = np.empty((n_cells, n_species, n_points), dtype=np.int64)
+    started = sample_times[:, 0] >= t0
+    states[:, :, 0] = x
+
+    for k in range(1, n_points):
+        # Samples before t0 keep the initial state; the first sample at
+        # or after t0 evolves from t0, the following ones from the
+        # previous sample.
+        in_dyn = sample_times[:, k] >= t0
+        cells = np.flatnonzero(in_dyn)
+        if cells.size:
+            t_prev = np.where(started[cells], sample_times[cells, k - 1], t0[cells])
+            dts = np.round(sample_times[cells, k] - t_prev, 9)
+            uniq, inv = np.unique(dts, return_inverse=True)
+            P = np.stack([transition(float(dt)) for dt in uniq])[inv]
+            for c, P_c in zip(cells, P):
+                x[c] = streams.generator(c).multinomial(x[c], P_c).sum(axis=0)
+        started |= in_dyn
+        states[:, :, k] = x
+
+    return states
+
+
+# =====================================================================
+# First passage
+# =====================================================================
+
+def first_passage_batch(
+        network: dict,
+        t0: np.ndarray,
+        t_end: float,
+        members: np.ndarray,
+        stop: np.ndarray,
+        streams: "CellStreams",
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Direct-method SSA that records first-entry times of target events
+    and stops each cell as soon as all `stop` targets have occurred.
+
+    A target is a set of species; it occurs the first time a reaction
+    produces one of them. Nothing is sampled on a grid, so a cell costs
+    only the firings up to its stopping time.
+
+    Parameters
+    ----------
+    network : dict
+        Output of `modelmaker.build_reaction_network`.
+    t0 : (n_cells,) array
+        Start of the chemistry for each cell.
+    t_end : float
+        End of the observation window; targets not reached by then are
+        right-censored.
+    members : (n_species, n_targets) bool array
+        Species making up each target.
+    stop : (n_targets,) bool array
+        Targets that must all have occurred for a cell to stop.
+    streams : streams.CellStreams
+        Random streams of the cells, in batch order. A cell only draws
+        from its own stream, so its trajectory does not depend on the
+        other cells of the batch.
+
+    Returns
+    -------
+    times : (n_cells, n_targets) float array
+        First-entry time of each target, NaN if censored.
+    first : (n_cells, n_targets) int array
+        Reaction that made that first entry (index into the network
+        arrays), -1 if censored.
+    """
+
+    reactants = network["reactants"]
+    products  = network["products"]
+    rates     = network["rates"]
+
+    n_cells   = len(t0)
+    n_species = len(network["species"])
+    n_targets = members.shape[1]
+
+    x = np.broadcast_to(network["x0"], (n_cells, n_species)).copy()
+    t = np.asarray(t0, dtype=np.float64).copy()
+    times = np.full((n_cells, n_targets), np.nan)
+    first = np.full((n_cells, n_targets), -1, dtype=np.int64)
+
+    active = np.flatnonzero(t < t_end)
+    while active.size:
+        props = x[active][:, reactants] * rates
+        cum = np.cumsum(props, axis=1)
+        a0 = cum[:, -1]
+
+        u = 1.0 - streams.uniforms(active, 2)    # in (0, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tau = np.where(a0 > 0, -np.log(u[0]) / a0, np.inf)
+        t_new = t[active] + tau
+
+        live = t_new <= t_end
+        cells, t_new = active[live], t_new[live]
+        j = (cum[live] < (u[1, live] * a0[live])[:, None]).sum(axis=1)
+        x[cells, reactants[j]] -= 1
+        x[cells, products[j]] += 1
+        t[cells] = t_new
+
+        new = members[products[j]] & np.isnan(times[cells])
+        times[cells] = np.where(new, t_new[:, None], times[cells])
+        first[cells] = np.where(new, j[:, None], first[cells])
+
+        done = ~np.isnan(times[cells][:, stop]).any(axis=1)
+        active = cells[~done]
+
+    return times, first
+
+
+# =====================================================================
+# Event-sparse output
+# =====================================================================
+
+def ssa_events_batch(
+        network: dict,
+        t0: np.ndarray,
+        t_end: float,
+        streams: "CellStreams",
+) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Direct-method SSA that returns the jump times and fired reactions of
+    each cell instead of sampling a grid (see `sparse.SparseTrajectory`).
+
+    Returns
+    -------
+    events : list of (times, reactions), one per cell
+        Firing times in (t0[c], t_end] and the index of the reaction
+        fired at each of them, in chronological order.
+    """
+
+    reactants = network["reactants"]
+    products  = network["products"]
+    rates     = network["rates"]
+
+    n_cells   = len(t0)
+    n_species = len(network["species"])
+
+    x = np.broadcast_to(network["x0"], (n_cells, n_species)).copy()
+    t = np.asarray(t0, dtype=np.float64).copy()
+    log_cells, log_times, log_reactions = [], [], []
+
+    active = np.flatnonzero(t < t_end)
+    while active.size:
+        props = x[active][:, reactants] * rates
+        cum = np.cumsum(props, axis=1)
+        a0 = cum[:, -1]
+
+        u = 1.0 - streams.uniforms(active, 2)    # in (0, 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tau = np.where(a0 > 0, -np.log(u[0]) / a0, np.inf)
+        t_new = t[active] + tau
+
+        live = t_new <= t_end
+        cells, t_new = active[live], t_new[live]
+        j = (cum[live] < (u[1, live] * a0[live])[:, None]).sum(axis=1)
+        x[cells, reactants[j]] -= 1
+        x[cells, products[j]] += 1
+        t[cells] = t_new
+
+        log_cells.append(cells)
+        log_times.append(t_new)
+        log_reactions.append(j)
+        active = cells
+
+    if not log_cells:
+        empty = (np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64))
+        return [empty] * n_cells
+
+    cells_all = np.concatenate(log_cells)
+    order = np.argsort(cells_all, kind="stable")
+    times_all = np.concatenate(log_times)[order]
+    reac_all  = np.concatenate(log_reactions)[order]
+    bounds = np.searchsorted(cells_all[order], np.arange(n_cells + 1))
+    return [(times_all[a:b], reac_all[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+# =====================================================================
+# Common random numbers
+# =====================================================================
+# Random time-change representation: every reaction channel k of a cell
+# fires at the jumps of its own unit-rate Poisson process, run on the
+# internal clock T_k = integral of a_k(t) dt. Simulating it with the
+# modified next reaction method (Anderson, 2007) only consumes channel
+# k's exponentials for channel k. When those exponentials are a function
+# of (cell key, channel, firing count) alone, two parameter sets with the
+# same reaction channels share their noise channel by channel, and the
+# difference of their trajectories has a much smaller variance than that
+# of independent runs.
+#
+# The exponentials come from a counter-based generator (splitmix64
+# finalizer), so no per-channel state has to be stored or advanced.
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _mix(z: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer on uint64 arrays (wrapping arithmetic)."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def channel_streams(keys: np.ndarray, n_channels: int) -> np.ndarray:
+    """(n_cells, n_channels) uint64 keys of the per-channel streams."""
+    cells = _mix(np.asarray(keys).astype(np.uint64))
+    channels = np.arange(1, n_channels + 1, dtype=np.uint64) * _GOLDEN
+    return _mix(cells[:, None] ^ _mix(channels)[None, :])
+
+
+def _unit_exponential(streams: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Exp(1) variate number `counts` of every stream."""
+    bits = _mix(streams + counts.astype(np.uint64) * _GOLDEN) >> np.uint64(11)
+    return -np.log((bits.astype(np.float64) + 0.5) * 2.0**-53)
+
+
+def ssa_coupled_batch(
+        network: dict,
+        t0: np.ndarray,
+        sample_times: np.ndarray,
+        keys: np.ndarray,
+) -> np.ndarray:
+    """
+    Next-reaction-method SSA on a batch of cells, with randomness drawn
+    per reaction channel from `channel_streams(keys)`. Same contract as
+    `ssa_direct_batch` otherwise.
+
+    Runs of two networks with the same channels (same species, reactants
+    and products; rates and initial state may differ) and the same
+    `keys` are coupled: each channel replays the same unit-rate Poisson
+    process in both.
+
+    Parameters
+    ----------
+    keys : (n_cells,) uint64 array
+        Per-cell keys (`streams.cell_keys`); a cell and its channels get
+        the same random streams whatever the network.
+    """
+
+    reactants = network["reactants"]
+    products  = network["products"]
+    rates     = network["rates"]
+
+    n_cells, n_points = sample_times.shape
+    n_species  = len(network["species"])
+    n_channels = len(rates)
+
+    x = np.broadcast_to(network["x0"], (n_cells, n_species)).copy()
+    t = np.asarray(t0, dtype=np.float64).copy()
+    states = np.empty((n_cells, n_species, n_points), dtype=np.int64)
+
+    streams = channel_streams(keys, n_channels)
+    fired = np.zeros((n_cells, n_channels), dtype=np.int64)
+    internal = np.zeros((n_cells, n_channels), dtype=np.float64)   # T_k
+    next_jump = _unit_exponential(streams, fired)                  # P_k
+
+    gidx = (sample_times < t[:, None]).sum(axis=1)
+    for c in np.flatnonzero(gidx):
+        states[c, :, :gidx[c]] = x[c, :, None]
+
+    active = np.flatnonzero(gidx < n_points)
+    while active.size:
+        xa = x[active]
+        props = xa[:, reactants] * rates
+        with np.errstate(divide="ignore", invalid="ignore"):
+            wait = np.where(props > 0, (next_jump[active] - internal[active]) / props, np.inf)
+        j = wait.argmin(axis=1)
+        tau = wait[np.arange(active.size), j]
+        t_new = t[active] + tau
+
+        _record(states, sample_times, gidx, active, xa, t_new)
+
+        live = np.isfinite(tau)
+        cells, j, tau = active[live], j[live], tau[live]
+        internal[cells] += props[live] * tau[:, None]
+        x[cells, reactants[j]] -= 1
+        x[cells, products[j]] += 1
+        fired[cells, j] += 1
+        next_jump[cells, j] += _unit_exponential(streams[cells, j], fired[cells, j])
+        t[cells] = t_new[live]
+
+        active = active[gidx[active] < n_points]
+
+    return states
@@ -0,0 +1,133 @@
+"""
+Exact ensemble moments, without sampling.
+
+Every reaction of the model is first order, so the N slots of a cell
+are independent copies of one CTMC and, for a given resection delay, the
+species counts at any time are multinomial(N, p(t)) with
+p(t) = p0 expm(Q t). Every `make_group` series is a sum of distinct
+species, hence binomial(N, q(t)) with q the summed probabilities, and
+"DLC homologous" (D-loops clipped after the first recombination) has a
+closed form as well since R is absorbing.
+
+The Gamma resection delay is integrated exactly over the same
+discretization as `simulation._resection_delay` (integer delay, rounded
+to the output grid), so the result is the ensemble mean and SD that
+`run` would converge to with infinitely many cells, in seconds.
+"""
+
+import numpy as np
+from scipy.linalg import expm
+from scipy.stats import gamma
+
+from genomatchgp import methods
+from genomatchgp.engine import slot_generator
+
+
+# Delay components lighter than this are dropped from the mixture
+MIN_WEIGHT = 1e-12
+
+
+def delay_distribution(params: dict) -> np.ndarray:
+    """
+    Probability of each number of delay points `n_pts_delay`, matching
+    the discretization of `simulation._resection_delay`.
+    """
+
+    n_timepoints: int = params["timepoints"]
+    every: int        = params["every"]
+    n_points          = n_timepoints // every
+
+    # delay = min(int(G), n_timepoints - 1), G ~ Gamma(k, theta)
+    m = np.arange(n_timepoints)
+    cdf = gamma.cdf(m, params["gamma_k"], scale=params["gamma_theta"])
+    p_m = np.empty(n_timepoints)
+    p_m[:-1] = np.diff(cdf)
+    p_m[-1] = 1.0 - cdf[-1]
+
+    d = np.maximum(0, np.round(m / every).astype(np.int64))
+    d[n_points - d <= 0] = n_points - 1
+    return np.bincount(d, weights=p_m, minlength=n_points)
+
+
+def exact_moments(
+        network: dict,
+        species_to_index: dict,
+        params: dict,
+) -> tuple[dict, dict]:
+    """
+    Exact mean and SD of every `make_group` series over the ensemble.
+
+    Parameters
+    ----------
+    network : dict
+        Output of `modelmaker.build_reaction_network`.
+    species_to_index : dict[str, int]
+        Row index of every species in the output matrix.
+    params : dict
+        YAML-loaded config.
+
+    Returns
+    -------
+    mean, sd : dict[str, np.ndarray]
+        Same keys as `methods.make_group`, one value per output point.
+    """
+
+    n_timepoints: int = params["timepoints"]
+    every: int        = params["every"]
+    n_points          = n_timepoints // every
+    N                 = params["N"]
+
+    Q = slot_generator(network)
+    p0 = network["x0"] / N
+    weights = methods.series_weights(species_to_index, params["intermediates"])
+    names = [k for k in weights if k not in ("time", "DLC homologous")]
+    # Weights over network species (row 0 of the output is Time)
+    W = np.stack([weights[k][1:] for k in names])
+    w_dhm = weights["D-loop homologies"][1:]
+    # R is absent from a folded model in which no slot can recombine
+    i_R = network["species"].index("R") if "R" in network["species"] else None
+
+    m1 = {k: np.zeros(n_points) for k in (*names, "DLC homologous")}
+    m2 = {k: np.zeros(n_points) for k in (*names, "DLC homologous")}
+
+    for d, w in enumerate(delay_distribution(params)):
+        if w < MIN_WEIGHT:
+            continue
+
+        # Slot distribution on this component's output grid: p0 during
+        # the delay, then linspace(d * every, T, n_points - d).
+        n_dyn = n_points - d
+        p = np.empty((n_points, len(p0)))
+        p[:d] = p0
+        step = (n_timepoints - d * every) / (n_dyn - 1) if n_dyn > 1 else 0.0
+        P = expm(Q * step)
+        p[d] = p0
+        for j in range(d + 1, n_points):
+            p[j] = p[j - 1] @ P
+        np.clip(p, 0.0, 1.0, out=p)
+
+        # Sums of distinct species are binomial(N, q)
+        q = np.clip(p @ W.T, 0.0, 1.0)
+        for i, k in enumerate(names):
+            mean = N * q[:, i]
+            m1[k] += w * mean
+            m2[k] += w * (mean * (1 - q[:, i]) + mean**2)
+
+        # DLC: D-loops at sample c, kept iff no slot was R at sample
+        # c - 1. R is absorbing, so a slot in a D-loop at c was not R at
+        # c - 1, and the slots are independent.
+        a = np.clip(p @ w_dhm, 0.0, 1.0)
+        b = np.ones(n_points)
+        if i_R is not None:
+            b[1:] = 1.0 - p[:-1, i_R]
+        m1["DLC homologous"] += w * N * a * b ** (N - 1)
+        m2["DLC homologous"] += w * (N * a * b ** (N - 1) + N * (N - 1) * a**2 * b ** max(N - 2, 0))
+
+    mean = {"time": np.arange(0, n_timepoints, every, dtype=np.float64)}
+    sd   = {"time": np.zeros(n_points)}
+    for k in weights:
+        if k == "time":
+            continue
+        mean[k] = m1[k]
+        sd[k] = np.sqrt(np.clip(m2[k] - m1[k] ** 2, 0.0, None))
+    return mean, sd
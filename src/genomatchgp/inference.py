@@ -0,0 +1,217 @@
+"""
+ABC-SMC parameter inference (`infer` subcommand).
+
+An inference spec is a small YAML file naming the keys of params.yaml to
+infer, their priors, and the reference curves to match:
+
+    target: reference.csv        # "time" column + one column per series,
+                                 # or an aggregate.npz written by `run`
+    series: [DLC homologous, Recombined]    # default: every target series
+    priors:
+      dloop_l_half: {uniform: [30, 80]}
+      dloop_w:      {uniform: [5, 20]}
+      koff1_alpha:  {loguniform: [0.02, 0.3]}
+      kre:          {normal: [0.004, 0.001]}
+    particles: 100               # population size
+    generations: 5
+    quantile: 0.5                # next tolerance = this quantile of the
+                                 # accepted distances
+    seed: 0
+
+The sampler is the population Monte Carlo scheme of Beaumont et al.
+(2009): generation 0 samples the prior, later generations resample the
+previous population by weight and move the particles with a Gaussian
+kernel of twice its weighted covariance. Log-uniform priors are handled
+in log space, where they are uniform. A particle is accepted when the
+distance between its ensemble mean and the target is within the
+tolerance of the generation.
+
+Only keys that are global parameters of the model can be inferred, so
+every particle reuses the same model structure (`STRUCTURAL_KEYS` are
+rejected). A folded model (``fold: true``) is the exception: its rates
+decide which species are dropped, so the native engines rebuild the
+network of every particle.
+"""
+
+import os
+
+import numpy as np
+
+from genomatchgp.modelmaker import MODEL_PARAMETERS, STRUCTURAL_KEYS
+from genomatchgp.stats import load_stats
+
+
+PRIORS = ("uniform", "loguniform", "normal")
+
+
+# =====================================================================
+# Priors
+# =====================================================================
+# Particles are arrays in "internal" space: log of the value for
+# log-uniform priors, the value itself otherwise.
+
+def parse_priors(spec: dict) -> tuple[list[str], list[tuple[str, float, float]]]:
+    """Keys to infer and their (kind, a, b) priors, in spec order."""
+
+    keys, priors = [], []
+    for key, prior in spec["priors"].items():
+        if key in STRUCTURAL_KEYS or key not in MODEL_PARAMETERS:
+            raise ValueError(f"Cannot infer {key!r}: expected a non-structural key among {MODEL_PARAMETERS}.")
+        (kind, (a, b)), = prior.items()
+        if kind not in PRIORS:
+            raise ValueError(f"Unknown prior {kind!r} for {key!r}, expected one of {PRIORS}.")
+        if kind == "loguniform":
+            a, b = np.log(a), np.log(b)
+        keys.append(key)
+        priors.append((kind, float(a), float(b)))
+    return keys, priors
+
+
+def sample_prior(priors: list, n: int, rng: np.random.Generator) -> np.ndarray:
+    """(n, n_keys) particles drawn from the prior, internal space."""
+    cols = []
+    for kind, a, b in priors:
+        if kind == "normal":
+            cols.append(rng.normal(a, b, n))
+        else:
+            cols.append(rng.uniform(a, b, n))
+    return np.stack(cols, axis=1)
+
+
+def prior_density(priors: list, theta: np.ndarray) -> np.ndarray:
+    """Prior density of (n, n_keys) particles in internal space."""
+    density = np.ones(len(theta))
+    for j, (kind, a, b) in enumerate(priors):
+        x = theta[:, j]
+        if kind == "normal":
+            density *= np.exp(-0.5 * ((x - a) / b) ** 2) / (b * np.sqrt(2 * np.pi))
+        else:
+            density *= ((x >= a) & (x <= b)) / (b - a)
+    return density
+
+
+def to_values(keys: list[str], priors: list, theta: np.ndarray) -> list[dict]:
+    """YAML overrides of (n, n_keys) internal-space particles."""
+    cols = [np.exp(theta[:, j]) if kind == "loguniform" else theta[:, j] for j, (kind, _, _) in enumerate(priors)]
+    return [{k: float(cols[j][i]) for j, k in enumerate(keys)} for i in range(len(theta))]
+
+
+# =====================================================================
+# Sequential Monte Carlo
+# =====================================================================
+
+def kernel_covariance(theta: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Twice the weighted covariance of the population (Beaumont et al.)."""
+    cov = np.atleast_2d(np.cov(theta, rowvar=False, aweights=weights))
+    # A collapsed dimension would make the kernel singular
+    return 2 * cov + 1e-12 * np.eye(len(cov))
+
+
+def propose(
+        theta: np.ndarray,
+        weights: np.ndarray,
+        cov: np.ndarray,
+        priors: list,
+        n: int,
+        rng: np.random.Generator,
+) -> np.ndarray:
+    """`n` moved particles of the population with non-zero prior density."""
+    chol = np.linalg.cholesky(cov)
+    out = np.empty((0, theta.shape[1]))
+    while len(out) < n:
+        picks = rng.choice(len(theta), size=n, p=weights)
+        moved = theta[picks] + rng.standard_normal((n, theta.shape[1])) @ chol.T
+        out = np.concatenate([out, moved[prior_density(priors, moved) > 0]])
+    return out[:n]
+
+
+def importance_weights(
+        theta_new: np.ndarray,
+        theta_old: np.ndarray,
+        weights_old: np.ndarray,
+        cov: np.ndarray,
+        priors: list,
+) -> np.ndarray:
+    """Normalized weights prior / (kernel mixture of the previous population)."""
+    diff = theta_new[:, None, :] - theta_old[None, :, :]
+    inv = np.linalg.inv(cov)
+    kern = np.exp(-0.5 * np.einsum("ijk,kl,ijl->ij", diff, inv, diff))
+    w = prior_density(priors, theta_new) / (kern @ weights_old)
+    return w / w.sum()
+
+
+def effective_sample_size(weights: np.ndarray) -> float:
+    return float(1.0 / np.sum(weights**2))
+
+
+# =====================================================================
+# Target and distance
+# =====================================================================
+
+def load_target(path: str, series: list[str] | None = None) -> dict[str, np.ndarray]:
+    """
+    Reference curves as {"time": t, <series>: values}, from a CSV with a
+    "time" column or from an aggregate.npz written by `run` (means).
+    """
+
+    if path.endswith(".npz"):
+        _, mean, _ = load_stats(path)
+        target = {k: np.asarray(v, dtype=np.float64) for k, v in mean.items()}
+    else:
+        import pandas as pd
+
+        df = pd.read_csv(path)
+        target = {c: df[c].to_numpy(dtype=np.float64) for c in df.columns}
+
+    if "time" not in target:
+        raise ValueError(f"Target {path} has no 'time' series.")
+    series = series or [k for k in target if k != "time"]
+    missing = [k for k in series if k not in target]
+    if missing:
+        raise ValueError(f"Target {path} lacks the series {missing}.")
+    return {"time": target["time"], **{k: target[k] for k in series}}
+
+
+def distance(mean: dict[str, np.ndarray], target: dict[str, np.ndarray]) -> float:
+    """
+    Sum over the target series of the RMS difference between the
+    simulated ensemble mean (interpolated at the target times) and the
+    target, each scaled by the largest magnitude of its target curve.
+    """
+    d = 0.0
+    for k, ref in target.items():
+        if k == "time":
+            continue
+        sim = np.interp(target["time"], mean["time"], mean[k])
+        scale = np.abs(ref).max() or 1.0
+        d += np.sqrt(np.mean((sim - ref) ** 2)) / scale
+    return float(d)
+
+
+# =====================================================================
+# Populations on disk
+# =====================================================================
+
+def save_population(path: str, keys: list[str], priors: list, theta: np.ndarray,
+                    weights: np.ndarray, distances: np.ndarray) -> None:
+    """Write a population as CSV (parameter values, weight, distance), atomically."""
+    import pandas as pd
+
+    df = pd.DataFrame(to_values(keys, priors, theta))
+    df["weight"] = weights
+    df["distance"] = distances
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index_label="particle")
+    os.replace(tmp, path)
+
+
+def load_population(path: str, keys: list[str], priors: list) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(theta, weights, distances) of a population written by `save_population`."""
+    import pandas as pd
+
+    df = pd.read_csv(path, index_col="particle")
+    theta = np.stack([
+        np.log(df[k].to_numpy()) if kind == "loguniform" else df[k].to_numpy()
+        for k, (kind, _, _) in zip(keys, priors)
+    ], axis=1)
+    return theta, df["weight"].to_numpy(), df["distance"].to_numpy()
@@ -18,26 +18,40 @@ options:
 The subcommands are:
     
     run             Run the pipeline
+    sweep           Run a parameter sweep on a shared model
+    sensitivity     Compare parameter sets on common random numbers
+    infer           Infer parameters from reference curves (ABC-SMC)
+    cache           Inspect and prune the cross-run result cache
+    plot            Regenerate the figures of a run from its aggregates
 
 
 """
 
+import importlib
 import importlib.metadata
 
-from genomatchgp import commands
-
 from docopt import DocoptExit, docopt
 
 
 __version__ = importlib.metadata.version("genomatch-gillespie")
 
+# Subcommand -> "module:Class", resolved lazily by `main`
+COMMANDS = {
+    "run":         "genomatchgp.commands:Run",
+    "sweep":       "genomatchgp.commands:Sweep",
+    "sensitivity": "genomatchgp.commands:Sensitivity",
+    "infer":       "genomatchgp.commands:Infer",
+    "cache":       "genomatchgp.commands:Cache",
+    "plot":        "genomatchgp.commands:Plot",
+}
+
 
 def main():
     """Main entry point for the sshicstuff CLI."""
 
     args = docopt(__doc__, version=__version__, options_first=True)
     # Retrieve the command to execute.
-    command_name = args.pop("<command>").capitalize()
+    command_name = args.pop("<command>").lower()
 
     # Retrieve the command arguments.
     command_args = args.pop("<args>")
@@ -46,12 +60,14 @@ def main():
     # After 'popping' '<command>' and '<args>', what is left in the
     # args dictionary are the global arguments.
 
-    # Retrieve the class from the 'commands' module.
+    # Retrieve the class from the registry; its module is only imported
+    # now, so `--help` and unknown commands stay cheap.
     try:
-        command_class = getattr(commands, command_name)
-    except AttributeError as exc:
+        module_name, class_name = COMMANDS[command_name].split(":")
+    except KeyError as exc:
         print("Unknown command.")
         raise DocoptExit() from exc
+    command_class = getattr(importlib.import_module(module_name), class_name)
     # Create an instance of the command.
     command = command_class(command_args, args)
     # Execute the command.
@@ -0,0 +1,107 @@
+"""
+Run manifest: which cells of a run are complete.
+
+Every rank periodically checkpoints the cells it has finished together
+with the running statistics of exactly those cells, in one file per
+(attempt, rank) under `<outdir>/manifest/`:
+
+    manifest/part_{attempt}_{rank}.npz
+        cells     ids of the completed cells
+        n, mean/<series>, m2/<series>
+                  `EnsembleStats.state()` of those cells
+
+Each part is written to a temporary file and renamed over the previous
+one, so a rank killed at any point leaves the last complete checkpoint.
+Record writers are flushed before a checkpoint, so the records on disk
+always cover the cells of the manifest.
+
+`run --resume` starts a new attempt that only schedules the cells
+missing from the manifest, and merges the statistics of all attempts at
+the end; `run --partial` aggregates whatever the manifest holds.
+"""
+
+import glob
+import os
+import time
+from os.path import join
+
+import numpy as np
+
+from genomatchgp.stats import EnsembleStats
+
+
+MANIFEST_DIR = "manifest"
+
+
+class Checkpoint:
+    """Completed cells and statistics of one rank during one attempt."""
+
+    def __init__(self, outdir: str, attempt: int, rank: int, interval: float = 60.0):
+        os.makedirs(join(outdir, MANIFEST_DIR), exist_ok=True)
+        self.path = join(outdir, MANIFEST_DIR, f"part_{attempt}_{rank}.npz")
+        self.interval = interval
+        self.cells: list[int] = []
+        self._last = time.perf_counter()
+
+    def update(self, cells: list[int]) -> None:
+        """Mark `cells` as completed (in memory until the next commit)."""
+        self.cells.extend(int(c) for c in cells)
+
+    def commit(self, stats: EnsembleStats, writer=None, force: bool = False) -> None:
+        """
+        Flush `writer` and write the checkpoint, at most every `interval`
+        seconds unless `force`. `stats` must cover exactly `self.cells`.
+        """
+        if not force and time.perf_counter() - self._last < self.interval:
+            return
+        if writer is not None:
+            writer.flush()
+
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "wb") as fh:
+            np.savez(fh, cells=np.array(self.cells, dtype=np.int64), **stats.state())
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, self.path)
+        self._last = time.perf_counter()
+
+
+# =====================================================================
+# Reading the manifest
+# =====================================================================
+
+def _parts(outdir: str) -> list[tuple[int, str]]:
+    """(attempt, path) of every checkpoint file."""
+    parts = []
+    for path in glob.glob(join(outdir, MANIFEST_DIR, "part_*_*.npz")):
+        attempt = int(os.path.basename(path).split("_")[1])
+        parts.append((attempt, path))
+    return sorted(parts)
+
+
+def load_manifest(outdir: str, before: int | None = None) -> tuple[set[int], EnsembleStats]:
+    """
+    Completed cells and their merged statistics, over all attempts or
+    only those earlier than `before`.
+    """
+    cells: set[int] = set()
+    stats = EnsembleStats()
+    for attempt, path in _parts(outdir):
+        if before is not None and attempt >= before:
+            continue
+        with np.load(path) as npz:
+            cells.update(int(c) for c in npz["cells"])
+            stats.merge(EnsembleStats.from_state({f: npz[f] for f in npz.files if f != "cells"}))
+    return cells, stats
+
+
+def next_attempt(outdir: str) -> int:
+    """Attempt number for a resumed run."""
+    parts = _parts(outdir)
+    return parts[-1][0] + 1 if parts else 0
+
+
+def clear_manifest(outdir: str) -> None:
+    """Start from scratch: drop every checkpoint of a previous run."""
+    for path in glob.glob(join(outdir, MANIFEST_DIR, "part_*")):
+        os.remove(path)
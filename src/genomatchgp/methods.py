@@ -4,11 +4,16 @@ Aggregation and plotting utilities for the Gillespie trajectories.
 Buckets are derived from the YAML `intermediates` list rather than
 hardcoded, so the aggregation stays consistent with whatever bucket
 discretization the model was generated with.
+
+matplotlib is imported by the plotting functions themselves: every rank
+uses the aggregation helpers, only rank 0 ever plots.
 """
 
+from collections.abc import Mapping
+
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
+
+from genomatchgp.sparse import SparseTrajectory
 
 
 # =====================================================================
@@ -31,23 +36,49 @@ LENGTH_BUCKETS: tuple[tuple[str, int, int], ...] = (
 # =====================================================================
 
 def make_group(
-        result: np.ndarray,
-        species_to_index: dict,
-        intermediates: list[int],
-) -> dict:
+        result: np.ndarray | SparseTrajectory,
+        species_to_index: dict | None = None,
+        intermediates: list[int] | None = None,
+        grid: np.ndarray | None = None,
+) -> "Group":
     """
-    Convert a raw species-by-time matrix into a labeled dict of
+    Convert a raw species-by-time matrix into a labeled mapping of
     aggregated trajectories ready for plotting / saving.
 
     Parameters
     ----------
-    result : (n_species, n_points) array
+    result : (n_species, n_points) array or SparseTrajectory
         Output of `simulation.run()`. Row 0 is time, row 1 is S, the
-        rest follows the species declaration order.
+        rest follows the species declaration order. An event-sparse
+        trajectory is resampled on `grid` first.
     species_to_index : dict[str, int]
         Inverse mapping built in commands.py from `index_to_species`.
+        Optional for a SparseTrajectory, which carries its own.
     intermediates : list[int]
-        Length buckets used by the modelmaker.
+        Length buckets used by the modelmaker. Optional for a
+        SparseTrajectory.
+    grid : array, optional
+        Resampling grid of a SparseTrajectory (default: its time row).
+
+    Returns
+    -------
+    Group
+        Keeps the species counts only; every series is computed on first
+        access (see `_make_series` for their definitions).
+    """
+
+    if isinstance(result, SparseTrajectory):
+        species_to_index = species_to_index or result.species_to_index
+        intermediates = intermediates or result.intermediates
+        result = result.resample(grid)
+    return Group.from_matrix(result, grouping_operator(species_to_index, intermediates))
+
+
+def _make_series(result: np.ndarray, species_to_index: dict, intermediates: list[int]) -> dict:
+    """
+    Reference definition of the series of `make_group`, computed eagerly
+    on a species-by-time matrix. Only used to derive their weights
+    (`series_weights`).
     """
 
     n_pts = result.shape[1]
@@ -62,10 +93,12 @@ def make_group(
     # ------------------------------------------------------------------
     # Pull the canonical row indices
     # ------------------------------------------------------------------
+    # Species dropped from a folded model (`modelmaker._fold`) are
+    # identically zero; sum_species reports them as such.
     res: dict = {
         "time":       result[species_to_index["Time"], :],
         "free sites": result[species_to_index["S"], :],
-        "Recombined": result[species_to_index["R"], :],
+        "Recombined": sum_species(["R"]),
     }
 
     # ------------------------------------------------------------------
@@ -90,8 +123,8 @@ def make_group(
     res["D-loop heterologies"] = sum_species(dht_names)
 
     for L in intermediates:
-        res[f"DHM_L{L}"] = result[species_to_index[f"DHM{L}"], :]
-        res[f"DHT_L{L}"] = result[species_to_index[f"DHT{L}"], :]
+        res[f"DHM_L{L}"] = sum_species([f"DHM{L}"])
+        res[f"DHT_L{L}"] = sum_species([f"DHT{L}"])
 
     # ------------------------------------------------------------------
     # DLC homologous: D-loop trajectory clipped at the first
@@ -118,12 +151,323 @@ def make_group(
     return res
 
 
-def aggregate_groups(groups: list[dict]) -> dict:
-    """Element-wise mean across replicates."""
+def series_weights(species_to_index: dict, intermediates: list[int]) -> dict[str, np.ndarray]:
+    """
+    Linear part of `make_group`: for every series, its 0/1 weight over
+    the rows of the species matrix (row 0 being Time).
+
+    Obtained by probing `_make_series` with the identity, padded with an
+    empty column so that the DLC clipping never triggers: the weight of
+    "DLC homologous" is therefore that of "D-loop homologies", the
+    clipping after the first recombination being left to the caller.
+    """
+
+    n_rows = len(species_to_index)
+    probe = np.hstack([np.eye(n_rows), np.zeros((n_rows, 1))])
+    return {k: v[:n_rows] for k, v in _make_series(probe, species_to_index, intermediates).items()}
+
+
+def grouping_operator(species_to_index: dict, intermediates: list[int]) -> dict:
+    """
+    `make_group` compiled once per model (and cached per process), for
+    `Group`, `series` and `make_groups`.
+
+    Returns a dict with the series names, their stacked
+    (n_series, n_rows) weight matrix from `series_weights`, the species
+    rows summed by each series, the positions of the series involved in
+    the DLC clipping, and the model metadata a record needs to rebuild
+    the operator (species in row order, intermediates). The matrix is
+    small (tens of series by tens of species) and a dense batched
+    product beats a sparse one at that size, so it is kept dense.
+    """
+
+    key = (tuple(species_to_index.items()), tuple(intermediates))
+    operator = _OPERATORS.get(key)
+    if operator is not None:
+        return operator
+
+    weights = series_weights(species_to_index, intermediates)
+    names = list(weights)
+    stacked = np.stack([weights[k] for k in names])
+    operator = {
+        "series":        names,
+        "weights":       stacked,
+        # Rows of the counts matrix (species matrix without Time)
+        "members":       {k: np.flatnonzero(stacked[i, 1:]) for i, k in enumerate(names)},
+        "recombined":    names.index("Recombined"),
+        "dlc":           names.index("DLC homologous"),
+        "species":       sorted((n for n in species_to_index if n != "Time"), key=species_to_index.get),
+        "intermediates": list(intermediates),
+    }
+    _OPERATORS[key] = operator
+    return operator
+
+
+# Per-process cache of grouping operators, keyed by model structure
+_OPERATORS: dict[tuple, dict] = {}
+
+
+def series(counts: np.ndarray, time: np.ndarray, operator: dict, name: str) -> np.ndarray:
+    """
+    One `make_group` series computed from species counts.
+
+    `counts` is a (n_species, n_points) matrix (the species matrix
+    without its Time row), or a (n_cells, n_species, n_points) stack of
+    them, in which case one row per cell is returned.
+    """
+
+    if name == "time":
+        return time if counts.ndim == 2 else np.broadcast_to(time, counts.shape[:-2] + time.shape)
+    if name not in operator["members"]:
+        raise KeyError(name)
+    out = counts[..., operator["members"][name], :].sum(axis=-2, dtype=np.float64)
+
+    if name == operator["series"][operator["dlc"]]:
+        # DLC homologous: clipped after the first recombination
+        rec = series(counts, time, operator, "Recombined")
+        t_rec = np.argmax(rec > 0, axis=-1)
+        after = np.arange(out.shape[-1]) > t_rec[..., None]
+        out[after & (rec[..., -1:] > 0)] = 0
+    return out
+
+
+class Group(Mapping):
+    """
+    Lazy `make_group` mapping of one cell.
+
+    Only the integer species counts and the time row are stored; a
+    series is computed from them on first access and cached. Keys, in
+    order, are `operator["series"]`, so a Group can be used wherever the
+    series dict is expected (`dict(group)` materializes it).
+    """
+
+    def __init__(self, counts: np.ndarray, time: np.ndarray, operator: dict):
+        self.counts = counts
+        self.time = time
+        self.operator = operator
+        self._series: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_matrix(cls, result: np.ndarray, operator: dict) -> "Group":
+        """Group of a species-by-time matrix (row 0 is time)."""
+        counts = np.rint(result[1:]).astype(np.int32)
+        return cls(counts, np.asarray(result[0], dtype=np.float64), operator)
+
+    @classmethod
+    def from_record(cls, arrays) -> "Group":
+        """Rebuild a Group from the arrays of `record` (dict or npz)."""
+        species = [str(s) for s in arrays["species"]]
+        species_to_index = {"Time": 0, **{name: i + 1 for i, name in enumerate(species)}}
+        operator = grouping_operator(species_to_index, [int(L) for L in arrays["intermediates"]])
+        return cls(np.asarray(arrays["counts"]), np.asarray(arrays["time"], dtype=np.float64), operator)
+
+    def record(self) -> dict[str, np.ndarray]:
+        """Arrays to store the cell: counts, time and model metadata."""
+        return {
+            "counts":        self.counts,
+            "time":          self.time,
+            "species":       np.array(self.operator["species"]),
+            "intermediates": np.array(self.operator["intermediates"], dtype=np.int64),
+        }
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        value = self._series.get(name)
+        if value is None:
+            value = self._series[name] = series(self.counts, self.time, self.operator, name)
+        return value
+
+    def __iter__(self):
+        return iter(self.operator["series"])
+
+    def __len__(self) -> int:
+        return len(self.operator["series"])
+
+
+def make_groups(counts: np.ndarray, time: np.ndarray, operator: dict) -> dict[str, np.ndarray]:
+    """
+    Batched `make_group`: one matrix product over a whole batch.
+
+    Parameters
+    ----------
+    counts : (n_cells, n_species, n_points) array
+        Stacked species counts of several cells of one model, laid out
+        like `Group.counts` (the species matrix without its Time row).
+    time : (n_points,) array
+        Time row shared by the cells.
+    operator : dict
+        Output of `grouping_operator` for the model of the batch.
+
+    Returns
+    -------
+    groups : dict[str, (n_cells, n_points) array]
+        Same series as `make_group`, one row per cell. `split_groups`
+        turns it into per-cell dicts.
+    """
+
+    out = np.matmul(operator["weights"][:, 1:], counts.astype(np.float64))
+    out[:, operator["series"].index("time"), :] = time
+
+    # DLC homologous: clipped after the first recombination, per cell
+    rec = out[:, operator["recombined"], :]
+    t_rec = np.argmax(rec > 0, axis=1)
+    after = np.arange(out.shape[2]) > t_rec[:, None]
+    out[:, operator["dlc"], :][after & (rec[:, -1:] > 0)] = 0
+
+    return {k: out[:, i, :] for i, k in enumerate(operator["series"])}
+
+
+def split_groups(groups: dict[str, np.ndarray]) -> list[dict]:
+    """Per-cell `make_group` dicts (views) of a `make_groups` result."""
+    n_cells = len(next(iter(groups.values()))) if groups else 0
+    return [{k: v[c] for k, v in groups.items()} for c in range(n_cells)]
+
+
+def summary_statistics(group: dict) -> dict[str, float]:
+    """
+    Scalar per-cell observables derived from a `make_group` dict, used
+    to tabulate sweeps and to monitor ensemble convergence.
+    """
+
+    t = group["time"]
+    dt = float(t[1] - t[0]) if len(t) > 1 else 1.0
+    rec = group["Recombined"]
+    recombined = rec > 0
+
+    res = {
+        "Recombined final":        float(rec[-1]),
+        "t first recombination":   float(t[np.argmax(recombined)]) if recombined.any() else np.nan,
+        "DLC homologous integral": float(group["DLC homologous"].sum() * dt),
+        "D-loop homologies final": float(group["D-loop homologies"][-1]),
+        "free sites final":        float(group["free sites"][-1]),
+    }
+
+    # Time-averaged homologous D-loop occupancy per length bucket
+    lengths = [int(k[len("DHM_L"):]) for k in group if k.startswith("DHM_L")]
+    for label, lo, hi in LENGTH_BUCKETS:
+        in_bucket = [L for L in lengths if lo <= L <= hi]
+        if in_bucket:
+            occupancy = sum(group[f"DHM_L{L}"] for L in in_bucket)
+            res[f"D-loop homologous {label} nts mean"] = float(np.mean(occupancy))
+    return res
+
+
+def observable_names(intermediates: list[int]) -> list[str]:
+    """Keys of `summary_statistics` for a model with these intermediates."""
+    names = [
+        "Recombined final", "t first recombination", "DLC homologous integral",
+        "D-loop homologies final", "free sites final",
+    ]
+    for label, lo, hi in LENGTH_BUCKETS:
+        if any(lo <= L <= hi for L in intermediates):
+            names.append(f"D-loop homologous {label} nts mean")
+    return names
+
+
+def paired_difference(baseline: np.ndarray, perturbed: np.ndarray) -> dict[str, float]:
+    """
+    Mean difference of an observable between coupled runs of the same
+    cells, its standard error, and the standard error the same number of
+    independent cells would give. Cells where either value is NaN (a
+    censored time) are dropped.
+    """
+
+    keep = ~(np.isnan(baseline) | np.isnan(perturbed))
+    b, p = baseline[keep], perturbed[keep]
+    n = int(keep.sum())
+    if n < 2:
+        return {
+            "cells": n, "baseline mean": np.nan, "perturbed mean": np.nan, "difference": np.nan,
+            "SE": np.nan, "unpaired SE": np.nan, "variance reduction": np.nan,
+        }
+
+    se = np.std(p - b, ddof=1) / np.sqrt(n)
+    se_unpaired = np.sqrt((np.var(b, ddof=1) + np.var(p, ddof=1)) / n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reduction = se_unpaired**2 / se**2
+    return {
+        "cells":              n,
+        "baseline mean":      b.mean(),
+        "perturbed mean":     p.mean(),
+        "difference":         (p - b).mean(),
+        "SE":                 se,
+        "unpaired SE":        se_unpaired,
+        "variance reduction": reduction,
+    }
+
+
+# =====================================================================
+# First passage
+# =====================================================================
+
+def first_passage_targets(intermediates: list[int]) -> dict[str, list[str]]:
+    """
+    Target events of the first-passage mode, as sets of species whose
+    first appearance marks the event. D-loop targets are also resolved
+    per LENGTH_BUCKETS bucket.
+    """
+
+    targets: dict[str, list[str]] = {
+        "Recombined":          ["R"],
+        "D-loop homologous":   [f"DHM{L}" for L in intermediates],
+        "D-loop heterologous": [f"DHT{L}" for L in intermediates],
+    }
+    for label, lo, hi in LENGTH_BUCKETS:
+        in_bucket = [L for L in intermediates if lo <= L <= hi]
+        if in_bucket:
+            targets[f"D-loop homologous {label} nts"] = [f"DHM{L}" for L in in_bucket]
+    return targets
+
+
+def survival_curve(times: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Fraction of cells in which the event has not occurred by each grid
+    time. Censored cells (NaN) are all censored at the end of the
+    window, so this is also the Kaplan-Meier estimate on the window.
+    """
+    t = np.sort(times[~np.isnan(times)])
+    return 1.0 - np.searchsorted(t, grid, side="right") / max(len(times), 1)
+
+
+def hazard_rate(times: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Binned hazard estimate: events in [grid[i], grid[i + 1]) divided by
+    the cells still at risk at grid[i] and the bin width. The last value
+    is NaN (open bin).
+    """
+    n = len(times)
+    t = np.sort(times[~np.isnan(times)])
+    events_before = np.searchsorted(t, grid, side="left")
+    at_risk = n - events_before
+    events = np.diff(events_before)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = events / (at_risk[:-1] * np.diff(grid))
+    return np.append(np.where(at_risk[:-1] > 0, h, np.nan), np.nan)
+
+
+def aggregate_groups(groups: list[dict | Group | SparseTrajectory]) -> dict:
+    """
+    Element-wise mean across replicates (groups or sparse trajectories).
+
+    Groups of one model are averaged on their species counts, every
+    series but the DLC clipping being linear in them, so per-cell series
+    are never materialized.
+    """
     n = len(groups)
     if n == 0:
         return {}
 
+    groups = [make_group(g) if isinstance(g, SparseTrajectory) else g for g in groups]
+    operator = getattr(groups[0], "operator", None)
+    if operator is not None and all(getattr(g, "operator", None) is operator for g in groups):
+        counts = np.zeros(groups[0].counts.shape, dtype=np.int64)
+        for g in groups:
+            counts += g.counts
+        mean = Group(counts / n, groups[0].time, operator)
+        dlc = operator["series"][operator["dlc"]]
+        out = {k: mean[k] for k in operator["series"] if k != dlc}
+        out[dlc] = sum(g[dlc] for g in groups) / n
+        return {k: out[k] for k in operator["series"]}
+
     acc: dict = {}
     for g in groups:
         for k, v in g.items():
@@ -134,15 +478,130 @@ def aggregate_groups(groups: list[dict]) -> dict:
     return {k: v / n for k, v in acc.items()}
 
 
+# =====================================================================
+# Downsampling and smoothing for plots
+# =====================================================================
+# A figure is a couple of thousand pixels wide: drawing more points per
+# line costs rendering time without changing the picture. Decimation
+# keeps a subset of the points chosen to preserve the visible shape.
+
+DECIMATIONS = ("minmax", "lttb")
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Sorted indices of the first and last points and of the minimum and
+    maximum of each of about `n_out / 2` equal buckets in between: the
+    envelope of the curve, spikes included, in at most `n_out` points.
+    """
+
+    n = len(y)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+
+    inner = np.asarray(y[1:-1], dtype=np.float64)
+    size = -(-len(inner) // (n_out // 2 - 1))
+    n_buckets = -(-len(inner) // size)
+    pad = n_buckets * size - len(inner)
+    offsets = np.arange(n_buckets) * size + 1
+    lo = np.append(inner, np.full(pad, np.inf)).reshape(n_buckets, size).argmin(axis=1)
+    hi = np.append(inner, np.full(pad, -np.inf)).reshape(n_buckets, size).argmax(axis=1)
+    return np.unique(np.concatenate([[0], lo + offsets, hi + offsets, [n - 1]]))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets decimation (Steinarsson, 2013): keeps
+    the first and last points and, in each of `n_out - 2` buckets, the
+    point forming the largest triangle with the previously kept point
+    and the mean of the next bucket.
+    """
+
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    edges = np.append(edges, n)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        x_next = x[hi:edges[i + 2]].mean()
+        y_next = y[hi:edges[i + 2]].mean()
+        area = np.abs((x[a] - x_next) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (y_next - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def decimate(x: np.ndarray, y: np.ndarray, n_out: int | None, method: str = "minmax") -> np.ndarray:
+    """Indices of the points of (x, y) to draw; all of them if `n_out` is None."""
+    if n_out is None:
+        return np.arange(len(x))
+    if method == "minmax":
+        return minmax_indices(y, n_out)
+    if method == "lttb":
+        return lttb_indices(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), n_out)
+    raise ValueError(f"Unknown decimation {method!r}, expected one of {DECIMATIONS}.")
+
+
+def moving_averages(y: np.ndarray, widths) -> dict[int, np.ndarray]:
+    """
+    Centered moving averages of `y` for several window `widths` from a
+    single cumulative sum. Equal to
+    `np.convolve(y, np.ones(w) / w, mode="same")` (zero-padded edges);
+    a width of 0 returns `y` itself.
+    """
+
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    csum = np.concatenate([[0.0], np.cumsum(y)])
+    i = np.arange(n)
+    out = {}
+    for w in widths:
+        if w <= 0:
+            out[w] = y
+            continue
+        lo = np.clip(i - w // 2, 0, n)
+        hi = np.clip(i + (w - 1) // 2 + 1, 0, n)
+        out[w] = (csum[hi] - csum[lo]) / w
+    return out
+
+
 # =====================================================================
 # Plotting
 # =====================================================================
 
-def plot_trajectories(one_res: dict, outpath: str = "", show: bool = False) -> None:
-    """3x2 grid of trajectory panels."""
+def plot_trajectories(
+        one_res: dict | SparseTrajectory,
+        outpath: str = "",
+        show: bool = False,
+        sd: dict | None = None,
+        max_points: int | None = None,
+        decimation: str = "minmax",
+) -> None:
+    """
+    3x2 grid of trajectory panels, with optional ±SD bands. With
+    `max_points`, every line is decimated to about that many points
+    (`decimate`); bands follow the points of their line.
+    """
+
+    import matplotlib.font_manager as fm
+    import matplotlib.pyplot as plt
+
+    if isinstance(one_res, SparseTrajectory):
+        one_res = make_group(one_res)
 
     t = one_res["time"]
 
+    def draw(ax, k: str, **kwargs):
+        idx = decimate(t, one_res[k], max_points, decimation)
+        (line,) = ax.plot(t[idx], one_res[k][idx], **kwargs)
+        if sd is not None:
+            _sd_band(ax, t[idx], one_res[k][idx], sd[k][idx], line.get_color())
+
     fig, axs = plt.subplots(nrows=3, ncols=2, figsize=(14, 12), constrained_layout=True)
     title_font  = {"fontsize": 12}
     label_font  = {"fontsize": 12}
@@ -150,8 +609,8 @@ def plot_trajectories(one_res: dict, outpath: str = "", show: bool = False) -> N
 
     # ---- Panel 0: free vs occupied ----
     ax0 = axs[0, 0]
-    ax0.plot(t, one_res["free sites"], color="blue", label="S (free sites)")
-    ax0.plot(t, one_res["all"],        color="red",  label="Total occupancy")
+    draw(ax0, "free sites", color="blue", label="S (free sites)")
+    draw(ax0, "all",        color="red",  label="Total occupancy")
     ax0.set_title("Filament binding dynamics", **title_font)
     ax0.set_xlabel("T", **label_font)
     ax0.set_ylabel("N", **label_font)
@@ -184,17 +643,20 @@ def plot_trajectories(one_res: dict, outpath: str = "", show: bool = False) -> N
         ax.grid(True, linestyle="--", alpha=0.6)
 
     # Route series to their panels by key prefix
-    for k, v in one_res.items():
+    for k in one_res:
         if k.startswith("homo "):
-            ax1.plot(t, v, label=k)
+            ax = ax1
         elif k.startswith("hetero "):
-            ax2.plot(t, v, label=k)
+            ax = ax2
         elif k.startswith("all associations"):
-            ax3.plot(t, v, label=k)
+            ax = ax3
         elif k.startswith("D-loop"):
-            ax4.plot(t, v, label=k)
+            ax = ax4
         elif k.startswith("Recombined"):
-            ax5.plot(t, v, label=k)
+            ax = ax5
+        else:
+            continue
+        draw(ax, k, label=k)
 
     for ax in (ax1, ax2, ax3, ax4, ax5):
         ax.legend(prop=legend_font)
@@ -206,16 +668,38 @@ def plot_trajectories(one_res: dict, outpath: str = "", show: bool = False) -> N
     plt.close(fig)
 
 
-def plot_dlc(aggr_dlc: np.ndarray, convo: int = 100, outpath: str = "", show: bool = False) -> None:
-    """Plot the aggregated DLC homologous trace, optionally smoothed."""
+def plot_dlc(
+        aggr_dlc: np.ndarray,
+        convo: int = 100,
+        outpath: str = "",
+        show: bool = False,
+        sd: np.ndarray | None = None,
+        max_points: int | None = None,
+        decimation: str = "minmax",
+) -> None:
+    """
+    Plot the aggregated DLC homologous trace, optionally smoothed over
+    `convo` points (`moving_averages`), with an optional ±SD band and
+    optionally decimated to `max_points`.
+
+    `sd` is the across-cell SD at each time point and is drawn as is
+    around the smoothed mean: it is the spread of single cells, not the
+    SD of their smoothed traces (that needs the per-cell series, which
+    the aggregate does not keep), and a moving average of SDs is neither.
+    """
+
+    import matplotlib.pyplot as plt
 
     t = aggr_dlc.shape[0]
     if convo > 0:
-        aggr_dlc = np.convolve(aggr_dlc, np.ones(convo) / convo, mode="same")
+        aggr_dlc = moving_averages(aggr_dlc, [convo])[convo]
 
     xt = np.arange(t)
+    idx = decimate(xt, aggr_dlc, max_points, decimation)
     fig, ax = plt.subplots()
-    ax.plot(xt, aggr_dlc)
+    ax.plot(xt[idx], aggr_dlc[idx])
+    if sd is not None:
+        _sd_band(ax, xt[idx], aggr_dlc[idx], sd[idx], ax.lines[-1].get_color())
     ax.set_xlabel("T")
     ax.set_ylabel("DLC homologous (avg)")
     ax.grid(True, linestyle="--", alpha=0.6)
@@ -225,3 +709,30 @@ def plot_dlc(aggr_dlc: np.ndarray, convo: int = 100, outpath: str = "", show: bo
     if outpath:
         fig.savefig(outpath, format="png")
     plt.close(fig)
+
+
+def plot_survival(grid: np.ndarray, survival: dict, outpath: str = "", show: bool = False) -> None:
+    """Survival curves of the first-passage targets."""
+
+    import matplotlib.font_manager as fm
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(9, 6), constrained_layout=True)
+    for k, v in survival.items():
+        ax.step(grid, v, where="post", label=k)
+    ax.set_xlabel("T")
+    ax.set_ylabel("Fraction of cells without event")
+    ax.set_ylim(0, 1.02)
+    ax.legend(prop=fm.FontProperties(size=8))
+    ax.grid(True, linestyle="--", alpha=0.6)
+
+    if show:
+        plt.show()
+    if outpath:
+        fig.savefig(outpath, format="png")
+    plt.close(fig)
+
+
+def _sd_band(ax, t: np.ndarray, mean: np.ndarray, sd: np.ndarray, color: str) -> None:
+    """Shade mean ± SD around a plotted series."""
+    ax.fill_between(t, mean - sd, mean + sd, color=color, alpha=0.2, linewidth=0)
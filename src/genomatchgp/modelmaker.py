@@ -24,8 +24,24 @@ kinetic law. The exported SBML uses standard MathML <piecewise>.
 
 import hashlib
 import json
+import math
 
-import tellurium as te
+import numpy as np
+
+
+# Global parameters declared by the Antimony model. They stay symbolic
+# in the rate laws, so their value can be changed in place on a loaded
+# RoadRunner instance. Structural keys change the species set or the
+# initial state and require rebuilding the model.
+MODEL_PARAMETERS: tuple[str, ...] = (
+    "N", "f", "kon",
+    "koff1", "koff1_alpha", "koff1_floor", "koff1_lref",
+    "kext", "eps_mm",
+    "kdloop", "dloop_lmin", "dloop_l_half", "dloop_w",
+    "koff2", "koff2_lref",
+    "kre",
+)
+STRUCTURAL_KEYS: tuple[str, ...] = ("N", "intermediates")
 
 
 # =====================================================================
@@ -72,6 +88,30 @@ def _expr_p_dloop(L: int) -> str:
     return f"piecewise(0, {L} < dloop_lmin, {sig})"
 
 
+# =====================================================================
+# Numeric rate laws
+# =====================================================================
+# Same laws as above, evaluated for a fixed config. Used to build the
+# reaction network consumed by the native engines, which do not go
+# through Antimony. Keep these in sync with the `_expr_*` fragments.
+
+def _k_off1(L: int, config: dict) -> float:
+    decay = config["koff1"] * math.exp(-config["koff1_alpha"] * (L - config["koff1_lref"]))
+    return decay if decay > config["koff1_floor"] else config["koff1_floor"]
+
+
+def _k_off2(L: int, config: dict) -> float:
+    if L <= config["koff2_lref"]:
+        return config["koff2"]
+    return config["koff2"] * config["koff2_lref"] / L
+
+
+def _p_dloop(L: int, config: dict) -> float:
+    if L < config["dloop_lmin"]:
+        return 0.0
+    return 1.0 / (1.0 + math.exp(-(L - config["dloop_l_half"]) / config["dloop_w"]))
+
+
 # =====================================================================
 # Main entry point
 # =====================================================================
@@ -92,6 +132,56 @@ def generate_gillespie_model(config: dict) -> tuple[str, dict, int]:
         Stable 32-bit identifier derived from the config.
     """
 
+    antimony_str, index_to_species, uid, _, _ = _build_model(config)
+    return antimony_str, index_to_species, uid
+
+
+def build_reaction_network(config: dict) -> dict:
+    """
+    Numeric form of the reaction network emitted by
+    `generate_gillespie_model`, for the native (non-tellurium) engines.
+
+    Every reaction of the model is first order, ``X -> Y`` with
+    propensity ``k * X``, so the network is fully described by three
+    flat arrays.
+
+    Returns
+    -------
+    network : dict
+        species   : list[str], declaration order. Species ``i`` is row
+                    ``i + 1`` of the output matrix (row 0 is Time).
+        reactants : (n_reactions,) int array, index into `species`
+        products  : (n_reactions,) int array, index into `species`
+        rates     : (n_reactions,) float array, rate constants
+        x0        : (n_species,) int array, initial state
+        uid       : int, same UID as `generate_gillespie_model`
+        folding   : dict, see `_fold` (identity unless ``fold: true``)
+    """
+
+    _, index_to_species, uid, reactions, folding = _build_model(config)
+    species = [index_to_species[i] for i in range(1, len(index_to_species))]
+    pos = {name: i for i, name in enumerate(species)}
+
+    x0 = np.zeros(len(species), dtype=np.int64)
+    x0[pos["S"]] = config["N"]
+
+    return {
+        "species":   species,
+        "reactants": np.array([pos[r] for r, _, _ in reactions], dtype=np.int64),
+        "products":  np.array([pos[p] for _, p, _ in reactions], dtype=np.int64),
+        "rates":     np.array([k for _, _, k in reactions], dtype=np.float64),
+        "x0":        x0,
+        "uid":       uid,
+        "folding":   folding,
+    }
+
+
+def _build_model(config: dict) -> tuple[str, dict, int, list[tuple[str, str, float]], dict]:
+    """
+    Shared builder: Antimony source, species index, UID, reaction list
+    and folding record (see `_fold`).
+    """
+
     uid = _stable_uid(config)
 
     # =================================================================
@@ -121,21 +211,99 @@ def generate_gillespie_model(config: dict) -> tuple[str, dict, int]:
 
     kre          = config["kre"]
 
+    fold         = bool(config.get("fold", False))
+
     L0 = intermediates[0]
 
+    # =================================================================
+    # Reactions
+    # =================================================================
+    # Collected first and rendered below, so that the folding pass can
+    # drop reactions and species before anything is emitted. Sections
+    # are (comment, index of their first reaction).
+    reactions: list[tuple[str, str, float]] = []
+    laws: list[str] = []
+    sections: list[tuple[str, int]] = []
+
+    def emit(reactant: str, product: str, law: str, rate: float) -> None:
+        reactions.append((reactant, product, float(rate)))
+        laws.append(law)
+
+    def section(comment: str) -> None:
+        sections.append((comment, len(reactions)))
+
+    # ---- Association ----
+    section("Association")
+    emit("S", f"HM{L0}", "kon * f", kon * f)
+    emit("S", f"HT{L0}", "kon * (1 - f)", kon * (1 - f))
+
+    # ---- Dissociation: same continuous law for HM and HT ----
+    for label in ("HM", "HT"):
+        section(f"Dissociation ({label})")
+        for L in intermediates:
+            emit(f"{label}{L}", "S", f"({_expr_k_off1(L)})", _k_off1(L, config))
+
+    # ---- Extension: per-nt rate rescaled by bucket spacing ----
+    # The per-bucket transition rate is kext / Δ, where Δ is the gap
+    # between consecutive bucket lengths. This makes kext interpretable
+    # as "nucleotides extended per unit time", independent of the
+    # discretization choice. HT is gated by eps_mm.
+    for label in ("HM", "HT"):
+        suffix = " * eps_mm" if label == "HT" else ""
+        gate = eps_mm if label == "HT" else 1.0
+        section(f"Extension ({label})")
+        for a, b in zip(intermediates, intermediates[1:]):
+            delta = b - a
+            emit(
+                f"{label}{a}", f"{label}{b}",
+                f"(kext / {delta}){suffix}", kext / delta * gate,
+            )
+
+    # ---- D-loop formation: HM_L -> DHM_L, HT_L -> DHT_L ----
+    # The target keeps the length, so k_off2(L) and DLC histograms
+    # remain well-defined downstream.
+    for label in ("HM", "HT"):
+        d_label = "DHM" if label == "HM" else "DHT"
+        suffix = " * eps_mm" if label == "HT" else ""
+        gate = eps_mm if label == "HT" else 1.0
+        section(f"D-loop formation ({label})")
+        for L in intermediates:
+            emit(
+                f"{label}{L}", f"{d_label}{L}",
+                f"kdloop * ({_expr_p_dloop(L)}){suffix}",
+                kdloop * _p_dloop(L, config) * gate,
+            )
+
+    # ---- D-loop disruption: inverse-length scaling ----
+    for d_label in ("DHM", "DHT"):
+        section(f"D-loop disruption ({d_label})")
+        for L in intermediates:
+            emit(f"{d_label}{L}", "S", f"({_expr_k_off2(L)})", _k_off2(L, config))
+
+    # ---- Recombination: any D-loop can transition to R at rate kre ----
+    section("Recombination")
+    for d_label in ("DHM", "DHT"):
+        for L in intermediates:
+            emit(f"{d_label}{L}", "R", "kre", kre)
+
     # =================================================================
     # Build species index in declaration order
     # =================================================================
     # Tellurium emits simulation columns in declaration order, with
     # Time as the implicit column 0. Keep these two lists in sync.
-    index_to_species: dict[int, str] = {0: "Time", 1: "S"}
     declared: list[str] = ["S"]
-
     for prefix in ("HM", "HT", "DHM", "DHT"):
         for L in intermediates:
             declared.append(f"{prefix}{L}")
     declared.append("R")
 
+    folding = _fold(declared, reactions) if fold else {
+        "reactions": list(range(len(reactions))), "dropped": [],
+    }
+    kept = set(folding["reactions"])
+    declared = [name for name in declared if name not in folding["dropped"]]
+
+    index_to_species: dict[int, str] = {0: "Time"}
     for i, name in enumerate(declared, start=1):
         index_to_species[i] = name
 
@@ -148,7 +316,12 @@ def generate_gillespie_model(config: dict) -> tuple[str, dict, int]:
     out.append("    compartment cell = 1;\n\n")
 
     # ---- Parameters ----
-    out.append("    // ---- Parameters ----\n")
+    # A folded model bakes the rate constants into its reactions; the
+    # parameters are still declared (and settable), but have no effect.
+    if fold:
+        out.append("    // ---- Parameters (folded into the rate constants) ----\n")
+    else:
+        out.append("    // ---- Parameters ----\n")
     for name, value in (
         ("N",            N),
         ("f",            f),
@@ -174,87 +347,80 @@ def generate_gillespie_model(config: dict) -> tuple[str, dict, int]:
     out.append("    // ---- Species ----\n")
     out.append("    species S in cell;\n")
     out.append("    // Pre-synaptic complexes (homologous / heterologous)\n")
-    for prefix in ("HM", "HT"):
-        names = ", ".join(f"{prefix}{L}" for L in intermediates)
-        out.append(f"    species {names} in cell;\n")
-    out.append("    // Size-resolved D-loops (homologous / heterologous)\n")
-    for prefix in ("DHM", "DHT"):
-        names = ", ".join(f"{prefix}{L}" for L in intermediates)
-        out.append(f"    species {names} in cell;\n")
-    out.append("    species R in cell;\n\n")
+    for prefix in ("HM", "HT", "DHM", "DHT"):
+        if prefix == "DHM":
+            out.append("    // Size-resolved D-loops (homologous / heterologous)\n")
+        names = ", ".join(f"{prefix}{L}" for L in intermediates if f"{prefix}{L}" in declared)
+        if names:
+            out.append(f"    species {names} in cell;\n")
+    if "R" in declared:
+        out.append("    species R in cell;\n")
+    out.append("\n")
 
     # ---- Initial state ----
     out.append("    // ---- Initial state ----\n")
     out.append(f"    S = {N};\n")
-    for prefix in ("HM", "HT", "DHM", "DHT"):
-        for L in intermediates:
-            out.append(f"    {prefix}{L} = 0;\n")
-    out.append("    R = 0;\n\n")
+    for name in declared[1:]:
+        out.append(f"    {name} = 0;\n")
+    out.append("\n")
 
-    # =================================================================
-    # Reactions
-    # =================================================================
-    rid = 1
+    # ---- Reactions ----
+    # Reaction ids are those of the unfolded model, so a folded model
+    # keeps the numbering of the reactions it retains.
+    bounds = [i for _, i in sections[1:]] + [len(reactions)]
+    first_section = True
+    for (comment, first), last in zip(sections, bounds):
+        ids = [i for i in range(first, last) if i in kept]
+        if not ids:
+            continue
+        out.append(f"    // ---- {comment} ----\n" if first_section else f"\n    // ---- {comment} ----\n")
+        first_section = False
+        for i in ids:
+            reactant, product, rate = reactions[i]
+            law = repr(rate) if fold else laws[i]
+            out.append(f"    R{i + 1}: {reactant} -> {product}; {law} * {reactant};\n")
 
-    def emit(line: str) -> None:
-        nonlocal rid
-        out.append(f"    R{rid}: {line}\n")
-        rid += 1
+    out.append("end\n")
 
-    # ---- Association ----
-    out.append("    // ---- Association ----\n")
-    emit(f"S -> HM{L0}; kon * f * S;")
-    emit(f"S -> HT{L0}; kon * (1 - f) * S;")
+    reactions = [reactions[i] for i in folding["reactions"]]
+    return "".join(out), index_to_species, uid, reactions, folding
 
-    # ---- Dissociation: same continuous law for HM and HT ----
-    for label in ("HM", "HT"):
-        out.append(f"\n    // ---- Dissociation ({label}) ----\n")
-        for L in intermediates:
-            emit(f"{label}{L} -> S; ({_expr_k_off1(L)}) * {label}{L};")
 
-    # ---- Extension: per-nt rate rescaled by bucket spacing ----
-    # The per-bucket transition rate is kext / Δ, where Δ is the gap
-    # between consecutive bucket lengths. This makes kext interpretable
-    # as "nucleotides extended per unit time", independent of the
-    # discretization choice. HT is gated by eps_mm.
-    for label in ("HM", "HT"):
-        suffix = " * eps_mm" if label == "HT" else ""
-        out.append(f"\n    // ---- Extension ({label}) ----\n")
-        for a, b in zip(intermediates, intermediates[1:]):
-            delta = b - a
-            emit(
-                f"{label}{a} -> {label}{b}; "
-                f"(kext / {delta}){suffix} * {label}{a};"
-            )
-
-    # ---- D-loop formation: HM_L -> DHM_L, HT_L -> DHT_L ----
-    # The target keeps the length, so k_off2(L) and DLC histograms
-    # remain well-defined downstream.
-    for label in ("HM", "HT"):
-        d_label = "DHM" if label == "HM" else "DHT"
-        suffix = " * eps_mm" if label == "HT" else ""
-        out.append(f"\n    // ---- D-loop formation ({label}) ----\n")
-        for L in intermediates:
-            emit(
-                f"{label}{L} -> {d_label}{L}; "
-                f"kdloop * ({_expr_p_dloop(L)}){suffix} * {label}{L};"
-            )
+def _fold(species: list[str], reactions: list[tuple[str, str, float]]) -> dict:
+    """
+    Constant folding and dead-reaction elimination.
 
-    # ---- D-loop disruption: inverse-length scaling ----
-    for d_label in ("DHM", "DHT"):
-        out.append(f"\n    // ---- D-loop disruption ({d_label}) ----\n")
-        for L in intermediates:
-            emit(f"{d_label}{L} -> S; ({_expr_k_off2(L)}) * {d_label}{L};")
+    Rate constants are already numeric in `reactions`; this pass drops
+    the reactions whose constant is zero (D-loop formation below
+    `dloop_lmin`, the HT branch when `eps_mm` is 0, ...), then the
+    species that cannot be reached from the initial state (S) through
+    the remaining ones, and the reactions consuming them.
 
-    # ---- Recombination: any D-loop can transition to R at rate kre ----
-    out.append("\n    // ---- Recombination ----\n")
-    for d_label in ("DHM", "DHT"):
-        for L in intermediates:
-            emit(f"{d_label}{L} -> R; kre * {d_label}{L};")
+    Returns
+    -------
+    folding : dict
+        reactions : list[int], indices of the kept reactions in the
+                    unfolded model (reaction ``R{i + 1}``)
+        dropped   : list[str], species removed from the model. They are
+                    identically zero; `methods.make_group` reports them
+                    as such, so grouped series keep their keys.
+    """
 
-    out.append("end\n")
+    live = [i for i, (_, _, rate) in enumerate(reactions) if rate > 0]
+    reachable = {"S"}
+    changed = True
+    while changed:
+        changed = False
+        for i in live:
+            reactant, product, _ = reactions[i]
+            if reactant in reachable and product not in reachable:
+                reachable.add(product)
+                changed = True
 
-    return "".join(out), index_to_species, uid
+    return {
+        "reactions": [i for i in live if reactions[i][0] in reachable],
+        "dropped":   [name for name in species if name not in reachable],
+    }
 
 
 # =====================================================================
@@ -263,4 +429,6 @@ def generate_gillespie_model(config: dict) -> tuple[str, dict, int]:
 
 def export_sbml(antimony_str: str) -> str:
     """Compile the Antimony source to an SBML L3v2 XML string."""
+    import tellurium as te
+
     return te.antimonyToSBML(antimony_str)
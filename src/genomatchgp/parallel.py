@@ -0,0 +1,64 @@
+"""
+Parallel backends of `run`.
+
+    - mpi       : one process per MPI rank, started by mpirun/srun
+                  (historical behavior).
+    - processes : one process per core of the node, no MPI stack
+                  (see `pool.WorkerPool`).
+    - serial    : a single process.
+
+mpi4py is only imported by the mpi backend, so the other two neither
+need an MPI installation nor pay for MPI initialization. Outside MPI,
+the code that is written against a communicator gets a `SerialComm`.
+"""
+
+
+BACKENDS = ("mpi", "processes", "serial")
+
+_RANK = 0
+
+
+class SerialComm:
+    """The subset of `MPI.Comm` used in this package, for one process."""
+
+    def Get_rank(self) -> int:
+        return 0
+
+    def Get_size(self) -> int:
+        return 1
+
+    def Barrier(self) -> None:
+        pass
+
+    def bcast(self, obj, root: int = 0):
+        return obj
+
+    def gather(self, obj, root: int = 0) -> list:
+        return [obj]
+
+    def reduce(self, obj, op=None, root: int = 0):
+        return obj
+
+
+def get_comm(backend: str):
+    """Communicator of the calling process for `backend`."""
+    global _RANK
+    if backend == "mpi":
+        from mpi4py import MPI
+        comm = MPI.COMM_WORLD
+    elif backend in ("processes", "serial"):
+        comm = SerialComm()
+    else:
+        raise ValueError(f"Unknown backend {backend!r}, expected one of {BACKENDS}.")
+    _RANK = comm.Get_rank()
+    return comm
+
+
+def set_rank(rank: int) -> None:
+    """Label of the calling process in logs (MPI rank or worker slot)."""
+    global _RANK
+    _RANK = rank
+
+
+def rank() -> int:
+    return _RANK
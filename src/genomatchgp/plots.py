@@ -0,0 +1,109 @@
+"""
+Figure rendering of a finished run (end of `run`, `plot` subcommand).
+
+The figures only depend on the aggregated series (`aggregate.npz`) and,
+for the first-passage mode, on the survival curves (`survival.csv`), so
+they can be regenerated at any time without reading the records.
+
+Every figure is an independent job, rendered by a pool of worker
+processes: matplotlib holds the GIL, so threads would not help. Lines
+are decimated to about `max_points` points (`methods.decimate`) and the
+smoothed DLC curves of all windows come from one cumulative sum
+(`methods.moving_averages`).
+
+The pool uses the "spawn" start method: the parent may be an MPI rank,
+which should not be forked.
+"""
+
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from os.path import join
+
+import numpy as np
+
+from genomatchgp import methods
+
+
+DLC_WINDOWS = (0, 100, 200)
+DEFAULT_MAX_POINTS = 2000
+
+Job = tuple[str, tuple, dict]
+
+
+def aggregate_jobs(
+        mean: dict,
+        sd: dict,
+        plots_dir: str,
+        max_points: int | None = DEFAULT_MAX_POINTS,
+        decimation: str = "minmax",
+) -> list[Job]:
+    """Trajectory panels and smoothed DLC curves of an aggregated ensemble."""
+
+    options = {"max_points": max_points, "decimation": decimation}
+    jobs: list[Job] = [(
+        "plot_trajectories",
+        (mean, join(plots_dir, "aggregated_trajectories.png")),
+        {"sd": sd, **options},
+    )]
+
+    # The band is the unsmoothed across-cell SD (see `methods.plot_dlc`)
+    dlc = methods.moving_averages(mean["DLC homologous"], DLC_WINDOWS)
+    for c in DLC_WINDOWS:
+        jobs.append((
+            "plot_dlc",
+            (dlc[c], 0, join(plots_dir, f"aggregated_homologous_DLC_convo{c}.png")),
+            {"sd": sd["DLC homologous"], **options},
+        ))
+    return jobs
+
+
+def survival_jobs(curves: dict, plots_dir: str) -> list[Job]:
+    """Survival figure of the first-passage mode, from `survival.csv` columns."""
+    survival = {k[len("S "):]: v for k, v in curves.items() if k.startswith("S ")}
+    return [("plot_survival", (curves["time"], survival, join(plots_dir, "first_passage_survival.png")), {})]
+
+
+def render(jobs: list[Job], workers: int = 1) -> None:
+    """
+    Run the plotting `jobs`, on up to `workers` processes (no more than
+    there are jobs and cores) if that is more than one.
+    """
+
+    workers = min(workers, len(jobs), os.cpu_count() or 1)
+    if workers <= 1:
+        for name, args, kwargs in jobs:
+            getattr(methods, name)(*args, **kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = [pool.submit(_run_job, name, args, kwargs) for name, args, kwargs in jobs]
+        for f in futures:
+            f.result()
+
+
+def _run_job(name: str, args: tuple, kwargs: dict) -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    getattr(methods, name)(*args, **kwargs)
+
+
+def plot_aggregate(
+        mean: dict,
+        sd: dict,
+        plots_dir: str,
+        workers: int = 1,
+        max_points: int | None = DEFAULT_MAX_POINTS,
+        decimation: str = "minmax",
+) -> None:
+    """Render every figure of an aggregated ensemble into `plots_dir`."""
+    render(aggregate_jobs(mean, sd, plots_dir, max_points, decimation), workers)
+
+
+def load_survival(path: str) -> dict[str, np.ndarray]:
+    """Columns of a `survival.csv` written by the first-passage mode."""
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    return {c: df[c].to_numpy(dtype=np.float64) for c in df.columns}
@@ -0,0 +1,274 @@
+"""
+Single-node process backend of `run` (`--backend processes`).
+
+The parent starts one worker process per slot and feeds them chunks of
+cells through a queue, which balances the load like the dynamic MPI
+schedule. Workers live for a whole attempt, which may run in several
+waves (`WorkerPool.run`). Each worker receives the model once, at
+start-up, and folds its cells into running statistics
+(`stats.EnsembleStats`) that it publishes at exit into its slot of a
+shared-memory ensemble buffer:
+
+    counts  (n_workers,)                         cells per worker
+    moments (n_workers, 2, n_series, n_points)   mean and M2 per series
+
+The parent merges the slots, so no per-cell dict is ever pickled back.
+Scalar `methods.summary_statistics` observables, when requested, come
+back at the end of every wave with each worker's utilization row as
+small running statistics. Records and manifest checkpoints are written
+by the workers under their slot number, exactly as MPI ranks do, and
+checkpointed at every wave boundary.
+
+`open_session`, `simulate_chunk` and `close_session` are the share of an
+attempt kept by one worker, or by one MPI or serial rank of `run`.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing.shared_memory import SharedMemory
+from os.path import join
+
+import numpy as np
+
+from genomatchgp import manifest, methods, parallel, profiling, records
+from genomatchgp.cache import ResultCache, run_cached
+from genomatchgp.simulation import run_cells
+from genomatchgp.stats import EnsembleStats
+
+
+class WorkerPool:
+    """
+    Worker processes that simulate one attempt of a run, possibly in
+    several waves of cells (`run --target-ci`).
+
+    Every worker keeps one record writer and one manifest checkpoint for
+    the whole attempt and checkpoints at the end of each wave. `run`
+    returns once a wave is complete; `close` stops the workers and
+    returns the statistics of the series over all waves.
+
+    Parameters
+    ----------
+    n_workers : int
+        Number of worker processes (slots).
+    chunk : int
+        Cells handed to a worker at once.
+    context : dict
+        What the workers need to simulate and record cells: engine,
+        model_id, species_to_index, model, params, outdir, records_fmt,
+        attempt, batch_size, interval (checkpoint), observables,
+        cache_root and writer_options (see `records.open_writer`).
+    """
+
+    def __init__(self, n_workers: int, chunk: int, context: dict):
+        params = context["params"]
+        self.n_workers = n_workers
+        self.chunk = chunk
+        self.series = methods.grouping_operator(context["species_to_index"], params["intermediates"])["series"]
+        self.shape = (n_workers, 2, len(self.series), params["timepoints"] // params["every"])
+        self.header = n_workers * np.dtype(np.float64).itemsize
+
+        self.shm = SharedMemory(
+            create=True, size=self.header + int(np.prod(self.shape)) * np.dtype(np.float64).itemsize,
+        )
+        np.ndarray((n_workers,), dtype=np.float64, buffer=self.shm.buf)[:] = 0
+
+        self.tasks: mp.Queue = mp.Queue()
+        self.results: mp.Queue = mp.Queue()
+        barrier = mp.Barrier(n_workers)
+        self.workers = [
+            mp.Process(
+                target=_worker,
+                args=(slot, self.tasks, self.results, barrier, self.shm.name, self.shape, self.series, context),
+            )
+            for slot in range(n_workers)
+        ]
+        for w in self.workers:
+            w.start()
+
+    def run(self, todo: list[int]) -> tuple[EnsembleStats, list[tuple[int, int, float, float]]]:
+        """
+        Simulate the wave of cells `todo`. Returns the statistics of the
+        scalar observables of this wave (empty if there are none) and
+        one (slot, cells, busy, wall) row per worker for the wave, as
+        expected by `scheduler.print_utilization`.
+        """
+
+        for start in range(0, len(todo), self.chunk):
+            self.tasks.put(todo[start:start + self.chunk])
+        for _ in range(self.n_workers):
+            self.tasks.put(_END_OF_WAVE)
+
+        rows = []
+        obs_stats = EnsembleStats()
+        while len(rows) < self.n_workers:
+            try:
+                row, obs = self.results.get(timeout=1.0)
+                rows.append(row)
+                obs_stats.merge(obs)
+            except queue.Empty:
+                self._check_workers()
+        return obs_stats, sorted(rows)
+
+    def close(self) -> EnsembleStats:
+        """Stop the workers; merged statistics of the series of all waves."""
+
+        try:
+            for _ in range(self.n_workers):
+                self.tasks.put(None)
+            for w in self.workers:
+                w.join()
+            self._check_workers()
+
+            counts = np.ndarray((self.n_workers,), dtype=np.float64, buffer=self.shm.buf)
+            moments = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf, offset=self.header)
+            stats = EnsembleStats()
+            for slot in range(self.n_workers):
+                if counts[slot] == 0:
+                    continue
+                part = EnsembleStats()
+                part.n = int(counts[slot])
+                part.mean = {k: moments[slot, 0, i].copy() for i, k in enumerate(self.series)}
+                part.m2   = {k: moments[slot, 1, i].copy() for i, k in enumerate(self.series)}
+                stats.merge(part)
+            del counts, moments
+        finally:
+            self._release()
+        return stats
+
+    def _check_workers(self) -> None:
+        dead = [w for w in self.workers if w.exitcode not in (None, 0)]
+        if dead:
+            for w in self.workers:
+                w.terminate()
+            self._release()
+            raise RuntimeError(f"Worker process exited with code {dead[0].exitcode}.")
+
+    def _release(self) -> None:
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+# Task marking the end of a wave; every worker takes exactly one
+_END_OF_WAVE: list[int] = []
+
+
+def _worker(
+        slot: int,
+        tasks: mp.Queue,
+        results: mp.Queue,
+        barrier,
+        shm_name: str,
+        shape: tuple[int, ...],
+        series: list[str],
+        context: dict,
+) -> None:
+    parallel.set_rank(slot)
+    t_start = time.perf_counter()
+
+    session = open_session(context, slot)
+    obs_stats = EnsembleStats()
+
+    n_done, busy = 0, 0.0
+    while (uids := tasks.get()) is not None:
+        if uids == _END_OF_WAVE:
+            session["checkpoint"].commit(session["stats"], session["writer"], force=True)
+            results.put(((slot, n_done, busy, time.perf_counter() - t_start), obs_stats))
+            obs_stats = EnsembleStats()
+            n_done, busy = 0, 0.0
+            # Wait for the other workers to take their end-of-wave task
+            barrier.wait()
+            t_start = time.perf_counter()
+            continue
+
+        t0 = time.perf_counter()
+        simulate_chunk(session, uids, obs_stats)
+        busy += time.perf_counter() - t0
+        n_done += len(uids)
+
+    stats = close_session(session)
+
+    # Publish the running statistics into this worker's slot
+    shm = SharedMemory(name=shm_name)
+    header = shape[0] * np.dtype(np.float64).itemsize
+    counts = np.ndarray((shape[0],), dtype=np.float64, buffer=shm.buf)
+    moments = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=header)
+    if stats.n:
+        for i, k in enumerate(series):
+            moments[slot, 0, i] = stats.mean[k]
+            moments[slot, 1, i] = stats.m2[k]
+    counts[slot] = stats.n
+    del counts, moments
+    shm.close()
+
+
+# =====================================================================
+# Share of an attempt kept by one worker or rank
+# =====================================================================
+
+def open_session(context: dict, rank: int) -> dict:
+    """
+    State of one worker slot or rank for an attempt, kept across its
+    waves: the `context` (see `WorkerPool`), the record writer, manifest
+    checkpoint and result cache of the rank, and the running statistics
+    of the series.
+    """
+
+    cache = None
+    if context["cache_root"]:
+        cache = ResultCache(context["cache_root"], context["model_id"], context["engine"])
+    return {
+        "context":    context,
+        "writer":     records.open_writer(
+            context["records_fmt"], join(context["outdir"], "records"), rank, context["attempt"],
+            **context["writer_options"],
+        ),
+        "checkpoint": manifest.Checkpoint(context["outdir"], context["attempt"], rank, context["interval"]),
+        "cache":      cache,
+        # Every cell is folded into running statistics as soon as it
+        # is simulated; ranks and workers merge them at the end.
+        "stats":      EnsembleStats(),
+    }
+
+
+def simulate_chunk(session: dict, uids: list[int], obs_stats: EnsembleStats) -> None:
+    """
+    Simulate the cells `uids` (or load them from the result cache),
+    record them, fold their series into the session's statistics and
+    their scalar observables into `obs_stats`, then checkpoint.
+    """
+
+    context, writer = session["context"], session["writer"]
+    observables = context["observables"]
+    groups = run_cached(
+        session["cache"], uids,
+        lambda u: run_cells(
+            context["engine"], u, context["model_id"], context["species_to_index"],
+            context["model"], context["params"], writer, context["outdir"],
+            context["batch_size"], context["records_fmt"] == "events",
+        ),
+        writer,
+    )
+    # One batched grouping and statistics update for the whole chunk
+    with profiling.phase("make_groups", cells=len(groups)):
+        batch = methods.make_groups(np.stack([g.counts for g in groups]), groups[0].time, groups[0].operator)
+        session["stats"].update_batch(batch)
+    if observables:
+        for cell in methods.split_groups(batch):
+            summary = methods.summary_statistics(cell)
+            obs_stats.update({k: summary[k] for k in observables})
+    session["checkpoint"].update(uids)
+    with profiling.phase("checkpoint"):
+        session["checkpoint"].commit(session["stats"], writer)
+
+
+def close_session(session: dict) -> EnsembleStats:
+    """Close the writer and write the final checkpoint; the statistics of the series."""
+
+    with profiling.phase("checkpoint"):
+        if session["writer"] is not None:
+            session["writer"].close()
+        session["checkpoint"].commit(session["stats"], force=True)
+    return session["stats"]
@@ -0,0 +1,169 @@
+"""
+Opt-in per-phase timing (`run --profile`).
+
+Code paths wrap their phases in `phase(name, **args)` and report counts
+with `count(name, value, **args)`. Both are no-ops until `enable` is
+called, which is cheap enough for per-cell use: a disabled `phase`
+returns a shared null context manager.
+
+When enabled, every rank keeps its spans in memory. `write_trace`
+gathers them on rank 0 into one Chrome trace (`chrome://tracing`,
+Perfetto), with one process per rank and timestamps aligned on rank 0's
+clock. `print_summary` prints, per phase, the number of spans, the
+total time, percentiles of the span durations and the rank imbalance
+(max over mean of the per-rank totals).
+"""
+
+import contextlib
+import json
+import time
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from mpi4py import MPI
+
+
+_NULL = contextlib.nullcontext()
+_TRACE: "Trace | None" = None
+
+
+class Trace:
+    """Spans and counters of one rank."""
+
+    def __init__(self, rank: int, t_ref: float):
+        self.rank = rank
+        # perf_counter is monotonic but has an arbitrary origin per
+        # process; anchor it to the wall clock, relative to rank 0.
+        self.offset = time.time() - time.perf_counter() - t_ref
+        self.spans: list[tuple[str, float, float, dict]] = []
+        self.counters: list[tuple[str, float, float, dict]] = []
+
+
+class _Span:
+    __slots__ = ("name", "args", "t0")
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter()
+        _TRACE.spans.append((self.name, self.t0, t1 - self.t0, self.args))
+        return False
+
+
+def enable(comm: "MPI.Comm") -> None:
+    """Start recording on every rank of `comm` (collective)."""
+    global _TRACE
+    t_ref = comm.bcast(time.time(), root=0)
+    _TRACE = Trace(comm.Get_rank(), t_ref)
+
+
+def enabled() -> bool:
+    return _TRACE is not None
+
+
+def phase(name: str, **args):
+    """Context manager timing one phase; `args` end up in the trace."""
+    if _TRACE is None:
+        return _NULL
+    return _Span(name, args)
+
+
+def count(name: str, value: float, **args) -> None:
+    """Record a counter sample (e.g. events of a cell)."""
+    if _TRACE is not None:
+        _TRACE.counters.append((name, time.perf_counter(), float(value), args))
+
+
+# =====================================================================
+# Output
+# =====================================================================
+
+def write_trace(comm: "MPI.Comm", path: str) -> None:
+    """Gather every rank's spans on rank 0 and write a Chrome trace."""
+    if _TRACE is None:
+        return
+
+    off = _TRACE.offset
+    events = [
+        {
+            "name": name, "ph": "X", "pid": _TRACE.rank, "tid": 0,
+            "ts": (t0 + off) * 1e6, "dur": dur * 1e6, "args": args,
+        }
+        for name, t0, dur, args in _TRACE.spans
+    ]
+    events += [
+        {
+            "name": name, "ph": "C", "pid": _TRACE.rank, "tid": 0,
+            "ts": (t + off) * 1e6, "args": {name: value, **args},
+        }
+        for name, t, value, args in _TRACE.counters
+    ]
+
+    parts = comm.gather(events, root=0)
+    if comm.Get_rank() != 0:
+        return
+
+    trace = [
+        {"name": "process_name", "ph": "M", "pid": r, "args": {"name": f"rank {r}"}}
+        for r in range(len(parts))
+    ]
+    for part in parts:
+        trace.extend(part)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, fh)
+    print(f"[rank 0] Trace written to {path}", flush=True)
+
+
+def print_summary(comm: "MPI.Comm") -> None:
+    """Per-phase percentiles and rank imbalance, printed on rank 0."""
+    if _TRACE is None:
+        return
+
+    durations: dict[str, list[float]] = {}
+    for name, _, dur, _ in _TRACE.spans:
+        durations.setdefault(name, []).append(dur)
+    counters: dict[str, list[float]] = {}
+    for name, _, value, _ in _TRACE.counters:
+        counters.setdefault(name, []).append(value)
+
+    parts = comm.gather((durations, counters), root=0)
+    if comm.Get_rank() != 0:
+        return
+
+    size = len(parts)
+    names = list(dict.fromkeys(k for d, _ in parts for k in d))
+    print("[rank 0] Phase timings (durations in ms, imbalance = max/mean of per-rank totals)", flush=True)
+    print(
+        f"    {'phase':<14} {'spans':>8} {'total (s)':>10} {'p50':>9} {'p90':>9} "
+        f"{'p99':>9} {'max':>9} {'imbal':>6}",
+        flush=True,
+    )
+    for name in names:
+        per_rank = [np.asarray(d.get(name, []), dtype=np.float64) for d, _ in parts]
+        allv = np.concatenate(per_rank)
+        totals = np.array([v.sum() for v in per_rank])
+        p50, p90, p99 = np.percentile(allv, [50, 90, 99]) * 1e3
+        imbalance = totals.max() / max(totals.sum() / size, 1e-12)
+        print(
+            f"    {name:<14} {allv.size:>8} {allv.sum():>10.2f} {p50:>9.2f} {p90:>9.2f} "
+            f"{p99:>9.2f} {allv.max() * 1e3:>9.2f} {imbalance:>6.2f}",
+            flush=True,
+        )
+
+    counter_names = list(dict.fromkeys(k for _, c in parts for k in c))
+    for name in counter_names:
+        allv = np.concatenate([np.asarray(c.get(name, []), dtype=np.float64) for _, c in parts])
+        p50, p90, p99 = np.percentile(allv, [50, 90, 99])
+        print(
+            f"    {name:<14} {allv.size:>8} samples, total {allv.sum():.0f}, "
+            f"p50 {p50:.0f}, p90 {p90:.0f}, p99 {p99:.0f}, max {allv.max():.0f}",
+            flush=True,
+        )
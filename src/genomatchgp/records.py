@@ -0,0 +1,439 @@
+"""
+Per-cell record backends.
+
+Three on-disk layouts are supported:
+
+    - store : one chunked, append-only binary file per rank
+              (`rank_{r}.bin`, cells x species x points, int32 counts)
+              plus a JSON index (`rank_{r}.json`) with the model
+              metadata (species, intermediates, time row) and the cell
+              ids in file order. Readers memory-map the files and
+              compute one series across all cells from the species it
+              sums, without touching the others.
+    - npz   : one `simulation_{uid}.npz` per cell, holding the arrays of
+              `methods.Group.record` (historical layout, kept for
+              compatibility).
+    - events: event-sparse trajectories (`sparse.SparseTrajectory`),
+              one append-only file of (time, reaction) pairs per rank
+              (`events_rank_{r}.bin`) and a JSON index with the network
+              and each cell's offset. Size scales with the number of
+              firings, not with the grid.
+
+Only raw species counts are stored: the `make_group` series are linear
+combinations of them (see `methods.Group`) and are recomputed on read.
+
+The store avoids creating hundreds of thousands of small files, which
+is what hurts parallel filesystems most. Its index is rewritten
+atomically after every flushed chunk and only lists cells whose data is
+fully on disk, so a crashed run leaves a readable store.
+
+Writers can run on a background thread (`AsyncWriter`, `run
+--write-queue`): the simulation loop hands finished cells to a bounded
+queue and carries on while the previous ones are compressed and
+written, blocking only when the queue is full. npz records use a
+selectable zip codec and level (`CODECS`, `run --codec/--level`).
+
+Resumed runs (see `manifest`) write their files with an attempt suffix,
+`rank_{r}.{attempt}.bin` and so on, next to those of earlier attempts.
+A cell flushed by an attempt that died before checkpointing it is
+simulated again by the next one; readers keep its first copy.
+"""
+
+import glob
+import json
+import os
+import queue
+import threading
+import zipfile
+from os.path import join
+
+import numpy as np
+
+from genomatchgp.methods import Group, grouping_operator, series
+from genomatchgp.sparse import SparseTrajectory
+
+
+RECORD_FORMATS = ("store", "npz", "events", "none")
+
+STORE_DTYPE = np.int32
+EVENT_DTYPE = np.dtype([("t", "<f8"), ("reaction", "<u2")])
+
+# Zip codecs of npz records; np.load reads all of them
+CODECS = {
+    "zlib": zipfile.ZIP_DEFLATED,
+    "bz2":  zipfile.ZIP_BZIP2,
+    "lzma": zipfile.ZIP_LZMA,
+    "none": zipfile.ZIP_STORED,
+}
+
+
+def save_npz(path: str, arrays: dict, codec: str = "zlib", level: int | None = None) -> None:
+    """
+    `np.savez_compressed` with a choice of zip `codec` and compression
+    `level` (zlib 0-9, bz2 1-9, ignored by lzma and none; None for the
+    codec's default). Written to a temporary file and renamed.
+    """
+    tmp = f"{path}.tmp"
+    with zipfile.ZipFile(tmp, "w", compression=CODECS[codec], compresslevel=level) as zf:
+        for name, value in arrays.items():
+            with zf.open(f"{name}.npy", "w", force_zip64=True) as fh:
+                np.lib.format.write_array(fh, np.asanyarray(value), allow_pickle=False)
+    os.replace(tmp, path)
+
+
+# =====================================================================
+# Writers
+# =====================================================================
+
+class NpzWriter:
+    """One compressed `.npz` per cell."""
+
+    def __init__(self, records_dir: str, codec: str = "zlib", level: int | None = None):
+        self.records_dir = records_dir
+        self.codec = codec
+        self.level = level
+
+    def write(self, uid: int, group: Group) -> None:
+        save_npz(join(self.records_dir, f"simulation_{uid}.npz"), group.record(), self.codec, self.level)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class StoreWriter:
+    """Append cells of one rank to `rank_{r}.bin`, `chunk_cells` at a time."""
+
+    def __init__(self, records_dir: str, rank: int, chunk_cells: int = 64, attempt: int = 0):
+        stem = _stem(f"rank_{rank}", attempt)
+        self.bin_path   = join(records_dir, f"{stem}.bin")
+        self.index_path = join(records_dir, f"{stem}.json")
+        self.chunk_cells = chunk_cells
+
+        self.species: list[str] | None = None
+        self.intermediates: list[int] = []
+        self.time: list[float] = []
+        self.cells: list[int] = []
+        self._pending_ids: list[int] = []
+        self._pending: list[np.ndarray] = []
+        self._fh = open(self.bin_path, "wb")
+
+    def write(self, uid: int, group: Group) -> None:
+        if self.species is None:
+            self.species = group.operator["species"]
+            self.intermediates = group.operator["intermediates"]
+            self.time = group.time.tolist()
+        block = np.asarray(group.counts, dtype=STORE_DTYPE)
+        self._pending_ids.append(int(uid))
+        self._pending.append(block)
+        if len(self._pending) >= self.chunk_cells:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self._fh.write(np.stack(self._pending).tobytes())
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self.cells.extend(self._pending_ids)
+        self._pending, self._pending_ids = [], []
+        self._write_index()
+
+    def close(self) -> None:
+        self.flush()
+        self._fh.close()
+        self._write_index()
+
+    def _write_index(self) -> None:
+        index = {
+            "species":       self.species or [],
+            "intermediates": self.intermediates,
+            "time":          self.time,
+            "dtype":         np.dtype(STORE_DTYPE).str,
+            "cells":         self.cells,
+        }
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(index, fh)
+        os.replace(tmp, self.index_path)
+
+
+class EventWriter:
+    """Append the events of each `SparseTrajectory` of one rank."""
+
+    def __init__(self, records_dir: str, rank: int, attempt: int = 0):
+        stem = _stem(f"events_rank_{rank}", attempt)
+        self.bin_path   = join(records_dir, f"{stem}.bin")
+        self.index_path = join(records_dir, f"{stem}.json")
+        self.index: dict | None = None
+        self._offset = 0
+        self._fh = open(self.bin_path, "wb")
+
+    def write(self, uid: int, traj: SparseTrajectory) -> None:
+        if self.index is None:
+            self.index = {
+                "species":       traj.species,
+                "reactants":     traj.reactants.tolist(),
+                "products":      traj.products.tolist(),
+                "x0":            traj.x0.tolist(),
+                "intermediates": traj.intermediates,
+                "timepoints":    traj.t_end,
+                "every":         traj.every,
+                "cells":         [],
+            }
+        events = np.empty(len(traj), dtype=EVENT_DTYPE)
+        events["t"] = traj.times
+        events["reaction"] = traj.reactions
+        self._fh.write(events.tobytes())
+        self.index["cells"].append([int(uid), traj.t0, self._offset, len(traj)])
+        self._offset += len(traj)
+
+    def flush(self) -> None:
+        if self.index is None:
+            return
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        tmp = f"{self.index_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.index, fh)
+        os.replace(tmp, self.index_path)
+
+    def close(self) -> None:
+        self.flush()
+        self._fh.close()
+
+
+_FLUSH = object()
+_CLOSE = object()
+
+
+class AsyncWriter:
+    """
+    Runs another writer on a background thread.
+
+    `write` enqueues the cell and returns; it blocks while `max_pending`
+    cells are already waiting, which bounds the memory held by the queue
+    and slows the simulation down to the pace of the disk. `flush` and
+    `close` wait until everything enqueued before them has been handled.
+    The first error raised by the wrapped writer stops all later writes
+    and is re-raised by the next `write`, `flush` or `close` call.
+    """
+
+    def __init__(self, writer: "NpzWriter | StoreWriter | EventWriter", max_pending: int = 64):
+        self.writer = writer
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="record-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, uid: int, group) -> None:
+        self._check()
+        self._queue.put((uid, group))
+
+    def flush(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        self._check()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        self._check()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _CLOSE:
+                    self.writer.close()
+                elif self._error is not None:
+                    pass    # drain without writing after a failure
+                elif item is _FLUSH:
+                    self.writer.flush()
+                else:
+                    self.writer.write(*item)
+            except BaseException as exc:
+                if self._error is None:
+                    self._error = exc
+            finally:
+                self._queue.task_done()
+            if item is _CLOSE:
+                return
+
+    def _check(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Record writer failed: {self._error!r}") from self._error
+
+
+def open_writer(
+        fmt: str,
+        records_dir: str,
+        rank: int,
+        attempt: int = 0,
+        codec: str = "zlib",
+        level: int | None = None,
+        queue_size: int = 0,
+) -> NpzWriter | StoreWriter | EventWriter | AsyncWriter | None:
+    """
+    Record writer for `fmt`, or None when records are disabled. With a
+    positive `queue_size`, it runs on a background thread behind a queue
+    of that many cells (`AsyncWriter`). `codec` and `level` apply to npz
+    records.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r}, expected one of {tuple(CODECS)}.")
+    if fmt == "store":
+        writer = StoreWriter(records_dir, rank, attempt=attempt)
+    elif fmt == "npz":
+        writer = NpzWriter(records_dir, codec, level)
+    elif fmt == "events":
+        writer = EventWriter(records_dir, rank, attempt)
+    elif fmt == "none":
+        return None
+    else:
+        raise ValueError(f"Unknown records format {fmt!r}, expected one of {RECORD_FORMATS}.")
+    return AsyncWriter(writer, queue_size) if queue_size > 0 else writer
+
+
+def clear_store(records_dir: str) -> None:
+    """Remove the records of a previous run (possibly of another rank count or format)."""
+    for pattern in ("rank_*.bin", "rank_*.json", "events_rank_*.bin", "events_rank_*.json", "simulation_*.npz"):
+        for path in glob.glob(join(records_dir, pattern)):
+            os.remove(path)
+
+
+def _stem(name: str, attempt: int) -> str:
+    return name if attempt == 0 else f"{name}.{attempt}"
+
+
+def _indexes(records_dir: str, prefix: str) -> list[str]:
+    """
+    Index files `{prefix}{rank}[.{attempt}].json` in (attempt, rank)
+    order, so that readers keeping the first copy of a cell keep the
+    earliest attempt's.
+    """
+
+    def key(path: str) -> tuple[int, int]:
+        rank, _, attempt = os.path.basename(path)[len(prefix):-len(".json")].partition(".")
+        return int(attempt or 0), int(rank)
+
+    return sorted(glob.glob(join(records_dir, f"{prefix}*.json")), key=key)
+
+
+# =====================================================================
+# Reader
+# =====================================================================
+
+class RecordStore:
+    """
+    Read-only, memory-mapped view over all `rank_*` files of a store.
+
+    Rows of `series(name)` follow `cell_ids`, i.e. attempt, rank, then
+    append order, not necessarily sorted by cell id. Cells written more
+    than once (by a resumed run) appear once, with their first copy.
+    """
+
+    def __init__(self, records_dir: str):
+        self.species: list[str] = []
+        self.time = np.empty(0, dtype=np.float64)
+        self.operator: dict | None = None
+        self._parts: list[np.memmap] = []
+        self._keep: list[np.ndarray] = []
+        ids: list[int] = []
+        seen: set[int] = set()
+
+        for index_path in _indexes(records_dir, "rank_"):
+            with open(index_path, "r", encoding="utf-8") as fh:
+                index = json.load(fh)
+            if not index["cells"]:
+                continue
+            if "species" not in index:
+                raise ValueError(f"{index_path}: grouped-series store from an older version, not readable.")
+            if self.species and index["species"] != self.species:
+                raise ValueError(f"{index_path}: species differ from the other ranks.")
+            if self.operator is None:
+                self.species = index["species"]
+                self.time = np.array(index["time"], dtype=np.float64)
+                species_to_index = {"Time": 0, **{name: i + 1 for i, name in enumerate(self.species)}}
+                self.operator = grouping_operator(species_to_index, index["intermediates"])
+            shape = (len(index["cells"]), len(self.species), len(self.time))
+            bin_path = index_path[: -len(".json")] + ".bin"
+            self._parts.append(np.memmap(bin_path, dtype=index["dtype"], mode="r", shape=shape))
+
+            keep = np.array([uid not in seen for uid in index["cells"]], dtype=bool)
+            self._keep.append(keep)
+            for uid in index["cells"]:
+                if uid not in seen:
+                    seen.add(uid)
+                    ids.append(uid)
+
+        self.cell_ids = np.array(ids, dtype=np.int64)
+        self._row = {uid: i for i, uid in enumerate(ids)}
+
+    def __len__(self) -> int:
+        return len(self.cell_ids)
+
+    @property
+    def series_names(self) -> list[str]:
+        return self.operator["series"] if self.operator is not None else []
+
+    def series(self, name: str) -> np.ndarray:
+        """(n_cells, n_points) array of one series across all cells."""
+        if not self._parts:
+            return np.empty((0, len(self.time)), dtype=np.float64)
+        # Duplicates are dropped after `series` has gathered the member
+        # rows, so that only those are read from the memory map
+        return np.concatenate([
+            series(part, self.time, self.operator, name)[keep]
+            for part, keep in zip(self._parts, self._keep)
+        ])
+
+    def cell(self, uid: int) -> Group:
+        """The `make_group` Group of one cell."""
+        row = self._row[uid]
+        for part, keep in zip(self._parts, self._keep):
+            rows = np.flatnonzero(keep)
+            if row < len(rows):
+                return Group(np.array(part[rows[row]]), self.time, self.operator)
+            row -= len(rows)
+        raise KeyError(uid)
+
+
+class EventStore:
+    """Read-only view over all `events_rank_*` files, one trajectory at a time."""
+
+    def __init__(self, records_dir: str):
+        self._cells: dict[int, tuple[np.memmap, float, int, int, dict]] = {}
+        for index_path in _indexes(records_dir, "events_rank_"):
+            with open(index_path, "r", encoding="utf-8") as fh:
+                index = json.load(fh)
+            bin_path = index_path[: -len(".json")] + ".bin"
+            events = np.memmap(bin_path, dtype=EVENT_DTYPE, mode="r") if os.path.getsize(bin_path) else None
+            network = {
+                "species":   index["species"],
+                "reactants": np.array(index["reactants"], dtype=np.int64),
+                "products":  np.array(index["products"], dtype=np.int64),
+                "x0":        np.array(index["x0"], dtype=np.int64),
+            }
+            params = {k: index[k] for k in ("intermediates", "timepoints", "every")}
+            for uid, t0, offset, count in index["cells"]:
+                self._cells.setdefault(uid, (events, t0, offset, count, (network, params)))
+
+        self.cell_ids = np.array(sorted(self._cells), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def trajectory(self, uid: int) -> SparseTrajectory:
+        """The event-sparse trajectory of one cell."""
+        events, t0, offset, count, (network, params) = self._cells[uid]
+        chunk = events[offset:offset + count] if count else np.empty(0, dtype=EVENT_DTYPE)
+        return SparseTrajectory(network, t0, chunk["t"], chunk["reaction"], params)
+
+    def __iter__(self):
+        for uid in self.cell_ids:
+            yield self.trajectory(int(uid))
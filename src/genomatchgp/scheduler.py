@@ -0,0 +1,153 @@
+"""
+Distribution of replicates over MPI ranks.
+
+Two policies are available:
+
+    - static   : each rank takes `n // size` consecutive cells, the last
+                 rank takes the remainder (historical behavior).
+    - dynamic  : chunked self-scheduling. Ranks claim the next `chunk`
+                 cells from a shared counter held in an MPI window on
+                 rank 0 (atomic fetch-and-add, no dedicated master), so
+                 fast ranks keep pulling work while slow ones finish.
+                 Rank 0 simulates too; a progress thread keeps serving
+                 the window meanwhile (see `dynamic_chunks`).
+
+Per-cell cost varies a lot (Gamma resection delay, stochastic number of
+events), so the dynamic policy removes most of the tail imbalance at the
+final barrier. `utilization_report` prints how much of the wall time
+each rank actually spent simulating. On a single rank (serial backend,
+see `parallel`) both policies reduce to the static split.
+"""
+
+import threading
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from mpi4py import MPI
+
+
+SCHEDULES = ("static", "dynamic")
+
+# Seconds between two calls into MPI by the progress thread of rank 0
+PROGRESS_INTERVAL = 0.005
+
+
+def static_chunks(n_tasks: int, chunk: int, rank: int, size: int) -> Iterator[tuple[int, int]]:
+    """Contiguous slice of the historical static split, cut in chunks."""
+    per_rank = n_tasks // size
+    start = rank * per_rank
+    stop  = (rank + 1) * per_rank if rank != size - 1 else n_tasks
+    for b in range(start, stop, chunk):
+        yield b, min(b + chunk, stop)
+
+
+def dynamic_chunks(comm: "MPI.Comm", n_tasks: int, chunk: int) -> Iterator[tuple[int, int]]:
+    """
+    Yield `(start, stop)` task ranges claimed from a shared counter.
+
+    Collective: every rank of `comm` must iterate the generator to
+    exhaustion, since the underlying window is created and freed
+    collectively.
+
+    The counter lives on rank 0, which also simulates. Most MPI
+    libraries only apply a passive-target fetch-and-add when the target
+    enters the library, so a claim by another rank could wait for rank 0
+    to finish its own chunk. Rank 0 therefore runs a thread that calls
+    into MPI every `PROGRESS_INTERVAL` seconds while the generator is
+    alive. This needs MPI_THREAD_MULTIPLE (mpi4py's default request);
+    with a lower thread level there is no thread, and claims are only
+    served when rank 0 claims its own next chunk: keep chunks small, or
+    enable the library's asynchronous progress (MPICH_ASYNC_PROGRESS=1,
+    Open MPI's progress thread) if the utilization report shows idle
+    ranks.
+    """
+
+    from mpi4py import MPI
+
+    itemsize = MPI.INT64_T.Get_size()
+    win = MPI.Win.Allocate(itemsize if comm.Get_rank() == 0 else 0, itemsize, comm=comm)
+    if comm.Get_rank() == 0:
+        counter = np.frombuffer(win.tomemory(), dtype=np.int64)
+        counter[0] = 0
+    comm.Barrier()
+
+    done = threading.Event()
+    progress = None
+    if comm.Get_rank() == 0 and comm.Get_size() > 1 and MPI.Query_thread() == MPI.THREAD_MULTIPLE:
+        progress = threading.Thread(target=_progress, args=(comm, done), daemon=True)
+        progress.start()
+
+    incr = np.array([chunk], dtype=np.int64)
+    got  = np.empty(1, dtype=np.int64)
+    try:
+        while True:
+            win.Lock(0, MPI.LOCK_SHARED)
+            win.Fetch_and_op(incr, got, 0, 0, MPI.SUM)
+            win.Unlock(0)
+            start = int(got[0])
+            if start >= n_tasks:
+                break
+            yield start, min(start + chunk, n_tasks)
+    finally:
+        done.set()
+        if progress is not None:
+            progress.join()
+        comm.Barrier()
+        win.Free()
+
+
+def _progress(comm: "MPI.Comm", done: threading.Event) -> None:
+    """Poke the MPI progress engine until `done` is set."""
+    from mpi4py import MPI
+
+    while not done.wait(PROGRESS_INTERVAL):
+        comm.Iprobe(MPI.ANY_SOURCE, MPI.ANY_TAG)
+
+
+def chunks(
+        schedule: str,
+        comm: "MPI.Comm",
+        n_tasks: int,
+        chunk: int,
+) -> Iterator[tuple[int, int]]:
+    """Dispatch to the requested scheduling policy."""
+    if schedule == "static" or (schedule in SCHEDULES and comm.Get_size() == 1):
+        return static_chunks(n_tasks, chunk, comm.Get_rank(), comm.Get_size())
+    if schedule == "dynamic":
+        return dynamic_chunks(comm, n_tasks, chunk)
+    raise ValueError(f"Unknown schedule {schedule!r}, expected one of {SCHEDULES}.")
+
+
+def utilization_report(comm: "MPI.Comm", n_done: int, busy: float, wall: float) -> None:
+    """
+    Gather per-rank (cells, busy time, wall time) on rank 0 and print a
+    utilization table. `busy` is the time spent simulating, `wall` the
+    time from the start of the scheduling loop to the end of the final
+    barrier, so `wall - busy` is time lost to imbalance and scheduling.
+    """
+
+    rows = comm.gather((comm.Get_rank(), n_done, busy, wall), root=0)
+    if comm.Get_rank() == 0:
+        print_utilization(rows)
+
+
+def print_utilization(rows: list[tuple[int, int, float, float]]) -> None:
+    """Utilization table of (rank, cells, busy, wall) rows."""
+
+    print("[rank 0] Per-rank utilization", flush=True)
+    print(f"    {'rank':>4} {'cells':>7} {'busy (s)':>10} {'idle (s)':>10} {'util':>6}", flush=True)
+    for rank, n, b, w in rows:
+        util = b / w if w > 0 else 0.0
+        print(f"    {rank:>4} {n:>7} {b:>10.2f} {w - b:>10.2f} {util:>6.1%}", flush=True)
+
+    busy_all = np.array([b for _, _, b, _ in rows])
+    wall_max = max(w for _, _, _, w in rows)
+    if wall_max > 0:
+        print(
+            f"    overall {busy_all.sum() / (wall_max * len(rows)):.1%}, "
+            f"max/mean busy {busy_all.max() / max(busy_all.mean(), 1e-12):.2f}",
+            flush=True,
+        )
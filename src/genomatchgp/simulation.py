@@ -1,15 +1,78 @@
 """Single-cell Gillespie simulation driver."""
 
+import hashlib
+import os
+from os.path import join
+from typing import TYPE_CHECKING
+
 import numpy as np
-import tellurium as te
-from mpi4py import MPI
-from numpy import random
 
-from genomatchgp import methods
+from genomatchgp import methods, parallel, profiling, streams
+from genomatchgp.engine import (
+    first_passage_batch,
+    grid_sample_batch,
+    ssa_coupled_batch,
+    ssa_direct_batch,
+    ssa_events_batch,
+)
+from genomatchgp.modelmaker import MODEL_PARAMETERS
+from genomatchgp.sparse import SparseTrajectory
+
+# Tellurium / RoadRunner are only loaded by the tellurium engine
+if TYPE_CHECKING:
+    import roadrunner
+
+
+# Native engines, all sharing the `engine.ssa_direct_batch` contract
+BATCH_ENGINES = {
+    "numpy": ssa_direct_batch,
+    "grid":  grid_sample_batch,
+}
+ENGINES = ("tellurium", *BATCH_ENGINES)
 
+# Per-process cache of loaded RoadRunner instances, keyed by model UID.
+# The model is identical for every replicate of a batch: replicates only
+# reset the state, set the seed and simulate.
+_MODEL_CACHE: dict[int, "roadrunner.RoadRunner"] = {}
 
-COMM = MPI.COMM_WORLD
-RANK = COMM.Get_rank()
+
+def load_model(model_id: int, my_model: str, artifact_dir: str | None = None) -> "roadrunner.RoadRunner":
+    """
+    Return the RoadRunner instance for `model_id`, compiling it at most
+    once per process.
+
+    If `artifact_dir` is given, the compiled model is also persisted
+    there as a serialized RoadRunner state, named after a hash of the
+    Antimony source so that a change in the generator never picks up a
+    stale artifact. Later runs, and other ranks of the same run, load
+    that state instead of parsing and compiling the Antimony source.
+    """
+
+    r = _MODEL_CACHE.get(model_id)
+    if r is not None:
+        return r
+
+    import roadrunner
+    import tellurium as te
+
+    state_path = None
+    if artifact_dir is not None:
+        digest = hashlib.sha256(my_model.encode()).hexdigest()[:16]
+        state_path = join(artifact_dir, f"model.{digest}.rrstate")
+
+    if state_path is not None and os.path.exists(state_path):
+        r = roadrunner.RoadRunner()
+        r.loadState(state_path)
+    else:
+        r = te.loada(my_model)
+        if state_path is not None:
+            tmp = f"{state_path}.{os.getpid()}.tmp"
+            r.saveState(tmp)
+            os.replace(tmp, state_path)
+
+    r.integrator = "gillespie"
+    _MODEL_CACHE[model_id] = r
+    return r
 
 
 def run(
@@ -18,10 +81,13 @@ def run(
         species_to_index: dict,
         my_model: str,
         params: dict,
-        outdir: str,
-) -> None:
+        writer=None,
+        artifact_dir: str | None = None,
+) -> dict:
     """
-    Run one Gillespie replicate and dump its trajectory to disk.
+    Run one Gillespie replicate, hand its trajectory to the record
+    `writer` (see `records.open_writer`; None to skip) and return its
+    `make_group` dict.
 
     The simulation is split into two phases:
 
@@ -34,32 +100,258 @@ def run(
       2. Synthesis
             Full Gillespie integration on the Antimony model from
             t = delay to t = n_timepoints, starting from S = N.
+
+    The model comes from `load_model`, so only the first replicate of a
+    process pays for parsing and compilation. The global parameters of
+    the model are set from `params` before each replicate, so a cached
+    model can be reused across parameter values (see `Sweep`).
     """
 
-    print(f"[Process {RANK}] :: SIMULATION {uid}", flush=True)
+    print(f"[Process {parallel.rank()}] :: SIMULATION {uid}", flush=True)
+
+    with profiling.phase("delay", cell=uid):
+        n_pts_delay, n_pts_dyn = _resection_delay(uid, model_id, params)
 
     # =================================================================
-    # Per-cell randomness
+    # Synthesis phase
     # =================================================================
-    seed0 = params["seed_zero"]
-    seed = seed0 + uid + model_id
-    random.seed(seed)
+    with profiling.phase("load_model", cell=uid):
+        r = load_model(model_id, my_model, artifact_dir)
+        for name in MODEL_PARAMETERS:
+            r[name] = params[name]
+        r.integrator.seed = streams.integrator_seed(params, model_id, uid)
+        r.reset()
+
+    t_start = n_pts_delay * params["every"]
+    t_end   = params["timepoints"]
+
+    with profiling.phase("simulate", cell=uid):
+        s_dyn = r.simulate(t_start, t_end, n_pts_dyn)
 
     # =================================================================
-    # Time grid
+    # Assemble the full trajectory
     # =================================================================
+    # Convention from the previous pipeline: during the resection delay
+    # we record S = N (filament available, nothing bound), and every
+    # other species at 0. Tellurium's column ordering matches the
+    # species declaration order in the model, which is also the order
+    # we used to build species_to_index.
+    with profiling.phase("assemble", cell=uid):
+        s_total = _empty_trajectory(len(species_to_index), params)
+        s_total[1, :n_pts_delay] = params["N"]
+
+        # s_dyn columns: [time, sp_1, sp_2, ...] in declaration order
+        sl = slice(n_pts_delay, n_pts_delay + n_pts_dyn)
+        for i in range(1, len(species_to_index)):
+            s_total[i, sl] = s_dyn[:, i]
+
+    return _dump(uid, s_total, species_to_index, params, writer)
+
+
+def run_batch(
+        uids: list[int],
+        model_id: int,
+        species_to_index: dict,
+        network: dict,
+        params: dict,
+        writer=None,
+        sampler=ssa_direct_batch,
+        sparse: bool = False,
+) -> list[dict]:
+    """
+    Run a batch of replicates with a native NumPy engine. Each
+    trajectory is handled exactly like `run` does per cell: passed to
+    `writer` and its `make_group` dict returned.
+
+    Resection delays are drawn per cell from the same stream as `run`,
+    so a cell gets the same delay whatever the engine. The synthesis
+    phase of the whole batch is then simulated at once by `sampler`
+    (one of `BATCH_ENGINES`), on the same per-cell output grid as the
+    Tellurium path, with per-cell chemistry streams
+    (`streams.CellStreams`): a cell's trajectory does not depend on the
+    batch it is simulated in.
+
+    With `sparse`, the direct-method SSA logs every firing instead
+    (`engine.ssa_events_batch`): the writer receives one
+    `SparseTrajectory` per cell and the `make_group` dict is computed
+    from its resampling on the time row of the dense output.
+    """
+
+    print(f"[Process {parallel.rank()}] :: SIMULATIONS {uids[0]}..{uids[-1]}", flush=True)
+
+    n_timepoints: int = params["timepoints"]
+    with profiling.phase("delay", cells=len(uids)):
+        t0, sample_times = _sampling_grids(uids, model_id, params)
+
+    cell_streams = streams.CellStreams(params, model_id, uids)
+
+    if sparse:
+        with profiling.phase("simulate", cells=len(uids)):
+            events = ssa_events_batch(network, t0, n_timepoints, cell_streams)
+        groups = []
+        for c, (times, reactions) in enumerate(events):
+            traj = SparseTrajectory(network, t0[c], times, reactions, params)
+            profiling.count("events", len(traj), cell=uids[c])
+            with profiling.phase("make_group", cell=uids[c]):
+                groups.append(methods.make_group(traj))
+            if writer is not None:
+                with profiling.phase("write", cell=uids[c]):
+                    writer.write(uids[c], traj)
+        return groups
+
+    with profiling.phase("simulate", cells=len(uids)):
+        states = sampler(network, t0, sample_times, cell_streams)
+    return _group_batch(uids, states, species_to_index, params, writer)
+
+
+def run_coupled(
+        uids: list[int],
+        model_id: int,
+        species_to_index: dict,
+        networks: list[dict],
+        configs: list[dict],
+) -> list[list[dict]]:
+    """
+    Common-random-numbers replicates: the cells `uids` are simulated
+    under every parameter set `configs[i]` (reaction network
+    `networks[i]`) on shared random streams, with
+    `engine.ssa_coupled_batch`.
+
+    Every set draws the resection delay of a cell from the same stream,
+    derived from `model_id` (the baseline's) rather than from its own
+    model UID, and its reaction channels from the same per-channel
+    streams. The networks must therefore have the same channels.
+
+    Returns the `make_group` dicts of the cells, one list per set.
+    """
+
+    print(f"[Process {parallel.rank()}] :: COUPLED SIMULATIONS {uids[0]}..{uids[-1]}", flush=True)
+
+    keys = streams.cell_keys(configs[0], model_id, uids)
+    out = []
+    for network, params in zip(networks, configs):
+        with profiling.phase("delay", cells=len(uids)):
+            t0, sample_times = _sampling_grids(uids, model_id, params)
+        with profiling.phase("simulate", cells=len(uids)):
+            states = ssa_coupled_batch(network, t0, sample_times, keys)
+        out.append(_group_batch(uids, states, species_to_index, params))
+    return out
+
+
+def run_cells(
+        engine: str,
+        uids: list[int],
+        model_id: int,
+        species_to_index: dict,
+        model,
+        params: dict,
+        writer=None,
+        artifact_dir: str | None = None,
+        batch_size: int = 256,
+        sparse: bool = False,
+) -> list[dict]:
+    """
+    Simulate the cells `uids` with the chosen engine and return their
+    `make_group` dicts. `model` is the Antimony source for "tellurium"
+    and the reaction network for the native engines. `sparse` (numpy
+    engine only) hands event-sparse trajectories to `writer`.
+    """
+
+    if sparse and engine != "numpy":
+        raise ValueError(f"Event-sparse records need the numpy engine, got {engine!r}.")
+    if engine in BATCH_ENGINES:
+        groups = []
+        for b in range(0, len(uids), batch_size):
+            groups.extend(run_batch(
+                uids[b:b + batch_size], model_id, species_to_index, model, params, writer,
+                BATCH_ENGINES[engine], sparse,
+            ))
+        return groups
+    if engine == "tellurium":
+        return [
+            run(s, model_id, species_to_index, model, params, writer, artifact_dir)
+            for s in uids
+        ]
+    raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}.")
+
+
+def run_first_passage(
+        uids: list[int],
+        model_id: int,
+        network: dict,
+        params: dict,
+        targets: dict[str, list[str]],
+        stop_at: list[str],
+) -> list[dict]:
+    """
+    First-passage replicates: each cell is simulated with the native SSA
+    until every target of `stop_at` has occurred (or the window ends),
+    and only event times are kept.
+
+    Returns one compact record per cell: the resection delay, then for
+    every target its first-entry time ("t <target>", NaN if censored)
+    and the fragment length involved in the reaction that triggered it
+    ("L <target>", NaN if censored or not length-resolved): that of the
+    product, or for absorbing targets without a length (Recombined)
+    that of the reactant consumed, e.g. the DHM{L} that recombined.
+    """
+
+    print(f"[Process {parallel.rank()}] :: FIRST PASSAGE {uids[0]}..{uids[-1]}", flush=True)
+
+    every: int = params["every"]
+    species = network["species"]
+    names = list(targets)
+
+    members = np.zeros((len(species), len(names)), dtype=bool)
+    for j, k in enumerate(names):
+        for sp in targets[k]:
+            if sp in species:    # species of a folded model may be gone
+                members[species.index(sp), j] = True
+    stop = np.array([k in stop_at for k in names])
+    digits = ["".join(ch for ch in sp if ch.isdigit()) for sp in species]
+    lengths = np.array([float(d) if d else np.nan for d in digits])
+    # Length of each reaction: the product's, else the reactant's
+    produced = lengths[network["products"]]
+    reaction_lengths = np.where(np.isnan(produced), lengths[network["reactants"]], produced)
+
+    with profiling.phase("delay", cells=len(uids)):
+        t0 = np.array([_resection_delay(uid, model_id, params)[0] * every for uid in uids], dtype=np.float64)
+    cell_streams = streams.CellStreams(params, model_id, uids)
+    with profiling.phase("simulate", cells=len(uids)):
+        times, first = first_passage_batch(network, t0, params["timepoints"], members, stop, cell_streams)
+
+    rows = []
+    for c, uid in enumerate(uids):
+        row = {"cell": uid, "delay": t0[c]}
+        for j, k in enumerate(names):
+            row[f"t {k}"] = times[c, j]
+            row[f"L {k}"] = reaction_lengths[first[c, j]] if first[c, j] >= 0 else np.nan
+        rows.append(row)
+    return rows
+
+
+# =====================================================================
+# Helpers
+# =====================================================================
+
+def _resection_delay(uid: int, model_id: int, params: dict) -> tuple[int, int]:
+    """
+    Draw the Gamma resection delay of a cell from its `streams.DELAY`
+    stream.
+
+    Returns the split of the output grid into delay points and dynamic
+    points.
+    """
+
+    rng = streams.cell_generator(params, model_id, uid, streams.DELAY)
+
     n_timepoints: int = params["timepoints"]
     every: int        = params["every"]
     n_points          = n_timepoints // every
 
-    n_species = len(species_to_index)
-
-    # =================================================================
-    # Resection delay (no chemistry)
-    # =================================================================
     k     = params["gamma_k"]
     theta = params["gamma_theta"]
-    delay = int(random.gamma(k, theta))
+    delay = int(rng.gamma(k, theta))
     delay = min(delay, n_timepoints - 1)
 
     n_pts_delay = max(0, int(round(delay / every)))
@@ -68,43 +360,88 @@ def run(
         n_pts_delay = n_points - 1
         n_pts_dyn   = 1
 
-    # =================================================================
-    # Synthesis phase
-    # =================================================================
-    r = te.loada(my_model)
-    r.integrator = "gillespie"
-    r.integrator.seed = seed
-    r.reset()
+    return n_pts_delay, n_pts_dyn
 
-    t_start = n_pts_delay * every
-    t_end   = n_timepoints
 
-    s_dyn = r.simulate(t_start, t_end, n_pts_dyn)
+def _sampling_grids(uids: list[int], model_id: int, params: dict) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Start of the chemistry and output grid of each cell of a batch.
 
-    # =================================================================
-    # Assemble the full trajectory
-    # =================================================================
-    # Convention from the previous pipeline: during the resection delay
-    # we record S = N (filament available, nothing bound), and every
-    # other species at 0. Tellurium's column ordering matches the
-    # species declaration order in the model, which is also the order
-    # we used to build species_to_index.
-    s_total = np.zeros((n_species, n_points), dtype=np.float64)
+    Delay points are sampled at t = -1 (before t0 = t_start), so they
+    report the initial state S = N; the dynamic points follow the same
+    linspace(t_start, t_end, n_pts_dyn) grid as r.simulate().
+    """
+
+    n_timepoints: int = params["timepoints"]
+    every: int        = params["every"]
+    n_points          = n_timepoints // every
+
+    t0 = np.empty(len(uids), dtype=np.float64)
+    sample_times = np.full((len(uids), n_points), -1.0)
+    for c, uid in enumerate(uids):
+        n_pts_delay, n_pts_dyn = _resection_delay(uid, model_id, params)
+        t0[c] = n_pts_delay * every
+        sample_times[c, n_pts_delay:] = np.linspace(t0[c], n_timepoints, n_pts_dyn)
+    return t0, sample_times
+
+
+def _group_batch(
+        uids: list[int],
+        states: np.ndarray,
+        species_to_index: dict,
+        params: dict,
+        writer=None,
+) -> list[dict]:
+    """Wrap the output of a batch sampler into Groups and dump them."""
+
+    with profiling.phase("assemble", cells=len(uids)):
+        time = _empty_trajectory(1, params)[0]
+        counts = states.astype(np.int32)
+
+    if profiling.enabled():
+        transitions = np.abs(np.diff(states, axis=2)).sum(axis=(1, 2)) / 2
+        for uid, n in zip(uids, transitions):
+            profiling.count("transitions", n, cell=uid)
+
+    with profiling.phase("make_group", cells=len(uids)):
+        operator = methods.grouping_operator(species_to_index, params["intermediates"])
+        groups = [methods.Group(counts[c], time, operator) for c in range(len(uids))]
+
+    if writer is not None:
+        for uid, group in zip(uids, groups):
+            with profiling.phase("write", cell=uid):
+                writer.write(uid, group)
+    return groups
+
+
+def _empty_trajectory(n_species: int, params: dict) -> np.ndarray:
+    """Zeroed (n_species, n_points) matrix with the time row filled in."""
+    n_timepoints: int = params["timepoints"]
+    every: int        = params["every"]
+    s_total = np.zeros((n_species, n_timepoints // every), dtype=np.float64)
     s_total[0, :] = np.arange(0, n_timepoints, every)
-    s_total[1, :n_pts_delay] = params["N"]
+    return s_total
 
-    # s_dyn columns: [time, sp_1, sp_2, ...] in declaration order
-    sl = slice(n_pts_delay, n_pts_delay + n_pts_dyn)
-    for i in range(1, n_species):
-        s_total[i, sl] = s_dyn[:, i]
 
-    # =================================================================
-    # Dump
-    # =================================================================
-    result_group = methods.make_group(
-        s_total,
-        species_to_index,
-        params["intermediates"],
-    )
+def _dump(
+        uid: int,
+        s_total: np.ndarray,
+        species_to_index: dict,
+        params: dict,
+        writer,
+) -> dict:
+    if profiling.enabled():
+        # Grid-resolved slot transitions, a lower bound on the firings
+        transitions = np.abs(np.diff(s_total[1:], axis=1)).sum() / 2
+        profiling.count("transitions", transitions, cell=uid)
 
-    np.savez_compressed(f"{outdir}/simulation_{uid}.npz", **result_group)
+    with profiling.phase("make_group", cell=uid):
+        result_group = methods.make_group(
+            s_total,
+            species_to_index,
+            params["intermediates"],
+        )
+    if writer is not None:
+        with profiling.phase("write", cell=uid):
+            writer.write(uid, result_group)
+    return result_group
@@ -0,0 +1,152 @@
+"""
+Streaming ensemble statistics.
+
+Each rank folds the `make_group` series of its cells into running
+means and sums of squared deviations as they are simulated, cell by
+cell (Welford) or a batch at a time.
+Partial results are combined pairwise with Chan's parallel update, which
+is what the MPI reduction uses, so aggregation needs O(series x points)
+memory per rank whatever the number of cells, and no per-cell file has
+to be read back.
+"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from mpi4py import MPI
+
+
+class EnsembleStats:
+    """Running mean / variance of every series of a `make_group` dict."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean: dict[str, np.ndarray] = {}
+        self.m2: dict[str, np.ndarray] = {}
+
+    def update(self, group: dict) -> None:
+        """Fold one cell into the running statistics (Welford)."""
+        self.n += 1
+        for k, v in group.items():
+            x = np.asarray(v, dtype=np.float64)
+            if k not in self.mean:
+                self.mean[k] = x.copy()
+                self.m2[k] = np.zeros_like(x)
+                continue
+            delta = x - self.mean[k]
+            self.mean[k] += delta / self.n
+            self.m2[k] += delta * (x - self.mean[k])
+
+    def update_batch(self, groups: dict[str, np.ndarray]) -> None:
+        """
+        Fold a batch of cells, one row per cell (`methods.make_groups`):
+        the moments of the batch are computed in one pass over each
+        series and merged into the running statistics.
+        """
+        n = len(next(iter(groups.values()))) if groups else 0
+        if n == 0:
+            return
+        batch = EnsembleStats()
+        batch.n = n
+        for k, v in groups.items():
+            x = np.asarray(v, dtype=np.float64)
+            batch.mean[k] = x.mean(axis=0)
+            batch.m2[k] = ((x - batch.mean[k]) ** 2).sum(axis=0)
+        self.merge(batch)
+
+    def merge(self, other: "EnsembleStats") -> "EnsembleStats":
+        """Combine two partial ensembles in place (Chan et al.)."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.mean, self.m2 = other.n, other.mean, other.m2
+            return self
+
+        n = self.n + other.n
+        for k, mb in other.mean.items():
+            delta = mb - self.mean[k]
+            self.mean[k] += delta * (other.n / n)
+            self.m2[k] += other.m2[k] + delta**2 * (self.n * other.n / n)
+        self.n = n
+        return self
+
+    def sd(self) -> dict[str, np.ndarray]:
+        """Sample standard deviation of every series."""
+        if self.n < 2:
+            return {k: np.zeros_like(v) for k, v in self.m2.items()}
+        return {k: np.sqrt(v / (self.n - 1)) for k, v in self.m2.items()}
+
+    def save(self, path: str) -> None:
+        """Dump mean and SD of every series, plus the cell count."""
+        save_moments(path, self.n, self.mean, self.sd())
+
+    def state(self) -> dict[str, np.ndarray]:
+        """Flat arrays that `from_state` turns back into the same object."""
+        return {
+            "n": np.array(self.n),
+            **{f"mean/{k}": v for k, v in self.mean.items()},
+            **{f"m2/{k}": v for k, v in self.m2.items()},
+        }
+
+    @classmethod
+    def from_state(cls, arrays) -> "EnsembleStats":
+        """Rebuild running statistics saved with `state` (dict or npz)."""
+        stats = cls()
+        stats.n = int(arrays["n"])
+        for f in arrays:
+            if f.startswith("mean/"):
+                stats.mean[f[len("mean/"):]] = np.array(arrays[f], dtype=np.float64)
+            elif f.startswith("m2/"):
+                stats.m2[f[len("m2/"):]] = np.array(arrays[f], dtype=np.float64)
+        return stats
+
+
+def relative_ci_width(stats: EnsembleStats, z: float = 1.96) -> dict[str, np.ndarray]:
+    """
+    Full width of the normal confidence interval of every mean, relative
+    to its magnitude: 2 z SE / |mean| (inf below two cells or at a zero
+    mean). The default `z` gives a 95% interval.
+    """
+    sd = stats.sd()
+    out = {}
+    for k, mean in stats.mean.items():
+        if stats.n < 2:
+            out[k] = np.full_like(mean, np.inf)
+            continue
+        width = 2 * z * sd[k] / np.sqrt(stats.n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rel = np.where(mean != 0, width / np.abs(mean), np.where(width == 0, 0.0, np.inf))
+        out[k] = rel
+    return out
+
+
+def _merge(a: EnsembleStats, b: EnsembleStats) -> EnsembleStats:
+    return a.merge(b)
+
+
+def reduce_stats(comm: "MPI.Comm", stats: EnsembleStats, root: int = 0) -> EnsembleStats | None:
+    """Tree-combine the per-rank statistics onto `root`."""
+    return comm.reduce(stats, op=_merge, root=root)
+
+
+def save_moments(path: str, n: int, mean: dict, sd: dict) -> None:
+    """
+    Write per-series mean and SD in the layout read by `load_stats`.
+    `n` is the number of cells, 0 for exact (sampling-free) moments.
+    """
+    np.savez_compressed(
+        path,
+        n=np.array(n),
+        **{f"mean/{k}": v for k, v in mean.items()},
+        **{f"sd/{k}": v for k, v in sd.items()},
+    )
+
+
+def load_stats(path: str) -> tuple[int, dict, dict]:
+    """Read back a file written by `EnsembleStats.save` as (n, mean, sd)."""
+    npz = np.load(path)
+    mean = {f[len("mean/"):]: npz[f] for f in npz.files if f.startswith("mean/")}
+    sd   = {f[len("sd/"):]:   npz[f] for f in npz.files if f.startswith("sd/")}
+    return int(npz["n"]), mean, sd
@@ -0,0 +1,84 @@
+"""
+Per-cell random streams.
+
+Every random draw of a cell comes from streams that depend only on
+(seed_zero, model UID, cell index), never on the batch, chunk, rank or
+process that happens to simulate it, so an ensemble is bit-identical
+whatever the backend, the number of ranks or the batch size.
+
+The streams are nodes of a `numpy.random.SeedSequence` spawn tree:
+
+    seed_zero
+    └── model UID
+        └── cell index
+            ├── DELAY      resection delay
+            └── CHEMISTRY  reaction firings (native engines), or the
+                           integrator seed (tellurium)
+
+Two distinct nodes never share a stream, unlike additive seeds such as
+seed_zero + uid + model_id, which collide between (uid, model) pairs
+with the same sum.
+"""
+
+import numpy as np
+
+
+DELAY = 0
+CHEMISTRY = 1
+
+
+def cell_sequence(params: dict, model_id: int, uid: int, purpose: int) -> np.random.SeedSequence:
+    """Seed sequence of one stream (`DELAY` or `CHEMISTRY`) of cell `uid`."""
+    return np.random.SeedSequence(params["seed_zero"], spawn_key=(model_id, uid, purpose))
+
+
+def cell_generator(params: dict, model_id: int, uid: int, purpose: int) -> np.random.Generator:
+    return np.random.default_rng(cell_sequence(params, model_id, uid, purpose))
+
+
+def integrator_seed(params: dict, model_id: int, uid: int) -> int:
+    """Seed of the RoadRunner Gillespie integrator for cell `uid`."""
+    return int(cell_sequence(params, model_id, uid, CHEMISTRY).generate_state(1, np.uint32)[0])
+
+
+def cell_keys(params: dict, model_id: int, uids: list[int]) -> np.ndarray:
+    """(n_cells,) uint64 keys of the chemistry streams, for counter-based generators."""
+    return np.array(
+        [cell_sequence(params, model_id, uid, CHEMISTRY).generate_state(1, np.uint64)[0] for uid in uids],
+        dtype=np.uint64,
+    )
+
+
+class CellStreams:
+    """
+    Chemistry streams of a batch of cells, for the native engines.
+
+    Uniforms are served from a per-cell buffer refilled by the cell's own
+    generator, so a batch engine can draw for any subset of its cells in
+    one vectorized gather, and what a cell receives depends only on its
+    own draws.
+    """
+
+    def __init__(self, params: dict, model_id: int, uids: list[int], block: int = 1024):
+        self.generators = [cell_generator(params, model_id, uid, CHEMISTRY) for uid in uids]
+        self.block = block
+        self.buffer = np.empty((len(uids), block), dtype=np.float64)
+        self.pos = np.full(len(uids), block, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.generators)
+
+    def generator(self, c: int) -> np.random.Generator:
+        """Generator of cell `c` (batch position), for draws other than uniforms."""
+        return self.generators[c]
+
+    def uniforms(self, cells: np.ndarray, k: int) -> np.ndarray:
+        """(k, len(cells)) uniforms in [0, 1), the next `k` of each cell."""
+        pos = self.pos[cells]
+        for c in cells[pos + k > self.block]:
+            self.buffer[c] = self.generators[c].random(self.block)
+            self.pos[c] = 0
+        pos = self.pos[cells]
+        out = self.buffer[cells[None, :], pos[None, :] + np.arange(k)[:, None]]
+        self.pos[cells] = pos + k
+        return out
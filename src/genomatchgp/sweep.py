@@ -0,0 +1,85 @@
+"""
+Parameter sweep specifications.
+
+A sweep spec is a small YAML file naming the keys of params.yaml to
+vary and how to sample them:
+
+    # Full factorial grid
+    mode: grid
+    params:
+      kon: [0.02, 0.04, 0.08]
+      kre: [0.004, 0.005]
+
+    # Latin hypercube over [low, high] bounds, optionally log-uniform.
+    # Integer bounds give integer samples.
+    mode: lhs
+    samples: 32
+    seed: 7
+    log: [kon]
+    params:
+      kon: [0.01, 0.1]
+      kre: [0.001, 0.01]
+
+    # Explicit list of points
+    mode: list
+    points:
+      - {kon: 0.04, kre: 0.004}
+      - {kon: 0.08, kre: 0.005}
+
+Keys that are global parameters of the Antimony model are changed in
+place on the loaded model; only `modelmaker.STRUCTURAL_KEYS` trigger a
+rebuild. A folded model (``fold: true``) has its rate constants baked in,
+so every model parameter is structural for it.
+"""
+
+import itertools
+
+import numpy as np
+
+from genomatchgp.modelmaker import MODEL_PARAMETERS, STRUCTURAL_KEYS
+
+
+SWEEP_MODES = ("grid", "lhs", "list")
+
+
+def expand_spec(spec: dict) -> list[dict]:
+    """Turn a sweep spec into the list of per-point YAML overrides."""
+
+    mode = spec.get("mode", "grid")
+
+    if mode == "grid":
+        keys = list(spec["params"])
+        values = [spec["params"][k] for k in keys]
+        return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+    if mode == "lhs":
+        from scipy.stats import qmc
+
+        keys = list(spec["params"])
+        log_keys = set(spec.get("log", []))
+        lows  = np.array([spec["params"][k][0] for k in keys], dtype=np.float64)
+        highs = np.array([spec["params"][k][1] for k in keys], dtype=np.float64)
+        is_log = np.array([k in log_keys for k in keys])
+        lows[is_log], highs[is_log] = np.log(lows[is_log]), np.log(highs[is_log])
+
+        sampler = qmc.LatinHypercube(d=len(keys), seed=spec.get("seed"))
+        u = qmc.scale(sampler.random(int(spec["samples"])), lows, highs)
+        u[:, is_log] = np.exp(u[:, is_log])
+
+        # Integer bounds (N, dloop_lmin, ...) give integer samples
+        is_int = [all(isinstance(v, int) for v in spec["params"][k]) for k in keys]
+        return [
+            {k: int(round(row[j])) if is_int[j] else float(row[j]) for j, k in enumerate(keys)}
+            for row in u
+        ]
+
+    if mode == "list":
+        return [dict(p) for p in spec["points"]]
+
+    raise ValueError(f"Unknown sweep mode {mode!r}, expected one of {SWEEP_MODES}.")
+
+
+def structure_of(config: dict) -> tuple:
+    """Hashable signature of the keys that require a model rebuild."""
+    keys = (*STRUCTURAL_KEYS, *MODEL_PARAMETERS) if config.get("fold") else STRUCTURAL_KEYS
+    return tuple((k, repr(config[k])) for k in keys)
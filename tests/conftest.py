@@ -0,0 +1,65 @@
+"""Shared fixtures: the repository's params.yaml, shrunk to test sizes."""
+
+import contextlib
+import copy
+import io
+import os
+
+import pytest
+import yaml
+
+from genomatchgp import simulation
+from genomatchgp.modelmaker import build_reaction_network, generate_gillespie_model
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Few slots and a short window keep an ensemble of a few hundred cells
+# within seconds; the resection delay and the rates are those of the file.
+TEST_PARAMS = {"N": 50, "timepoints": 3000, "every": 10, "seed_zero": 1999}
+
+
+@pytest.fixture(scope="session")
+def base_params() -> dict:
+    with open(os.path.join(ROOT, "params.yaml"), "r", encoding="utf-8") as fh:
+        params = yaml.safe_load(fh)
+    params.update(TEST_PARAMS)
+    return params
+
+
+@pytest.fixture
+def params(base_params) -> dict:
+    return copy.deepcopy(base_params)
+
+
+@pytest.fixture(scope="session")
+def model(base_params) -> tuple[str, dict, int]:
+    """(Antimony source, species_to_index, model UID)."""
+    my_model, index_to_species, uid = generate_gillespie_model(base_params)
+    return my_model, {v: k for k, v in index_to_species.items()}, uid
+
+
+@pytest.fixture(scope="session")
+def network(base_params) -> dict:
+    return build_reaction_network(base_params)
+
+
+@pytest.fixture(scope="session")
+def species_to_index(model) -> dict:
+    return model[1]
+
+
+@pytest.fixture(scope="session")
+def simulate(base_params, model, network):
+    """`simulation.run_cells` on the test model, without progress output."""
+
+    def run(engine: str, uids: list[int], batch_size: int = 256, writer=None, sparse: bool = False) -> list:
+        my_model, species_to_index, uid = model
+        source = my_model if engine == "tellurium" else network
+        with contextlib.redirect_stdout(io.StringIO()):
+            return simulation.run_cells(
+                engine, uids, uid, species_to_index, source, base_params,
+                writer, batch_size=batch_size, sparse=sparse,
+            )
+
+    return run
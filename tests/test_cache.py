@@ -0,0 +1,80 @@
+"""ResultCache blocks, cache-aware runs and LRU eviction."""
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+from genomatchgp import cache
+
+
+@pytest.fixture(scope="module")
+def groups(simulate) -> list:
+    return simulate("grid", list(range(6)))
+
+
+def test_store_and_load(groups, tmp_path):
+    result_cache = cache.ResultCache(tmp_path, 42, "grid")
+    result_cache.store([0, 1, 2], groups[:3])
+    assert 1 in result_cache and 3 not in result_cache
+
+    # A new instance finds the block on disk
+    loaded = cache.ResultCache(tmp_path, 42, "grid").load([2, 0])
+    for got, uid in zip(loaded, [2, 0]):
+        np.testing.assert_array_equal(got.counts, groups[uid].counts)
+        np.testing.assert_array_equal(got["DLC homologous"], groups[uid]["DLC homologous"])
+    assert 0 not in cache.ResultCache(tmp_path, 42, "numpy")
+
+
+def test_run_cached_only_simulates_misses(groups, tmp_path):
+    result_cache = cache.ResultCache(tmp_path, 42, "grid")
+    calls = []
+
+    def simulate(uids):
+        calls.append(list(uids))
+        return [groups[u] for u in uids]
+
+    class Writer:
+        def __init__(self):
+            self.cells = []
+
+        def write(self, uid, group):
+            self.cells.append(uid)
+
+    first = cache.run_cached(result_cache, [0, 1, 2], simulate)
+    writer = Writer()
+    second = cache.run_cached(result_cache, [1, 2, 3, 4], simulate, writer)
+
+    assert calls == [[0, 1, 2], [3, 4]]
+    assert writer.cells == [1, 2]    # hits are recorded, misses by `simulate`
+    for got, uid in zip(first + second, [0, 1, 2, 1, 2, 3, 4]):
+        np.testing.assert_array_equal(got.counts, groups[uid].counts)
+    assert cache.entries(tmp_path)[0]["cells"] == 5
+
+
+def test_evict_least_recently_used(groups, tmp_path):
+    result_cache = cache.ResultCache(tmp_path, 42, "grid")
+    for uid in range(3):
+        result_cache.store([uid], [groups[uid]])
+    paths = [result_cache.index[uid] for uid in range(3)]
+    now = time.time()
+    for age, path in zip((300, 100, 200), paths):
+        os.utime(path, (now - age, now - age))
+    # A hit refreshes its block
+    result_cache.load([0])
+
+    sizes = [os.path.getsize(p) for p in paths]
+    n_blocks, freed = cache.evict(tmp_path, sum(sizes) - 1)
+    assert (n_blocks, freed) == (1, sizes[2])
+    assert [os.path.exists(p) for p in paths] == [True, True, False]
+
+    assert cache.evict(tmp_path, 0, model="7") == (0, 0)
+    assert cache.evict(tmp_path, 0) == (2, sizes[0] + sizes[1])
+
+
+def test_sizes():
+    assert cache.parse_size("10G") == 10 * 1024**3
+    assert cache.parse_size("1.5mb") == int(1.5 * 1024**2)
+    assert cache.parse_size("512") == 512
+    assert cache.format_size(2048) == "2.0K"
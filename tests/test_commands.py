@@ -0,0 +1,149 @@
+"""End-to-end `run`, `plot` and `infer`, on the serial and processes backends."""
+
+import contextlib
+import glob
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from genomatchgp import inference, manifest, records, simulation
+from genomatchgp.commands import Infer, Plot, Run
+from genomatchgp.modelmaker import build_reaction_network, generate_gillespie_model
+from genomatchgp.stats import EnsembleStats
+
+
+@pytest.fixture(scope="module")
+def yaml_path(base_params, tmp_path_factory) -> str:
+    path = os.path.join(tmp_path_factory.mktemp("params"), "params.yaml")
+    with open(path, "w", encoding="utf-8") as fh:
+        yaml.safe_dump(base_params, fh)
+    return path
+
+
+def run(yaml_path: str, outdir: str, *options: str, backend: str = "serial") -> str:
+    """Run the command quietly; returns the run directory."""
+    argv = [yaml_path, "-o", outdir, "-e", "numpy", "-b", "4", "--backend", backend, "--plot-points", "200", *options]
+    with contextlib.redirect_stdout(io.StringIO()):
+        Run(argv, {}).execute()
+    (run_dir,) = glob.glob(os.path.join(outdir, "*", ""))
+    return run_dir
+
+
+def _assert_same_aggregate(a: str, b: str) -> None:
+    with np.load(os.path.join(a, "aggregate.npz")) as x, np.load(os.path.join(b, "aggregate.npz")) as y:
+        assert sorted(x.files) == sorted(y.files)
+        for k in x.files:
+            np.testing.assert_allclose(x[k], y[k], rtol=1e-12, atol=1e-12, err_msg=k)
+
+
+@pytest.fixture(scope="module")
+def fresh(yaml_path, tmp_path_factory) -> str:
+    return run(yaml_path, str(tmp_path_factory.mktemp("fresh")), "-c", "8")
+
+
+def test_fresh_run_outputs(fresh):
+    store = records.RecordStore(os.path.join(fresh, "records"))
+    assert sorted(store.cell_ids.tolist()) == list(range(8))
+    assert manifest.load_manifest(fresh)[0] == set(range(8))
+    assert len(glob.glob(os.path.join(fresh, "plots", "*.png"))) == 4
+
+    with np.load(os.path.join(fresh, "aggregate.npz")) as npz:
+        assert int(npz["n"]) == 8
+        recombined = store.series("Recombined")
+        np.testing.assert_allclose(npz["mean/Recombined"], recombined.mean(axis=0))
+        np.testing.assert_allclose(npz["sd/Recombined"], recombined.std(axis=0, ddof=1))
+
+
+def test_resume_completes_an_interrupted_run(fresh, yaml_path, tmp_path):
+    outdir = os.path.join(tmp_path, "resumed")
+    run(yaml_path, outdir, "-c", "3")
+    resumed = run(yaml_path, outdir, "-c", "8", "--resume")
+
+    _assert_same_aggregate(fresh, resumed)
+    assert manifest.next_attempt(resumed) == 2
+    store = records.RecordStore(os.path.join(resumed, "records"))
+    assert sorted(store.cell_ids.tolist()) == list(range(8))
+
+
+def test_partial_aggregates_the_manifest(fresh, yaml_path, tmp_path):
+    outdir = os.path.join(tmp_path, "partial")
+    run(yaml_path, outdir, "-c", "8")
+    os.remove(os.path.join(outdir, os.path.basename(os.path.dirname(fresh)), "aggregate.npz"))
+    partial = run(yaml_path, outdir, "--partial")
+    _assert_same_aggregate(fresh, partial)
+
+
+def test_processes_backend_matches_serial(fresh, yaml_path, tmp_path):
+    pooled = run(yaml_path, os.path.join(tmp_path, "pooled"), "-c", "8", "--workers", "2", backend="processes")
+    _assert_same_aggregate(fresh, pooled)
+    assert sorted(os.listdir(os.path.join(pooled, "manifest"))) == ["part_0_0.npz", "part_0_1.npz"]
+    store = records.RecordStore(os.path.join(pooled, "records"))
+    assert sorted(store.cell_ids.tolist()) == list(range(8))
+
+
+@pytest.mark.parametrize("backend, ranks", [("serial", 1), ("processes", 2)])
+def test_adaptive_waves_share_one_attempt(fresh, yaml_path, tmp_path, backend, ranks):
+    adaptive = run(
+        yaml_path, os.path.join(tmp_path, "adaptive"), "-c", "8", "--workers", str(ranks),
+        "--target-ci", "1e-9", "--wave", "3", "--observables", "Recombined final", backend=backend,
+    )
+    _assert_same_aggregate(fresh, adaptive)
+    # One manifest part and one store per rank, whatever the number of waves
+    assert sorted(os.listdir(os.path.join(adaptive, "manifest"))) == [f"part_0_{r}.npz" for r in range(ranks)]
+    assert sorted(os.listdir(os.path.join(adaptive, "records"))) == sorted(
+        f"rank_{r}.{ext}" for r in range(ranks) for ext in ("bin", "json")
+    )
+    progress = pd.read_csv(os.path.join(adaptive, "adaptive.csv"))
+    assert progress["cells"].tolist() == [3, 6, 8]
+
+
+def test_cache_serves_a_second_run(fresh, yaml_path, tmp_path):
+    root = os.path.join(tmp_path, "cache")
+    run(yaml_path, os.path.join(tmp_path, "first"), "-c", "5", "--cache", root)
+    second = run(yaml_path, os.path.join(tmp_path, "second"), "-c", "8", "--cache", root)
+    _assert_same_aggregate(fresh, second)
+
+
+def test_plot_command(fresh, tmp_path):
+    plots_dir = os.path.join(tmp_path, "replotted")
+    with contextlib.redirect_stdout(io.StringIO()):
+        Plot([fresh, "--plots", plots_dir, "--workers", "1", "--points", "100"], {}).execute()
+    assert sorted(os.listdir(plots_dir)) == sorted(os.listdir(os.path.join(fresh, "plots")))
+
+
+def test_infer_reads_each_folded_particle_by_its_own_species(base_params, tmp_path):
+    # Below the base dloop_lmin, folding keeps D-loops that the base model drops
+    base = {**base_params, "fold": True}
+    with open(tmp_path / "params.yaml", "w", encoding="utf-8") as fh:
+        yaml.safe_dump(base, fh)
+    times = np.arange(0.0, base["timepoints"], 100.0)
+    pd.DataFrame({"time": times, "Recombined": times / times[-1]}).to_csv(tmp_path / "target.csv", index=False)
+    spec = {"target": "target.csv", "priors": {"dloop_lmin": {"uniform": [5, 15]}}, "particles": 2, "generations": 1}
+    with open(tmp_path / "infer.yaml", "w", encoding="utf-8") as fh:
+        yaml.safe_dump(spec, fh)
+
+    outdir = os.path.join(tmp_path, "infer")
+    with contextlib.redirect_stdout(io.StringIO()):
+        Infer([str(tmp_path / "params.yaml"), str(tmp_path / "infer.yaml"), "-o", outdir, "-e", "numpy", "-c", "4"],
+              {}).execute()
+
+    (population,) = glob.glob(os.path.join(outdir, "*", "population_0.csv"))
+    target = inference.load_target(str(tmp_path / "target.csv"))
+    _, _, model_uid = generate_gillespie_model(base)
+    n_base = len(build_reaction_network(base)["species"])
+    for p, row in pd.read_csv(population, index_col="particle").iterrows():
+        cfg = {**base, "dloop_lmin": row["dloop_lmin"]}
+        network = build_reaction_network(cfg)
+        assert len(network["species"]) > n_base
+        species_to_index = {"Time": 0, **{name: i + 1 for i, name in enumerate(network["species"])}}
+        stats = EnsembleStats()
+        with contextlib.redirect_stdout(io.StringIO()):
+            cells = simulation.run_cells("numpy", list(range(4 * p, 4 * p + 4)), model_uid, species_to_index,
+                                         network, cfg)
+        for group in cells:
+            stats.update({k: group[k] for k in target})
+        assert row["distance"] == pytest.approx(inference.distance(stats.mean, target), rel=1e-9)
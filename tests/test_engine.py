@@ -0,0 +1,99 @@
+"""The SSA engines against tellurium, the exact moments and each other."""
+
+import numpy as np
+import pytest
+
+from genomatchgp.exact import delay_distribution, exact_moments
+from genomatchgp.simulation import _resection_delay
+
+
+SERIES = ("free sites", "all", "D-loop homologies", "Recombined")
+
+
+@pytest.fixture(scope="module")
+def exact(network, species_to_index, base_params):
+    return exact_moments(network, species_to_index, base_params)
+
+
+@pytest.fixture(scope="module")
+def ensembles(simulate):
+    return {engine: simulate(engine, list(range(400))) for engine in ("numpy", "grid")}
+
+
+def _z_point(groups: list, mean: dict, sd: dict, name: str, point: int = -1) -> float:
+    x = np.array([g[name][point] for g in groups])
+    return abs(x.mean() - mean[name][point]) / (sd[name][point] / np.sqrt(len(x)))
+
+
+def _z_time_average(groups: list, mean: dict, name: str) -> float:
+    # Per-cell time averages, against the time average of the exact mean
+    x = np.array([g[name].mean() for g in groups])
+    return abs(x.mean() - mean[name].mean()) / (x.std(ddof=1) / np.sqrt(len(x)))
+
+
+def test_delay_distribution_sums_to_one(base_params):
+    p = delay_distribution(base_params)
+    assert len(p) == base_params["timepoints"] // base_params["every"]
+    assert p.min() >= 0
+    assert p.sum() == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("engine", ["numpy", "grid"])
+@pytest.mark.parametrize("name", SERIES)
+def test_sampled_moments_match_exact(ensembles, exact, engine, name):
+    mean, sd = exact
+    assert _z_point(ensembles[engine], mean, sd, name) < 4
+    assert _z_time_average(ensembles[engine], mean, name) < 4
+
+
+@pytest.mark.parametrize("engine", ["numpy", "grid"])
+def test_sampled_sd_matches_exact(ensembles, exact, engine):
+    _, sd = exact
+    for name in SERIES:
+        x = np.array([g[name][-1] for g in ensembles[engine]])
+        assert x.std(ddof=1) == pytest.approx(sd[name][-1], rel=0.2)
+
+
+def test_batched_ssa_matches_tellurium(simulate, ensembles, exact):
+    pytest.importorskip("tellurium")
+    mean, sd = exact
+    reference = simulate("tellurium", list(range(40)))
+    batched = ensembles["numpy"]
+
+    assert list(reference[0]) == list(batched[0])
+    np.testing.assert_array_equal(reference[0]["time"], batched[0]["time"])
+    for name in SERIES:
+        # Few cells: a rare series such as Recombined is too skewed for
+        # the sample SD, so use the exact one, at the middle and the end
+        assert _z_point(reference, mean, sd, name) < 4
+        assert _z_point(reference, mean, sd, name, len(mean[name]) // 2) < 4
+        # Two-sample comparison of the final point
+        a = np.array([g[name][-1] for g in reference])
+        b = np.array([g[name][-1] for g in batched])
+        se = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+        assert abs(a.mean() - b.mean()) < 4 * se
+
+
+def test_resection_delay_is_shared_by_the_engines(simulate, ensembles, base_params, network):
+    pytest.importorskip("tellurium")
+    reference = simulate("tellurium", [0, 1, 2])
+    for uid, cell in enumerate(reference):
+        n_pts_delay, _ = _resection_delay(uid, network["uid"], base_params)
+        for group in (cell, ensembles["numpy"][uid], ensembles["grid"][uid]):
+            # Nothing but S = N during the delay
+            assert (group["free sites"][:n_pts_delay] == base_params["N"]).all()
+            assert (group["all"][:n_pts_delay] == 0).all()
+
+
+@pytest.mark.parametrize("engine", ["numpy", "grid"])
+def test_cells_do_not_depend_on_their_batch(simulate, ensembles, engine):
+    uids = list(range(12))
+    whole = ensembles[engine][:12]
+    for batch_size in (1, 5):
+        split = simulate(engine, uids, batch_size=batch_size)
+        for a, b in zip(whole, split):
+            np.testing.assert_array_equal(a.counts, b.counts)
+
+    # Nor on the other cells of the batch
+    (alone,) = simulate(engine, [7])
+    np.testing.assert_array_equal(alone.counts, whole[7].counts)
@@ -0,0 +1,52 @@
+"""First-passage mode: absorbed lengths and batching."""
+
+import contextlib
+import io
+
+import numpy as np
+import yaml
+
+from genomatchgp import commands, methods
+from genomatchgp.simulation import run_first_passage
+
+
+def test_recombined_length_is_the_consumed_dloop(params, network):
+    targets = methods.first_passage_targets(params["intermediates"])
+    rows = run_first_passage(list(range(20)), network["uid"], network, params, targets, ["Recombined"])
+
+    fired = [r for r in rows if not np.isnan(r["t Recombined"])]
+    assert fired
+    for r in rows:
+        assert np.isnan(r["L Recombined"]) == np.isnan(r["t Recombined"])
+    assert {r["L Recombined"] for r in fired} <= set(map(float, params["intermediates"]))
+
+
+def test_first_passage_is_batch_independent(params, network):
+    targets = methods.first_passage_targets(params["intermediates"])
+    whole = run_first_passage(list(range(6)), network["uid"], network, params, targets, ["Recombined"])
+    split = (
+        run_first_passage([0, 1, 2], network["uid"], network, params, targets, ["Recombined"])
+        + run_first_passage([3, 4, 5], network["uid"], network, params, targets, ["Recombined"])
+    )
+    for a, b in zip(whole, split):
+        assert a.keys() == b.keys()
+        np.testing.assert_array_equal(list(a.values()), list(b.values()))
+
+
+def test_run_batches_cells_on_the_default_engine(base_params, tmp_path, monkeypatch):
+    # No engine key: the file defaults to tellurium, first passage to the SSA
+    assert "engine" not in base_params
+    path = tmp_path / "params.yaml"
+    with open(path, "w", encoding="utf-8") as fh:
+        yaml.safe_dump(base_params, fh)
+    batches = []
+
+    def spy(uids, *args):
+        batches.append(len(uids))
+        return run_first_passage(uids, *args)
+
+    monkeypatch.setattr(commands, "run_first_passage", spy)
+    argv = [str(path), "-o", str(tmp_path), "-c", "6", "-b", "4", "--backend", "serial", "--mode", "first-passage"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        commands.Run(argv, {}).execute()
+    assert batches == [4, 2]
@@ -0,0 +1,61 @@
+"""Checkpointed manifest parts: commit interval, attempts and ranks."""
+
+import numpy as np
+
+from genomatchgp import manifest
+from genomatchgp.stats import EnsembleStats
+
+
+def _stats(values: list[float]) -> EnsembleStats:
+    stats = EnsembleStats()
+    for v in values:
+        stats.update({"x": np.array([v, 2 * v])})
+    return stats
+
+
+def test_checkpoint_commits_at_most_every_interval(tmp_path):
+    checkpoint = manifest.Checkpoint(tmp_path, 0, 0, interval=3600)
+    checkpoint.update([0, 1])
+    checkpoint.commit(_stats([0.0, 1.0]))
+    assert manifest.load_manifest(tmp_path)[0] == set()
+
+    checkpoint.commit(_stats([0.0, 1.0]), force=True)
+    done, stats = manifest.load_manifest(tmp_path)
+    assert done == {0, 1}
+    assert stats.n == 2
+
+
+def test_attempts_and_ranks_merge(tmp_path):
+    values = {0: 1.0, 1: 4.0, 2: 2.0, 3: 8.0, 4: 5.0}
+    parts = [(0, 0, [0, 1]), (0, 1, [2]), (1, 0, [3, 4])]
+    for attempt, rank, cells in parts:
+        checkpoint = manifest.Checkpoint(tmp_path, attempt, rank, interval=0)
+        checkpoint.update(cells)
+        checkpoint.commit(_stats([values[c] for c in cells]))
+
+    done, stats = manifest.load_manifest(tmp_path)
+    assert done == set(values)
+    reference = _stats(list(values.values()))
+    np.testing.assert_allclose(stats.mean["x"], reference.mean["x"])
+    np.testing.assert_allclose(stats.sd()["x"], reference.sd()["x"])
+
+    before, _ = manifest.load_manifest(tmp_path, before=1)
+    assert before == {0, 1, 2}
+    assert manifest.next_attempt(tmp_path) == 2
+
+    manifest.clear_manifest(tmp_path)
+    assert manifest.load_manifest(tmp_path)[0] == set()
+    assert manifest.next_attempt(tmp_path) == 0
+
+
+def test_commit_flushes_the_writer(tmp_path):
+    class Writer:
+        flushed = 0
+
+        def flush(self):
+            self.flushed += 1
+
+    writer = Writer()
+    checkpoint = manifest.Checkpoint(tmp_path, 0, 0, interval=0)
+    checkpoint.commit(_stats([1.0]), writer)
+    assert writer.flushed == 1
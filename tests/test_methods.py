@@ -0,0 +1,160 @@
+"""Grouped series, decimation and smoothing."""
+
+import numpy as np
+import pytest
+
+from genomatchgp import methods
+
+
+@pytest.fixture
+def matrix(species_to_index, params) -> np.ndarray:
+    """Species-by-time matrix with random counts, recombined half way."""
+    rng = np.random.default_rng(0)
+    n_points = params["timepoints"] // params["every"]
+    result = np.zeros((len(species_to_index), n_points))
+    result[0] = np.arange(n_points) * params["every"]
+    result[1:] = rng.integers(0, 4, size=result[1:].shape)
+    result[species_to_index["R"], : n_points // 2] = 0
+    result[species_to_index["R"], n_points // 2:] += 1
+    return result
+
+
+def test_group_matches_eager_make_series(matrix, species_to_index, params):
+    reference = methods._make_series(matrix, species_to_index, params["intermediates"])
+    group = methods.make_group(matrix, species_to_index, params["intermediates"])
+
+    assert list(group) == list(reference)
+    for k, v in reference.items():
+        np.testing.assert_array_equal(group[k], v, err_msg=k)
+    # The DLC clipping applies after the first recombination
+    dlc = group["DLC homologous"]
+    assert (dlc[len(dlc) // 2 + 1:] == 0).all()
+    assert dlc[: len(dlc) // 2].any()
+
+
+def test_stacked_series_match_per_cell_groups(matrix, species_to_index, params):
+    operator = methods.grouping_operator(species_to_index, params["intermediates"])
+    cells = [matrix, matrix.copy()]
+    cells[1][species_to_index["R"]] = 0    # never recombines
+    groups = [methods.Group.from_matrix(m, operator) for m in cells]
+    counts = np.stack([g.counts for g in groups])
+
+    for name in operator["series"]:
+        stacked = methods.series(counts, groups[0].time, operator, name)
+        for c, g in enumerate(groups):
+            np.testing.assert_array_equal(stacked[c], g[name], err_msg=name)
+
+
+def test_make_groups_match_per_cell_groups(matrix, species_to_index, params):
+    operator = methods.grouping_operator(species_to_index, params["intermediates"])
+    cells = [matrix, matrix.copy()]
+    cells[1][species_to_index["R"]] = 0    # never recombines
+    groups = [methods.Group.from_matrix(m, operator) for m in cells]
+    batch = methods.make_groups(np.stack([g.counts for g in groups]), groups[0].time, operator)
+
+    assert list(batch) == operator["series"]
+    for cell, g in zip(methods.split_groups(batch), groups):
+        for name in operator["series"]:
+            np.testing.assert_array_equal(cell[name], g[name], err_msg=name)
+    assert methods.split_groups({}) == []
+
+
+def test_grouping_operator_is_cached(species_to_index, params):
+    a = methods.grouping_operator(species_to_index, params["intermediates"])
+    b = methods.grouping_operator(dict(species_to_index), list(params["intermediates"]))
+    assert a is b
+
+
+def test_group_record_round_trip(matrix, species_to_index, params):
+    group = methods.make_group(matrix, species_to_index, params["intermediates"])
+    back = methods.Group.from_record(group.record())
+    assert back.operator is group.operator
+    for k in group:
+        np.testing.assert_array_equal(back[k], group[k])
+    with pytest.raises(KeyError):
+        group["no such series"]
+
+
+def test_aggregate_groups_fast_path_matches_dicts(matrix, species_to_index, params):
+    rng = np.random.default_rng(1)
+    groups = []
+    for _ in range(5):
+        m = matrix.copy()
+        m[1:] = rng.integers(0, 4, size=m[1:].shape)
+        m[species_to_index["R"], : rng.integers(1, m.shape[1])] = 0
+        groups.append(methods.make_group(m, species_to_index, params["intermediates"]))
+
+    fast = methods.aggregate_groups(groups)
+    slow = methods.aggregate_groups([dict(g) for g in groups])
+    assert list(fast) == list(slow)
+    for k in slow:
+        np.testing.assert_allclose(fast[k], slow[k], err_msg=k)
+    assert methods.aggregate_groups([]) == {}
+
+
+# =====================================================================
+# Decimation and smoothing
+# =====================================================================
+
+def test_minmax_keeps_endpoints_and_extrema():
+    rng = np.random.default_rng(2)
+    y = rng.normal(size=10_001)
+    y[1234], y[8765] = 50.0, -50.0
+    idx = methods.minmax_indices(y, 200)
+
+    assert len(idx) <= 200
+    assert idx[0] == 0 and idx[-1] == len(y) - 1
+    assert (np.diff(idx) > 0).all()
+    assert {1234, 8765} <= set(idx.tolist())
+
+
+@pytest.mark.parametrize("n, n_out", [(0, 10), (1, 10), (10, 10), (10, 3)])
+def test_minmax_small_inputs_keep_every_point(n, n_out):
+    np.testing.assert_array_equal(methods.minmax_indices(np.arange(n, dtype=float), n_out), np.arange(n))
+
+
+def test_lttb_shape():
+    rng = np.random.default_rng(3)
+    x = np.arange(5000, dtype=float)
+    y = np.cumsum(rng.normal(size=5000))
+    idx = methods.lttb_indices(x, y, 300)
+
+    assert len(idx) == 300
+    assert idx[0] == 0 and idx[-1] == 4999
+    assert (np.diff(idx) > 0).all()
+    # A spike always wins its bucket
+    y[2500] = 1e6
+    assert 2500 in methods.lttb_indices(x, y, 300)
+
+
+@pytest.mark.parametrize("n, n_out", [(5, 10), (10, 10), (10, 2)])
+def test_lttb_small_inputs_keep_every_point(n, n_out):
+    x = np.arange(n, dtype=float)
+    np.testing.assert_array_equal(methods.lttb_indices(x, x, n_out), np.arange(n))
+
+
+def test_decimate_dispatch():
+    x = np.arange(100, dtype=float)
+    np.testing.assert_array_equal(methods.decimate(x, x, None), np.arange(100))
+    assert len(methods.decimate(x, x, 10, "lttb")) == 10
+    assert len(methods.decimate(x, x, 10, "minmax")) <= 10
+    with pytest.raises(ValueError):
+        methods.decimate(x, x, 10, "every-other")
+
+
+@pytest.mark.parametrize("n", [1, 7, 100])
+def test_moving_averages_match_convolution(n):
+    y = np.random.default_rng(4).normal(size=n)
+    widths = [w for w in (1, 2, 5, 10, 100) if w <= n]
+    out = methods.moving_averages(y, [0, *widths])
+
+    np.testing.assert_array_equal(out[0], y)
+    for w in widths:
+        np.testing.assert_allclose(out[w], np.convolve(y, np.ones(w) / w, mode="same"), err_msg=str(w))
+
+
+def test_summary_statistics_keys(matrix, species_to_index, params):
+    group = methods.make_group(matrix, species_to_index, params["intermediates"])
+    summary = methods.summary_statistics(group)
+    assert set(methods.observable_names(params["intermediates"])) <= set(summary)
+    assert all(np.isfinite(v) for k, v in summary.items() if k != "t first recombination")
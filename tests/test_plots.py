@@ -0,0 +1,34 @@
+"""Plot jobs and in-process rendering."""
+
+import numpy as np
+
+from genomatchgp import methods, plots
+
+
+def test_dlc_band_is_the_unsmoothed_sd():
+    rng = np.random.default_rng(6)
+    mean = {"DLC homologous": rng.random(500), "Recombined": rng.random(500)}
+    sd = {k: rng.random(500) for k in mean}
+    jobs = plots.aggregate_jobs(mean, sd, "plots", max_points=100)
+
+    dlc_jobs = [job for job in jobs if job[0] == "plot_dlc"]
+    assert len(dlc_jobs) == len(plots.DLC_WINDOWS)
+    smoothed = methods.moving_averages(mean["DLC homologous"], plots.DLC_WINDOWS)
+    for (_, args, kwargs), w in zip(dlc_jobs, plots.DLC_WINDOWS):
+        np.testing.assert_array_equal(args[0], smoothed[w])
+        assert args[1] == 0    # already smoothed
+        np.testing.assert_array_equal(kwargs["sd"], sd["DLC homologous"])
+        assert kwargs["max_points"] == 100
+
+
+def test_survival_jobs():
+    curves = {"time": np.arange(3.0), "S Recombined": np.array([1.0, 0.5, 0.25]), "h Recombined": np.zeros(3)}
+    ((name, args, _),) = plots.survival_jobs(curves, "plots")
+    assert name == "plot_survival"
+    assert list(args[1]) == ["Recombined"]
+
+
+def test_render_in_process(tmp_path):
+    t = np.arange(50.0)
+    plots.render([("plot_dlc", (np.sin(t), 5, str(tmp_path / "dlc.png")), {"sd": np.ones(50), "max_points": 20})], 1)
+    assert (tmp_path / "dlc.png").stat().st_size > 0
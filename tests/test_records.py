@@ -0,0 +1,165 @@
+"""Record writers and readers: the chunked store, npz files and event records."""
+
+import os
+
+import numpy as np
+import pytest
+
+from genomatchgp import methods, records
+from genomatchgp.simulation import _sampling_grids
+
+
+@pytest.fixture(scope="module")
+def groups(simulate) -> list:
+    return simulate("grid", list(range(10)))
+
+
+def _assert_same_group(a, b) -> None:
+    assert list(a) == list(b)
+    for k in a:
+        np.testing.assert_array_equal(a[k], b[k], err_msg=k)
+
+
+@pytest.mark.parametrize("queue_size", [0, 3])
+def test_store_round_trip(groups, tmp_path, queue_size):
+    # Two ranks, chunks smaller than the number of cells
+    for rank, uids in enumerate([[0, 2, 4, 6, 8], [1, 3, 5, 7, 9]]):
+        writer = records.open_writer("store", tmp_path, rank, queue_size=queue_size)
+        if queue_size == 0:
+            writer.chunk_cells = 2
+        for uid in uids:
+            writer.write(uid, groups[uid])
+        writer.close()
+
+    store = records.RecordStore(tmp_path)
+    assert len(store) == 10
+    assert store.series_names == list(groups[0])
+    for uid in range(10):
+        _assert_same_group(store.cell(uid), groups[uid])
+    for name in ("Recombined", "DLC homologous", "time"):
+        expected = np.stack([groups[uid][name] for uid in store.cell_ids])
+        np.testing.assert_array_equal(store.series(name), expected)
+
+
+def test_store_keeps_first_copy_of_a_resumed_cell(groups, tmp_path):
+    first = records.StoreWriter(tmp_path, 0)
+    first.write(0, groups[0])
+    first.write(1, groups[1])
+    first.close()
+    second = records.StoreWriter(tmp_path, 0, attempt=1)
+    second.write(1, groups[5])    # same cell simulated again
+    second.write(2, groups[2])
+    second.close()
+
+    store = records.RecordStore(tmp_path)
+    assert sorted(store.cell_ids.tolist()) == [0, 1, 2]
+    _assert_same_group(store.cell(1), groups[1])
+    for name in ("all", "DLC homologous", "time"):
+        expected = np.stack([groups[uid][name] for uid in store.cell_ids])
+        np.testing.assert_array_equal(store.series(name), expected)
+
+
+def test_store_index_only_lists_flushed_cells(groups, tmp_path):
+    writer = records.StoreWriter(tmp_path, 0, chunk_cells=4)
+    for uid in range(3):
+        writer.write(uid, groups[uid])
+    assert len(records.RecordStore(tmp_path)) == 0
+    writer.flush()
+    assert len(records.RecordStore(tmp_path)) == 3
+    writer.close()
+
+
+def test_clear_store_removes_every_format(simulate, groups, tmp_path):
+    for fmt in ("store", "npz"):
+        writer = records.open_writer(fmt, tmp_path, 1, attempt=2)
+        writer.write(0, groups[0])
+        writer.close()
+    writer = records.open_writer("events", tmp_path, 1, attempt=2)
+    simulate("numpy", [0], writer=writer, sparse=True)
+    writer.close()
+    assert sorted(os.listdir(tmp_path)) == [
+        "events_rank_1.2.bin", "events_rank_1.2.json", "rank_1.2.bin", "rank_1.2.json", "simulation_0.npz",
+    ]
+
+    records.clear_store(tmp_path)
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("codec", list(records.CODECS))
+def test_save_npz_codecs(groups, tmp_path, codec):
+    path = os.path.join(tmp_path, "cell.npz")
+    arrays = groups[3].record()
+    records.save_npz(path, arrays, codec, level=None)
+    with np.load(path) as npz:
+        assert sorted(npz.files) == sorted(arrays)
+        for k, v in arrays.items():
+            np.testing.assert_array_equal(npz[k], v)
+        _assert_same_group(methods.Group.from_record(npz), groups[3])
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_npz_writer_round_trip(groups, tmp_path):
+    writer = records.open_writer("npz", tmp_path, 0, codec="bz2", level=9, queue_size=2)
+    for uid in (4, 5):
+        writer.write(uid, groups[uid])
+    writer.close()
+    for uid in (4, 5):
+        with np.load(os.path.join(tmp_path, f"simulation_{uid}.npz")) as npz:
+            _assert_same_group(methods.Group.from_record(npz), groups[uid])
+
+
+def test_event_store_round_trip(simulate, tmp_path):
+    writer = records.open_writer("events", tmp_path, 0)
+    groups = simulate("numpy", [0, 1, 2, 3], writer=writer, sparse=True)
+    writer.close()
+
+    store = records.EventStore(tmp_path)
+    assert store.cell_ids.tolist() == [0, 1, 2, 3]
+    for uid, traj in zip(store.cell_ids, store):
+        _assert_same_group(methods.make_group(traj), groups[uid])
+
+
+def test_event_records_replay_the_dense_engine(simulate, network, base_params, tmp_path):
+    # Same streams: on the dense engine's own sampling grid, the events
+    # rebuild its trajectories exactly
+    uids = [0, 1, 2]
+    dense = simulate("numpy", uids)
+    writer = records.open_writer("events", tmp_path, 0)
+    simulate("numpy", uids, writer=writer, sparse=True)
+    writer.close()
+
+    _, sample_times = _sampling_grids(uids, network["uid"], base_params)
+    store = records.EventStore(tmp_path)
+    for c, uid in enumerate(uids):
+        states = store.trajectory(uid).resample(sample_times[c])[1:]
+        np.testing.assert_array_equal(states, dense[c].counts)
+
+
+class _Failing:
+    def write(self, uid, group):
+        raise OSError("disk full")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_async_writer_reraises_the_first_error():
+    writer = records.AsyncWriter(_Failing(), max_pending=1)
+    writer.write(0, None)
+    with pytest.raises(RuntimeError, match="disk full"):
+        writer.flush()
+    with pytest.raises(RuntimeError):
+        writer.write(1, None)
+    with pytest.raises(RuntimeError):
+        writer.close()
+
+
+def test_unknown_format_and_codec(tmp_path):
+    assert records.open_writer("none", tmp_path, 0) is None
+    with pytest.raises(ValueError):
+        records.open_writer("hdf5", tmp_path, 0)
+    with pytest.raises(ValueError):
+        records.open_writer("npz", tmp_path, 0, codec="zstd")
@@ -0,0 +1,26 @@
+"""Chunk schedules on one rank and the static split across ranks."""
+
+import pytest
+
+from genomatchgp import scheduler
+from genomatchgp.parallel import SerialComm
+
+
+@pytest.mark.parametrize("n_tasks, chunk, size", [(10, 3, 1), (10, 3, 4), (7, 1, 3), (2, 5, 4), (0, 2, 2)])
+def test_static_chunks_cover_every_task_once(n_tasks, chunk, size):
+    seen = []
+    for rank in range(size):
+        for start, stop in scheduler.static_chunks(n_tasks, chunk, rank, size):
+            assert 0 < stop - start <= chunk
+            seen.extend(range(start, stop))
+    assert sorted(seen) == list(range(n_tasks))
+
+
+@pytest.mark.parametrize("schedule", scheduler.SCHEDULES)
+def test_one_rank_takes_everything(schedule):
+    assert list(scheduler.chunks(schedule, SerialComm(), 7, 3)) == [(0, 3), (3, 6), (6, 7)]
+
+
+def test_unknown_schedule():
+    with pytest.raises(ValueError):
+        scheduler.chunks("guided", SerialComm(), 7, 3)
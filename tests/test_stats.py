@@ -0,0 +1,97 @@
+"""EnsembleStats against numpy, across merges and through its saved state."""
+
+import functools
+
+import numpy as np
+import pytest
+
+from genomatchgp.parallel import SerialComm
+from genomatchgp.stats import EnsembleStats, load_stats, reduce_stats, relative_ci_width
+
+
+@pytest.fixture
+def cells() -> list[dict]:
+    rng = np.random.default_rng(5)
+    return [{"a": rng.normal(3.0, 2.0, size=50), "b": rng.poisson(4, size=50)} for _ in range(37)]
+
+
+def _stats(cells: list[dict]) -> EnsembleStats:
+    stats = EnsembleStats()
+    for c in cells:
+        stats.update(c)
+    return stats
+
+
+def _assert_matches(stats: EnsembleStats, cells: list[dict]) -> None:
+    assert stats.n == len(cells)
+    sd = stats.sd()
+    for k in cells[0]:
+        x = np.array([c[k] for c in cells], dtype=np.float64)
+        np.testing.assert_allclose(stats.mean[k], x.mean(axis=0), rtol=1e-12)
+        np.testing.assert_allclose(sd[k], x.std(axis=0, ddof=1), rtol=1e-10)
+
+
+def test_welford_matches_numpy(cells):
+    _assert_matches(_stats(cells), cells)
+
+
+@pytest.mark.parametrize("cut", [0, 1, 20, 36])
+def test_batch_update_after_welford(cells, cut):
+    stats = _stats(cells[:cut])
+    stats.update_batch({k: np.stack([c[k] for c in cells[cut:]]) for k in cells[0]})
+    _assert_matches(stats, cells)
+
+    stats.update_batch({})
+    assert stats.n == len(cells)
+
+
+@pytest.mark.parametrize("cut", [0, 1, 20, 36, 37])
+def test_merge_of_two_parts(cells, cut):
+    merged = _stats(cells[:cut]).merge(_stats(cells[cut:]))
+    _assert_matches(merged, cells)
+
+
+def test_merge_in_any_tree_order(cells):
+    # What an MPI reduction over 5 uneven ranks does, in two orders
+    bounds = [0, 3, 4, 15, 30, 37]
+    parts = [cells[a:b] for a, b in zip(bounds, bounds[1:])]
+    left = functools.reduce(lambda a, b: a.merge(b), [_stats(p) for p in parts])
+    s = [_stats(p) for p in parts]
+    tree = s[0].merge(s[1]).merge(s[2].merge(s[3].merge(s[4])))
+    _assert_matches(left, cells)
+    _assert_matches(tree, cells)
+
+
+def test_reduce_stats_on_one_rank(cells):
+    stats = _stats(cells)
+    assert reduce_stats(SerialComm(), stats) is stats
+
+
+def test_state_round_trip(cells, tmp_path):
+    stats = _stats(cells)
+    back = EnsembleStats.from_state(stats.state())
+    _assert_matches(back, cells)
+
+    stats.save(tmp_path / "aggregate.npz")
+    n, mean, sd = load_stats(tmp_path / "aggregate.npz")
+    assert n == len(cells)
+    np.testing.assert_array_equal(mean["a"], stats.mean["a"])
+    np.testing.assert_array_equal(sd["b"], stats.sd()["b"])
+
+
+def test_sd_below_two_cells(cells):
+    stats = _stats(cells[:1])
+    assert (stats.sd()["a"] == 0).all()
+    assert np.isinf(relative_ci_width(stats)["a"]).all()
+
+
+def test_relative_ci_width(cells):
+    stats = _stats(cells)
+    width = relative_ci_width(stats)
+    expected = 2 * 1.96 * stats.sd()["a"] / np.sqrt(stats.n) / np.abs(stats.mean["a"])
+    np.testing.assert_allclose(width["a"], expected)
+
+    stats = _stats([{"x": np.array([0.0, 1.0])}, {"x": np.array([0.0, 3.0])}])
+    width = relative_ci_width(stats)["x"]
+    assert width[0] == 0.0    # constant zero: no uncertainty
+    assert np.isfinite(width[1])
@@ -0,0 +1,42 @@
+"""Per-cell random streams do not depend on the other cells."""
+
+import numpy as np
+
+from genomatchgp import streams
+
+
+def test_uniforms_do_not_depend_on_the_other_cells(params):
+    uids = [3, 9, 27, 81]
+    together = streams.CellStreams(params, 7, uids, block=8)
+    alone = [streams.CellStreams(params, 7, [uid], block=8) for uid in uids]
+
+    # Uneven draws across refills of the per-cell buffers
+    for k, cells in [(2, [0, 1, 2, 3]), (3, [1, 3]), (5, [0, 1, 2, 3]), (2, [2])]:
+        got = together.uniforms(np.array(cells), k)
+        for i, c in enumerate(cells):
+            np.testing.assert_array_equal(got[:, i], alone[c].uniforms(np.array([0]), k)[:, 0])
+
+
+def test_uniforms_are_in_unit_interval(params):
+    cell_streams = streams.CellStreams(params, 7, list(range(5)), block=16)
+    u = np.concatenate([cell_streams.uniforms(np.arange(5), 3) for _ in range(20)], axis=0)
+    assert u.shape == (60, 5)
+    assert ((u >= 0) & (u < 1)).all()
+
+
+def test_streams_are_distinct_nodes(params):
+    # Additive seeds would collide on (model, uid) pairs with equal sums
+    a = streams.cell_generator(params, 1, 2, streams.CHEMISTRY).random(4)
+    b = streams.cell_generator(params, 2, 1, streams.CHEMISTRY).random(4)
+    c = streams.cell_generator(params, 1, 2, streams.DELAY).random(4)
+    assert not np.array_equal(a, b)
+    assert not np.array_equal(a, c)
+    np.testing.assert_array_equal(a, streams.cell_generator(params, 1, 2, streams.CHEMISTRY).random(4))
+
+
+def test_keys_and_integrator_seeds_are_per_cell(params):
+    keys = streams.cell_keys(params, 7, [0, 1, 2])
+    assert keys.dtype == np.uint64
+    assert len(set(keys.tolist())) == 3
+    np.testing.assert_array_equal(keys[1:], streams.cell_keys(params, 7, [1, 2]))
+    assert streams.integrator_seed(params, 7, 0) != streams.integrator_seed(params, 7, 1)